@@ -0,0 +1,216 @@
+"""
+Benchmark suite for FinFlow Reality.
+
+Generates deterministic synthetic ledgers at several sizes, times every
+public function of utils.cash_flow_analyzer and utils.data_processor plus a
+simulated dashboard rerun (without Streamlit widgets), records peak traced
+memory (tracemalloc sees Python and NumPy allocations, not Arrow buffers),
+and writes the results as JSON so runs can be compared across commits.
+
+    python benchmarks/run_benchmarks.py --sizes 1000 100000 --output bench.json
+    python benchmarks/run_benchmarks.py --compare bench.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils import cash_flow_analyzer as analyzer  # noqa: E402
+from utils import data_processor as processor  # noqa: E402
+from utils.downsampling import daily_end_of_day, downsample_series  # noqa: E402
+from utils.ingest_cache import IngestCache, cached_load_csv  # noqa: E402
+from utils.transaction_index import TransactionIndex  # noqa: E402
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+SYNTHETIC_END_DATE = '2023-12-31'
+
+
+def synthetic_ledger(n_rows, seed=0, days=365):
+    """Deterministic ledger from the vectorized generator, ending on a fixed date."""
+    return processor.generate_transactions(n_rows, days=days, end_date=SYNTHETIC_END_DATE, seed=seed)
+
+
+def dashboard_rerun(csv_bytes, delay_days=30, cache=None):
+    """Everything app.main computes for one rerun, minus the Streamlit widgets."""
+    transactions = cached_load_csv(io.BytesIO(csv_bytes), cache=cache)
+    sweep = analyzer.get_delay_sweep(transactions)
+    index = TransactionIndex(transactions)
+    projection = analyzer.build_projection(transactions, delay_days=delay_days, sweep=sweep)
+    analyzer.calculate_metrics(transactions, delay_days, projection=projection, index=index)
+    for dates, balance in ((projection.optimistic_dates, projection.optimistic_balance),
+                           (projection.reality_dates, projection.reality_balance)):
+        downsample_series(daily_end_of_day(dates, balance), 2000)
+    analyzer.get_top_offenders(transactions, top_n=5, index=index)
+
+
+def build_cases(transactions, workdir):
+    """Return (name, callable) pairs for one ledger size."""
+    csv_path = os.path.join(workdir, 'ledger.csv')
+    transactions.to_csv(csv_path, index=False)
+    with open(csv_path, 'rb') as handle:
+        csv_bytes = handle.read()
+    loaded = processor.load_and_process_csv(csv_path)
+    sweep = analyzer.DelaySweep(loaded)
+    warm_cache = IngestCache(max_bytes=1 << 40)
+    cached_load_csv(io.BytesIO(csv_bytes), cache=warm_cache)
+
+    def load_transactions_cold():
+        if os.path.exists(processor.snapshot_path(csv_path)):
+            os.remove(processor.snapshot_path(csv_path))
+        processor.load_transactions(csv_path)
+
+    cases = [
+        ('data_processor.load_and_process_csv', lambda: processor.load_and_process_csv(csv_path)),
+        ('data_processor.load_and_process_csv_chunked', lambda: processor.load_and_process_csv_chunked(csv_path)),
+        ('data_processor.load_transactions[cold]', load_transactions_cold),
+        ('data_processor.load_transactions[snapshot]', lambda: processor.load_transactions(csv_path)),
+        ('data_processor.generate_mock_data', processor.generate_mock_data),
+        ('data_processor.generate_transactions',
+         lambda: processor.generate_transactions(len(transactions), days=365, n_customers=1000, skew=1.1)),
+        ('cash_flow_analyzer.calculate_average_monthly_outflow',
+         lambda: analyzer.calculate_average_monthly_outflow(loaded)),
+        ('cash_flow_analyzer.calculate_liquidity_locked', lambda: analyzer.calculate_liquidity_locked(loaded)),
+        ('cash_flow_analyzer.get_top_offenders', lambda: analyzer.get_top_offenders(loaded)),
+        ('cash_flow_analyzer.calculate_cumulative_cash_flow',
+         lambda: analyzer.calculate_cumulative_cash_flow(loaded, 30, reality_mode=True)),
+        ('cash_flow_analyzer.DelaySweep', lambda: analyzer.DelaySweep(loaded)),
+        ('cash_flow_analyzer.DelaySweep.curve', lambda: sweep.curve(30)),
+        ('cash_flow_analyzer.build_projection', lambda: analyzer.build_projection(loaded, 30)),
+        ('cash_flow_analyzer.calculate_metrics', lambda: analyzer.calculate_metrics(loaded, 30)),
+        ('cash_flow_analyzer.horizon_table',
+         lambda: analyzer.horizon_table(analyzer.build_projection(loaded, 30, sweep=sweep))),
+        ('cash_flow_analyzer.analyze_cash_flow', lambda: analyzer.analyze_cash_flow(loaded)),
+        ('cash_flow_analyzer.DelaySweep.earliest_crunches', lambda: sweep.earliest_crunches()),
+        ('dashboard_rerun[cold]', lambda: dashboard_rerun(csv_bytes, cache=IngestCache(max_bytes=1 << 40))),
+        ('dashboard_rerun[warm]', lambda: dashboard_rerun(csv_bytes, cache=warm_cache)),
+    ]
+    try:
+        import pyarrow  # noqa: F401
+        cases.insert(2, ('data_processor.load_and_process_csv_chunked[pyarrow]',
+                         lambda: processor.load_and_process_csv_chunked(csv_path, engine='pyarrow')))
+    except ImportError:
+        pass
+    return cases
+
+
+def measure(func, repeat):
+    """Best wall time over ``repeat`` runs, then one traced run for peak memory."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(timings), peak
+
+
+def run(sizes, repeat=3, seed=0, only=None):
+    """
+    Run every benchmark case for every ledger size.
+
+    Args:
+        sizes (list): Ledger row counts.
+        repeat (int): Timed runs per case; the best is reported.
+        seed (int): Seed for the synthetic ledgers.
+        only (str): Optional substring filter on case names.
+
+    Returns:
+        list: One dict per (case, size) with seconds and peak_bytes.
+    """
+    results = []
+    for n_rows in sizes:
+        transactions = synthetic_ledger(n_rows, seed=seed)
+        with tempfile.TemporaryDirectory() as workdir:
+            for name, func in build_cases(transactions, workdir):
+                if only and only not in name:
+                    continue
+                seconds, peak = measure(func, repeat)
+                results.append({'name': name, 'rows': n_rows, 'seconds': seconds, 'peak_bytes': peak})
+                print(f"{name:<60} {n_rows:>10,} rows {seconds * 1000:>10.2f} ms {peak / 2**20:>9.1f} MiB")
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline, tolerance=1.2):
+    """
+    Print per-case time ratios against a baseline run.
+
+    Returns:
+        list: (name, rows, ratio) for cases slower than ``tolerance`` x baseline.
+    """
+    previous = {(row['name'], row['rows']): row for row in baseline['results']}
+    regressions = []
+    for row in current['results']:
+        old = previous.get((row['name'], row['rows']))
+        if old is None or old['seconds'] <= 0:
+            continue
+        ratio = row['seconds'] / old['seconds']
+        flag = '  REGRESSION' if ratio > tolerance else ''
+        print(f"{row['name']:<60} {row['rows']:>10,} rows {ratio:>7.2f}x{flag}")
+        if ratio > tolerance:
+            regressions.append((row['name'], row['rows'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark FinFlow Reality analytics on synthetic ledgers.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Ledger sizes in rows")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per case")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', help="Only run cases whose name contains this text")
+    parser.add_argument('--output', default='bench_results.json', help="JSON file for the results")
+    parser.add_argument('--compare', help="Baseline JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=1.2, help="Slowdown ratio reported as a regression")
+    args = parser.parse_args(argv)
+
+    report = {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'sizes': args.sizes,
+            'repeat': args.repeat
+        },
+        'results': run(args.sizes, repeat=args.repeat, seed=args.seed, only=args.only)
+    }
+    with open(args.output, 'w') as handle:
+        json.dump(report, handle, indent=2)
+    print(f"Wrote {len(report['results'])} results to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as handle:
+            regressions = compare(report, json.load(handle), args.tolerance)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,171 @@
 import streamlit as st
 import pandas as pd
 from components.file_upload import upload_file
+from components.perf_panel import perf_debug_mode, render_perf_panel
+from components.transaction_explorer import render_transaction_explorer
 from components.visualizations import plot_dual_cash_flow
-from utils.cash_flow_analyzer import calculate_metrics, get_top_offenders
+from config.settings import (
+    CASH_CRUNCH_ALERT_THRESHOLD,
+    DEFAULT_CURRENCY,
+    DELAY_STEP_DAYS,
+    MAX_DELAY_DAYS,
+    PERF_DEBUG_MODE,
+    SIMULATION_SCENARIOS,
+)
+from utils.cash_flow_analyzer import (
+    build_projection,
+    calculate_metrics,
+    get_delay_sweep,
+    get_top_offenders,
+    horizon_table,
+)
+from utils.fx import CURRENCY_COLUMN, get_fx_rates, normalize_currency
+from utils.profiling import recording, timed
+from utils.simulation import get_simulation
+from utils.transaction_index import get_transaction_index, select_accounts
 
 
-def main():
+@st.fragment
+def render_projection(transactions_df):
+    """
+    Reality settings, health metrics and the cash flow chart.
+    
+    Runs as a fragment: changing the delay, the reality view or the bands
+    reruns only this section, not the upload, tables and styling around it.
+    
+    Args:
+        transactions_df (DataFrame): Transaction data.
+    """
+    # Reality toggle and delay slider
+    st.markdown("### 🔧 Reality Settings")
+    col1, col2, col3 = st.columns([1, 2, 1])
+    
+    with col1:
+        show_reality = st.checkbox("Enable Reality View", value=True,
+                                   help="Compare optimistic vs realistic cash flow projections")
+    
+    with col2:
+        delay_days = st.slider(
+            "Customer Delay Factor (Days)",
+            min_value=0,
+            max_value=MAX_DELAY_DAYS,
+            value=30,
+            step=DELAY_STEP_DAYS,
+            help="Average days customers delay payment on pending invoices"
+        )
+    
+    with col3:
+        show_bands = st.checkbox("Show Monte Carlo Bands", value=False,
+                                 help="Simulate random delays (exponential, mean = delay factor) "
+                                      "and show the P10–P90 balance range")
+    
+    # Reality curves for every slider position and label masks, cached per dataset
+    with timed('get_delay_sweep'):
+        sweep = get_delay_sweep(transactions_df)
+    index = get_transaction_index(transactions_df)
+    
+    # Projections are computed once and shared by the metrics and the chart
+    with timed('build_projection'):
+        projection = build_projection(transactions_df, delay_days=delay_days, sweep=sweep)
+    
+    # Calculate metrics
+    with timed('calculate_metrics'):
+        metrics = calculate_metrics(transactions_df, delay_days, projection=projection, index=index)
+    
+    # Display key metrics
+    st.markdown("### 📊 Financial Health Dashboard")
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric(
+            label="Current Balance",
+            value=f"${metrics['current_balance']:,.0f}",
+            delta=None,
+            help="Total balance from all paid transactions"
+        )
+    
+    with col2:
+        delta_val = -metrics['projected_gap'] if show_reality else None
+        st.metric(
+            label="Projected Gap (30 Days)",
+            value=f"${metrics['projected_gap']:,.0f}",
+            delta=f"${delta_val:,.0f}" if delta_val else None,
+            delta_color="inverse",
+            help="Optimistic minus reality balance 30 days from today (or from the last transaction "
+                 "for historical ledgers)"
+        )
+    
+    with col3:
+        st.metric(
+            label="Risk Level",
+            value=metrics['risk_level'],
+            delta=None,
+            help="Risk assessment based on reality projection"
+        )
+    
+    # Dual-line visualization
+    st.markdown("### 📈 Cash Flow Projection: Optimistic vs Reality")
+    
+    if show_reality:
+        st.info(f"💡 **Reality Mode Active**: Pending invoices delayed by **{delay_days} days**. Toggle off to see optimistic view.")
+    else:
+        st.success("✅ **Optimistic Mode**: All invoices assumed paid on time.")
+    
+    bands = None
+    if show_bands:
+        delay_spec = {'distribution': 'exponential', 'mean': delay_days} if delay_days > 0 \
+            else {'distribution': 'fixed', 'days': 0}
+        with timed('get_simulation'):
+            bands = get_simulation(transactions_df, n_scenarios=SIMULATION_SCENARIOS, delay_spec=delay_spec)
+    
+    # The figure is cached per dataset, delay and mode
+    with timed('plot_dual_cash_flow'):
+        plot_dual_cash_flow(transactions_df, delay_days=delay_days, show_reality=show_reality,
+                            projection=projection, bands=bands)
+    
+    if bands is not None and bands.crunch_probability.max() > 0:
+        worst = bands.crunch_probability.argmax()
+        st.warning(f"🎲 **Crunch Probability**: up to **{bands.crunch_probability[worst]:.0%}** of simulated "
+                   f"scenarios go negative (peak on {bands.dates[worst].strftime('%Y-%m-%d')}).")
+    
+    # Low-balance alert: run-length encoded periods below the alert threshold
+    if show_reality:
+        with timed('crunch_alerts'):
+            crunches = projection.crunches(CASH_CRUNCH_ALERT_THRESHOLD)
+        if len(crunches):
+            st.warning(f"🚨 **Low Balance Alert**: the balance closes below **${CASH_CRUNCH_ALERT_THRESHOLD:,.0f}** "
+                       f"in **{len(crunches)}** period(s) totalling **{crunches.total_days()[0]:,} days**, first from "
+                       f"**{pd.Timestamp(crunches.start[0]).strftime('%Y-%m-%d')}** for "
+                       f"{crunches.duration_days[0]:,} days.")
+        with st.expander("🚨 First low-balance date by delay"):
+            earliest = sweep.earliest_crunches(CASH_CRUNCH_ALERT_THRESHOLD)
+            st.dataframe(
+                earliest.dt.strftime('%Y-%m-%d').fillna('No alert').rename('First Date Below Threshold').to_frame(),
+                use_container_width=True
+            )
+    
+    # Horizon outlook: every row comes from the same prefix sums as the metrics
+    st.markdown(f"### 🔭 Horizon Outlook (from {projection.as_of.strftime('%Y-%m-%d')})")
+    with timed('horizon_table'):
+        outlook = horizon_table(projection)
+    money = '${:,.0f}'
+    st.dataframe(
+        outlook.style.format({
+            'Date': lambda date: date.strftime('%Y-%m-%d'),
+            'Optimistic Balance': money,
+            'Reality Balance': money,
+            'Gap': money,
+            'Inflows': money,
+            'Outflows': money,
+            'Monthly Burn': money,
+            'Runway (Months)': lambda months: '∞' if months == float('inf') else f'{months:,.1f}'
+        }),
+        use_container_width=True,
+        hide_index=True
+    )
+
+
+def render_dashboard():
     # Page configuration
     st.set_page_config(
         page_title="FinFlow Reality - Cash Flow Intelligence",
@@ -45,24 +205,30 @@ def main():
     st.sidebar.title("⚙️ Configuration")
     
     # File upload
-    transactions_df = upload_file()
+    with timed('upload_file'):
+        transactions_df = upload_file()
     
     if transactions_df is not None:
-        # Reality toggle and delay slider
-        st.sidebar.markdown("---")
-        st.sidebar.subheader("🔧 Reality Settings")
-        
-        show_reality = st.sidebar.checkbox("Enable Reality View", value=True, 
-                                          help="Compare optimistic vs realistic cash flow projections")
+        # Multi-account uploads can be narrowed to some accounts without reloading
+        accounts = list(get_transaction_index(transactions_df).accounts)
+        if len(accounts) > 1:
+            st.sidebar.markdown("---")
+            st.sidebar.subheader("🏦 Accounts")
+            selected_accounts = st.sidebar.multiselect("Include accounts", accounts, default=accounts)
+            if selected_accounts:
+                transactions_df = select_accounts(transactions_df, selected_accounts)
+            else:
+                st.sidebar.warning("Select at least one account; showing all accounts.")
         
-        delay_days = st.sidebar.slider(
-            "Customer Delay Factor (Days)",
-            min_value=0,
-            max_value=90,
-            value=30,
-            step=5,
-            help="Average days customers delay payment on pending invoices"
-        )
+        # Mixed-currency ledgers are converted once per dataset and rate table
+        if CURRENCY_COLUMN in transactions_df:
+            try:
+                with timed('normalize_currency'):
+                    transactions_df = normalize_currency(transactions_df, get_fx_rates())
+                st.sidebar.caption(f"💱 Amounts converted to {DEFAULT_CURRENCY} using dated FX rates.")
+            except (OSError, ValueError) as e:
+                st.error(f"Error converting currencies: {str(e)}")
+                return
         
         # Peppol E-Invoicing info
         st.sidebar.markdown("---")
@@ -78,53 +244,17 @@ def main():
             helping SMEs get paid faster and plan better.
             """)
         
-        # Calculate metrics
-        metrics = calculate_metrics(transactions_df, delay_days)
-        
-        # Display key metrics
-        st.markdown("### 📊 Financial Health Dashboard")
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.metric(
-                label="Current Balance",
-                value=f"${metrics['current_balance']:,.0f}",
-                delta=None,
-                help="Total balance from all paid transactions"
-            )
-        
-        with col2:
-            delta_val = -metrics['projected_gap'] if show_reality else None
-            st.metric(
-                label="Projected Gap (30 Days)",
-                value=f"${metrics['projected_gap']:,.0f}",
-                delta=f"${delta_val:,.0f}" if delta_val else None,
-                delta_color="inverse",
-                help="Difference between optimistic and reality projections"
-            )
-        
-        with col3:
-            st.metric(
-                label="Risk Level",
-                value=metrics['risk_level'],
-                delta=None,
-                help="Risk assessment based on reality projection"
-            )
-        
-        # Dual-line visualization
-        st.markdown("### 📈 Cash Flow Projection: Optimistic vs Reality")
-        
-        if show_reality:
-            st.info(f"💡 **Reality Mode Active**: Pending invoices delayed by **{delay_days} days**. Toggle off to see optimistic view.")
-        else:
-            st.success("✅ **Optimistic Mode**: All invoices assumed paid on time.")
+        with timed('get_transaction_index'):
+            index = get_transaction_index(transactions_df)
         
-        plot_dual_cash_flow(transactions_df, delay_days=delay_days, show_reality=show_reality)
+        # Settings, metrics and chart rerun on their own when a reality setting changes
+        render_projection(transactions_df)
         
         # Top offenders table
         st.markdown("### 🎯 Top Offenders: Liquidity Locked by Customer")
         
-        top_offenders = get_top_offenders(transactions_df, top_n=5)
+        with timed('get_top_offenders'):
+            top_offenders = get_top_offenders(transactions_df, top_n=5, index=index)
         
         if len(top_offenders) > 0:
             st.dataframe(
@@ -138,23 +268,28 @@ def main():
         else:
             st.success("🎉 No pending invoices! All customers have paid on time.")
         
-        # Transaction data preview
-        with st.expander("📋 View Transaction Data"):
+        # Per-account breakdown for multi-account uploads
+        if len(index.accounts) > 1:
+            st.markdown("### 🏦 Accounts")
             st.dataframe(
-                transactions_df.style.format({'Amount': '${:,.0f}'}),
-                use_container_width=True
+                index.account_summary().style.format({'Current Balance': '${:,.0f}', 'Liquidity Locked': '${:,.0f}'}),
+                use_container_width=True,
+                hide_index=True
             )
+        
+        # Transaction data preview
+        with st.expander("📋 View Transaction Data"):
+            with timed('transaction_table'):
+                render_transaction_explorer(transactions_df)
             
             # Summary statistics
             col1, col2, col3 = st.columns(3)
             with col1:
                 st.metric("Total Transactions", len(transactions_df))
             with col2:
-                paid_count = len(transactions_df[transactions_df['Status'] == 'Paid'])
-                st.metric("Paid", paid_count)
+                st.metric("Paid", index.paid_count)
             with col3:
-                pending_count = len(transactions_df[transactions_df['Status'] == 'Pending'])
-                st.metric("Pending", pending_count)
+                st.metric("Pending", index.pending_count)
     
     else:
         # Welcome screen when no data loaded
@@ -186,5 +321,15 @@ def main():
 2023-01-10,TechVision Ltd,12000,Inflow,Pending""", language="csv")
 
 
+def main():
+    # Per-stage timings are only collected when the performance panel is on
+    mode = perf_debug_mode(PERF_DEBUG_MODE)
+    with recording(enabled=bool(mode), memory=mode == 'memory') as recorder:
+        render_dashboard()
+    if recorder is not None:
+        recorder.log()
+        render_perf_panel(recorder)
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
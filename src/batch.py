@@ -0,0 +1,191 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from config.settings import CASH_CRUNCH_ALERT_THRESHOLD, FX_RATES_FILE
+from utils.cash_flow_analyzer import analyze_cash_flow, build_projection, calculate_metrics, get_top_offenders
+from utils.data_processor import SNAPSHOT_EXTENSIONS, SNAPSHOT_SUFFIX, load_transactions
+from utils.fx import CURRENCY_COLUMN, get_fx_rates, normalize_currency
+from utils.transaction_index import TransactionIndex
+from utils.validation import ValidationReport
+
+LEDGER_EXTENSIONS = ('.csv',) + SNAPSHOT_EXTENSIONS
+
+
+def discover_ledgers(source):
+    """
+    List the ledger files to analyze.
+
+    Args:
+        source (str): A directory of ledger files, or a manifest file listing
+            one path per line (relative paths resolve against the manifest).
+
+    Returns:
+        list: Ledger file paths.
+    """
+    if os.path.isdir(source):
+        return sorted(
+            os.path.join(source, name) for name in os.listdir(source)
+            if name.endswith(LEDGER_EXTENSIONS) and not name.endswith(SNAPSHOT_SUFFIX)
+        )
+
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source) as manifest:
+        lines = (line.strip() for line in manifest)
+        return [os.path.join(base, line) for line in lines if line and not line.startswith('#')]
+
+
+def analyze_ledger(path, delay_days=30, top_n=5, use_snapshot=True, fx_rates=FX_RATES_FILE,
+                   crunch_threshold=CASH_CRUNCH_ALERT_THRESHOLD):
+    """
+    Run the dashboard analysis for one ledger, never raising.
+
+    Args:
+        path (str): Ledger file.
+        delay_days (int): Customer delay factor in days.
+        top_n (int): Number of top offenders to report.
+        use_snapshot (bool): Read and maintain columnar snapshots for CSVs.
+        fx_rates (str): FX rate file used when the ledger has a 'Currency' column.
+        crunch_threshold (float): Balance below which a day counts toward the crunch alert columns.
+
+    Returns:
+        dict: One results row; 'status' is 'error' when the ledger failed.
+    """
+    started = time.perf_counter()
+    row = {'ledger': os.path.basename(path), 'path': path, 'status': 'ok', 'error': None, 'rows': 0,
+           'rejected_rows': 0}
+    report = ValidationReport()
+    try:
+        transactions = load_transactions(path, use_snapshot=use_snapshot, report=report)
+        if CURRENCY_COLUMN in transactions:
+            transactions = normalize_currency(transactions, get_fx_rates(fx_rates))
+        index = TransactionIndex(transactions)
+        projection = build_projection(transactions, delay_days=delay_days)
+        metrics = calculate_metrics(transactions, delay_days, projection=projection, index=index)
+        crunches = projection.crunches(crunch_threshold)
+        offenders = get_top_offenders(transactions, top_n=top_n, index=index)
+        analysis = analyze_cash_flow(transactions, index=index)
+
+        row['rows'] = len(transactions)
+        row.update(metrics)
+        row.update({key: float(value) for key, value in analysis.items()})
+        row.update({
+            'crunch_periods': len(crunches),
+            'crunch_days': int(crunches.duration_days.sum()),
+            'first_crunch_date': str(crunches.start[0])[:10] if len(crunches) else None,
+            'crunch_low': float(crunches.min_balance.min()) if len(crunches) else None
+        })
+        row['top_offenders'] = json.dumps([
+            {'customer': str(customer), 'locked_amount': float(amount)}
+            for customer, amount in zip(offenders['Customer'], offenders['Locked Amount'])
+        ])
+    except Exception as e:
+        row['status'] = 'error'
+        row['error'] = f"{type(e).__name__}: {e}"
+    row['rejected_rows'] = report.rejected_rows
+    row['elapsed_seconds'] = time.perf_counter() - started
+    return row
+
+
+def _analyze_task(task):
+    return analyze_ledger(*task)
+
+
+def run_batch(paths, workers=None, chunksize=8, delay_days=30, top_n=5, use_snapshot=True,
+              fx_rates=FX_RATES_FILE, crunch_threshold=CASH_CRUNCH_ALERT_THRESHOLD):
+    """
+    Analyze many ledgers in parallel across processes.
+
+    Args:
+        paths (list): Ledger file paths.
+        workers (int): Worker processes; defaults to the CPU count. 1 runs inline.
+        chunksize (int): Ledgers handed to a worker per task submission.
+        delay_days (int): Customer delay factor in days.
+        top_n (int): Number of top offenders per ledger.
+        use_snapshot (bool): Read and maintain columnar snapshots for CSVs.
+        fx_rates (str): FX rate file for mixed-currency ledgers.
+        crunch_threshold (float): Low-balance alert threshold.
+
+    Returns:
+        DataFrame: One row per ledger, in input order.
+    """
+    tasks = [(path, delay_days, top_n, use_snapshot, fx_rates, crunch_threshold) for path in paths]
+    if workers == 1 or len(tasks) <= 1:
+        rows = [_analyze_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            rows = list(executor.map(_analyze_task, tasks, chunksize=chunksize))
+    return pd.DataFrame(rows)
+
+
+def write_results(results, output):
+    """Write the results table as Parquet, Feather or CSV depending on the extension."""
+    if output.endswith('.parquet'):
+        results.to_parquet(output, index=False)
+    elif output.endswith(('.feather', '.arrow')):
+        results.reset_index(drop=True).to_feather(output)
+    else:
+        results.to_csv(output, index=False)
+
+
+def summarize(results, elapsed):
+    """
+    Describe batch throughput.
+
+    Args:
+        results (DataFrame): Output of run_batch.
+        elapsed (float): Wall-clock seconds for the batch.
+
+    Returns:
+        str: Human-readable summary.
+    """
+    failed = int((results['status'] == 'error').sum())
+    rows = int(results['rows'].sum())
+    elapsed = max(elapsed, 1e-9)
+    return (
+        f"{len(results)} ledgers ({len(results) - failed} ok, {failed} failed), {rows:,} transactions "
+        f"in {elapsed:.2f}s: {len(results) / elapsed:,.1f} ledgers/s, {rows / elapsed:,.0f} rows/s"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless FinFlow Reality analysis over many ledgers.")
+    parser.add_argument('source', help="Directory of ledger files or a manifest listing one path per line")
+    parser.add_argument('-o', '--output', default='finflow_results.parquet',
+                        help="Results table (.parquet, .feather or .csv)")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--chunksize', type=int, default=8, help="Ledgers per task submission")
+    parser.add_argument('--delay-days', type=int, default=30, help="Customer delay factor in days")
+    parser.add_argument('--top-n', type=int, default=5, help="Top offenders per ledger")
+    parser.add_argument('--no-snapshot', action='store_true', help="Do not read or write columnar snapshots")
+    parser.add_argument('--fx-rates', default=FX_RATES_FILE,
+                        help="Date,Currency,Rate file for ledgers with a Currency column")
+    parser.add_argument('--crunch-threshold', type=float, default=CASH_CRUNCH_ALERT_THRESHOLD,
+                        help="Balance below which a day counts as a cash crunch")
+    args = parser.parse_args(argv)
+
+    paths = discover_ledgers(args.source)
+    if not paths:
+        print(f"No ledger files found in {args.source}", file=sys.stderr)
+        return 1
+
+    started = time.perf_counter()
+    results = run_batch(paths, workers=args.workers, chunksize=args.chunksize, delay_days=args.delay_days,
+                        top_n=args.top_n, use_snapshot=not args.no_snapshot, fx_rates=args.fx_rates,
+                        crunch_threshold=args.crunch_threshold)
+    elapsed = time.perf_counter() - started
+
+    write_results(results, args.output)
+    print(summarize(results, elapsed))
+    failures = results[results['status'] == 'error']
+    for path, error in zip(failures['path'], failures['error']):
+        print(f"  failed: {path}: {error}", file=sys.stderr)
+    return 1 if len(failures) == len(results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
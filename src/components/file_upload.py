@@ -1,31 +1,112 @@
 import pandas as pd
 import streamlit as st
-from utils.data_processor import load_and_process_csv, generate_mock_data
+from config.settings import EINVOICE_FILE_TYPES, LEDGER_STORE_PATH, SUPPORTED_FILE_TYPES
+from utils.data_processor import generate_mock_data
+from utils.ingest_cache import cached_load_accounts
+from utils.fx import CURRENCY_COLUMN, get_fx_rates, normalize_currency
+from utils.ledger_store import get_ledger_store
+from utils.validation import DataValidationError
+
+SAMPLE_DATA_KEY = 'sample_data'
+UPLOAD_SOURCE = "Upload"
+STORE_SOURCE = "Ledger store"
+
+
+def load_from_store(store):
+    """
+    Sidebar controls for reading the ledger store.
+
+    Per-day aggregates are loaded by default (see LedgerStore.load),
+    optionally limited to a date range. Balances and metrics are the same
+    either way, but the payment-delay simulation and the transaction
+    explorer then see daily totals, so single transactions can be loaded
+    instead.
+
+    Args:
+        store (LedgerStore): Store to read.
+
+    Returns:
+        DataFrame or None: Stored transactions, or None for an empty store.
+    """
+    span = store.date_span()
+    if span is None:
+        st.sidebar.info("The ledger store is empty; upload files and save them to the store.")
+        return None
+
+    first, last = span[0].date(), span[1].date()
+    date_range = st.sidebar.date_input("Stored date range", value=(first, last), min_value=first, max_value=last)
+    start = date_range[0] if len(date_range) > 0 else None
+    end = date_range[1] if len(date_range) > 1 else None
+
+    aggregate = not st.sidebar.checkbox(
+        "Load individual transactions", value=False,
+        help="Daily aggregates keep memory small; individual transactions give the payment-delay "
+             "simulation and the transaction explorer one row per invoice.")
+    df = store.load(start=start, end=end, aggregate=aggregate)
+    if aggregate:
+        st.sidebar.success(f"✅ Loaded {len(store):,} stored transactions as {len(df):,} daily aggregates")
+    else:
+        st.sidebar.success(f"✅ Loaded {len(df):,} stored transactions")
+    return df
+
+
+def save_to_store(store, df):
+    """Offer to upsert the current upload into the ledger store (in the reporting currency)."""
+    if st.sidebar.button("💾 Save to ledger store"):
+        if CURRENCY_COLUMN in df:
+            df = normalize_currency(df, get_fx_rates())
+        written = store.upsert(df)
+        st.sidebar.success(f"Saved {written:,} transactions ({len(store):,} stored)")
 
 
 def upload_file():
     """
-    Handle CSV file upload and return processed DataFrame.
+    Handle CSV, columnar snapshot or Peppol invoice uploads and return processed DataFrame.
+    
+    Several files (one per bank account or entity) are parsed concurrently
+    and merged in date order, with each row tagged in an 'Account' column.
     
     Returns:
         DataFrame or None: Processed transaction data.
     """
     st.sidebar.header("📊 Data Source")
     
-    uploaded_file = st.sidebar.file_uploader("Upload Transaction CSV", type="csv")
+    # With a configured ledger store, read from it or save uploads to it
+    store = get_ledger_store() if LEDGER_STORE_PATH else None
+    if store is not None:
+        source = st.sidebar.radio("Source", [UPLOAD_SOURCE, STORE_SOURCE], horizontal=True)
+        if source == STORE_SOURCE:
+            return load_from_store(store)
+    
+    uploaded_files = st.sidebar.file_uploader("Upload Transaction CSVs, Snapshots or Peppol Invoices (one per account)",
+                                              type=SUPPORTED_FILE_TYPES + EINVOICE_FILE_TYPES,
+                                              accept_multiple_files=True,
+                                              help="Peppol/UBL invoices: one XML file or a zip of them per account")
     
-    if uploaded_file is not None:
+    if uploaded_files:
         try:
-            df = load_and_process_csv(uploaded_file)
-            st.sidebar.success(f"✅ Loaded {len(df)} transactions")
+            df = cached_load_accounts(uploaded_files)
+            st.sidebar.success(f"✅ Loaded {len(df)} transactions from {len(uploaded_files)} account(s)")
+            if store is not None:
+                save_to_store(store, df)
             return df
+        except DataValidationError as e:
+            st.sidebar.error(f"File rejected: {str(e)}")
+            st.sidebar.dataframe(e.report.to_frame(), hide_index=True)
+            return None
         except Exception as e:
             st.sidebar.error(f"Error loading file: {str(e)}")
             return None
     
-    # Sample data button
+    # Sample data button; the frame is kept in the session so later reruns keep it
     if st.sidebar.button("🎲 Load Sample Data (50 Transactions)"):
         sample_data = generate_mock_data()
+        # Parse the generated date strings once instead of in every analyzer call
+        sample_data['Date'] = pd.to_datetime(sample_data['Date'])
+        st.session_state[SAMPLE_DATA_KEY] = sample_data
+    
+    sample_data = st.session_state.get(SAMPLE_DATA_KEY)
+    if sample_data is not None:
         st.sidebar.success(f"✅ Loaded {len(sample_data)} sample transactions")
         return sample_data
     
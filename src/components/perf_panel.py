@@ -0,0 +1,43 @@
+import pandas as pd
+import streamlit as st
+from utils.profiling import prometheus_text
+
+
+def perf_debug_mode(default=''):
+    """
+    Resolve the performance panel mode from the ``?perf=`` query parameter.
+
+    Args:
+        default (str): Mode used when the URL does not set one (PERF_DEBUG_MODE).
+
+    Returns:
+        str: '' (off), '1' (timings) or 'memory' (timings and traced memory).
+    """
+    mode = st.query_params.get('perf', default)
+    return mode if mode in ('1', 'memory') else ''
+
+
+def render_perf_panel(recorder):
+    """
+    Show the per-stage breakdown of the current rerun in the sidebar.
+
+    Args:
+        recorder (PerfRecorder): Finished recorder of this rerun.
+    """
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        st.caption(f"Rerun total: {recorder.total_seconds * 1000:,.1f} ms")
+        rows = recorder.to_rows()
+        if not rows:
+            st.caption("No instrumented stages ran.")
+            return
+
+        breakdown = pd.DataFrame({
+            'Stage': ['  ' * row['depth'] + row['stage'] for row in rows],
+            'ms': [row['seconds'] * 1000 for row in rows]
+        })
+        if recorder.memory:
+            breakdown['Peak MiB'] = [
+                row['peak_bytes'] / 2**20 if row['peak_bytes'] is not None else None for row in rows
+            ]
+        st.dataframe(breakdown, hide_index=True, use_container_width=True)
+        st.code(prometheus_text(recorder), language="text")
@@ -0,0 +1,70 @@
+import streamlit as st
+from utils.explorer import DEFAULT_PAGE_SIZE, SORTABLE_COLUMNS, ExplorerQuery, get_explorer
+
+PAGE_SIZES = [25, DEFAULT_PAGE_SIZE, 100, 250]
+
+
+@st.fragment
+def render_transaction_explorer(transactions_df):
+    """
+    Filterable, sortable and paginated transaction table.
+
+    Runs as a fragment so paging and filtering rerun only this section;
+    filtering and sorting happen on precomputed indexes and only the visible
+    page is formatted and sent to the browser.
+
+    Args:
+        transactions_df (DataFrame): Transaction data.
+    """
+    explorer = get_explorer(transactions_df)
+    index = explorer.index
+
+    # Column filters
+    col1, col2, col3, col4 = st.columns([2, 2, 1, 1])
+    with col1:
+        first, last = transactions_df['Date'].min(), transactions_df['Date'].max()
+        date_range = st.date_input("Date range", value=(first.date(), last.date()),
+                                   min_value=first.date(), max_value=last.date())
+    with col2:
+        customers = st.multiselect("Customer / Vendor", sorted(index.customers.astype(str)))
+    with col3:
+        types = st.multiselect("Type", sorted(index.type_labels.astype(str)))
+    with col4:
+        statuses = st.multiselect("Status", sorted(index.status_labels.astype(str)))
+
+    # Sorting and page size
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        sort_by = st.selectbox("Sort by", SORTABLE_COLUMNS)
+    with col2:
+        ascending = st.toggle("Ascending", value=True)
+    with col3:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE))
+
+    # A partially picked range (start only) filters from the start date on
+    start = date_range[0] if len(date_range) > 0 else None
+    end = date_range[1] if len(date_range) > 1 else None
+    rows = explorer.select(ExplorerQuery(
+        start=start,
+        end=end,
+        customers=customers or None,
+        types=types or None,
+        statuses=statuses or None,
+        sort_by=sort_by,
+        ascending=ascending
+    ))
+
+    n_pages = max(1, -(-len(rows) // page_size))
+    page = st.number_input(f"Page (of {n_pages:,})", min_value=1, max_value=n_pages, value=1, step=1)
+
+    # Only the visible page is styled
+    st.dataframe(
+        explorer.page(rows, page, page_size).style.format({'Amount': '${:,.0f}'}),
+        use_container_width=True
+    )
+
+    summary = explorer.summary(rows)
+    first_row = (page - 1) * page_size + 1 if len(rows) else 0
+    st.caption(f"Rows {first_row:,}–{min(page * page_size, len(rows)):,} of {summary['rows']:,} matching · "
+               f"Inflows ${summary['inflow']:,.0f} · Outflows ${summary['outflow']:,.0f} · "
+               f"Net ${summary['net']:,.0f}")
@@ -1,28 +1,53 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
 import plotly.graph_objs as go
 import pandas as pd
 import streamlit as st
-from utils.cash_flow_analyzer import calculate_cumulative_cash_flow
+from config.settings import CHART_POINT_BUDGET, WEBGL_POINT_THRESHOLD
+from utils.cash_flow_analyzer import build_projection
+from utils.downsampling import daily_end_of_day, downsample_indices, downsample_series
+from utils.hashing import frame_fingerprint
+
+_FIGURE_CACHE_SIZE = 64  # Downsampled figures are small; covers every delay x mode of a few datasets
+_figure_cache = OrderedDict()
+_figure_lock = threading.Lock()
+
+
+def _chart_series(dates, balance):
+    """Aggregate a curve to end-of-day balances and downsample it to the point budget."""
+    return downsample_series(daily_end_of_day(dates, balance), CHART_POINT_BUDGET)
+
+
+def _scatter(n_points, **kwargs):
+    """Use WebGL rendering once a trace gets large."""
+    trace_cls = go.Scattergl if n_points > WEBGL_POINT_THRESHOLD else go.Scatter
+    return trace_cls(**kwargs)
 
 
-def plot_dual_cash_flow(transactions, delay_days=0, show_reality=True):
+def build_dual_cash_flow_figure(projection, show_reality=True, bands=None):
     """
-    Plot dual-line cash flow: Optimistic vs Reality with cash crunch highlighting.
+    Build the dual-line Optimistic vs Reality figure for a projection.
     
     Args:
-        transactions (DataFrame): Transaction data.
-        delay_days (int): Customer delay factor in days.
-        show_reality (bool): Whether to show the reality line.
+        projection (CashFlowProjection): Both curves for one delay.
+        show_reality (bool): Whether to draw the reality line and crunch markers.
+        bands (SimulationResult): Optional Monte Carlo bands.
+        
+    Returns:
+        Figure: The Plotly figure.
     """
-    # Calculate both scenarios
-    dates_opt, balance_opt = calculate_cumulative_cash_flow(transactions, delay_days=0, reality_mode=False)
-    dates_real, balance_real = calculate_cumulative_cash_flow(transactions, delay_days=delay_days, reality_mode=True)
+    optimistic = _chart_series(projection.optimistic_dates, projection.optimistic_balance)
+    reality = _chart_series(projection.reality_dates, projection.reality_balance)
     
     fig = go.Figure()
     
     # Line A: Optimistic (all invoices paid on time)
-    fig.add_trace(go.Scatter(
-        x=dates_opt,
-        y=balance_opt,
+    fig.add_trace(_scatter(
+        len(optimistic),
+        x=optimistic.index,
+        y=optimistic.values,
         mode='lines',
         name='📈 Optimistic (On-Time Payment)',
         line=dict(color='#2ECC71', width=2),
@@ -31,9 +56,10 @@ def plot_dual_cash_flow(transactions, delay_days=0, show_reality=True):
     
     # Line B: Reality (with delay factor)
     if show_reality:
-        fig.add_trace(go.Scatter(
-            x=dates_real,
-            y=balance_real,
+        fig.add_trace(_scatter(
+            len(reality),
+            x=reality.index,
+            y=reality.values,
             mode='lines',
             name='⚠️ Reality (With Delays)',
             line=dict(color='#E74C3C', width=2, dash='dash'),
@@ -41,20 +67,22 @@ def plot_dual_cash_flow(transactions, delay_days=0, show_reality=True):
         ))
         
         # Highlight cash crunch zones (where reality line goes negative)
-        cash_crunch_mask = balance_real < 0
-        if cash_crunch_mask.any():
-            crunch_dates = dates_real[cash_crunch_mask]
-            crunch_values = balance_real[cash_crunch_mask]
-            
-            fig.add_trace(go.Scatter(
-                x=crunch_dates,
-                y=crunch_values,
+        crunch = reality[reality < 0]
+        if not crunch.empty:
+            fig.add_trace(_scatter(
+                len(crunch),
+                x=crunch.index,
+                y=crunch.values,
                 mode='markers',
                 name='🔴 Cash Crunch',
                 marker=dict(color='red', size=10, symbol='x'),
                 hovertemplate='<b>CASH CRUNCH!</b><br>Date: %{x}<br>Balance: $%{y:,.0f}<extra></extra>'
             ))
     
+    # Monte Carlo delay bands
+    if bands is not None:
+        _add_simulation_bands(fig, bands)
+    
     # Add zero line
     fig.add_hline(y=0, line_dash="dot", line_color="gray", annotation_text="Break-even")
     
@@ -73,16 +101,117 @@ def plot_dual_cash_flow(transactions, delay_days=0, show_reality=True):
             x=1
         )
     )
+    return fig
+
+
+def get_dual_cash_flow_figure(transactions, delay_days=0, show_reality=True, sweep=None, projection=None,
+                              bands=None):
+    """
+    Return the dual-line figure, reusing a cached one for the same dataset,
+    delay and mode so toggles and revisited slider positions skip trace building.
     
+    Args:
+        transactions (DataFrame): Transaction data.
+        delay_days (int): Customer delay factor in days.
+        show_reality (bool): Whether to show the reality line.
+        sweep (DelaySweep): Optional precomputed curves for this dataset.
+        projection (CashFlowProjection): Optional projection for ``delay_days``.
+        bands (SimulationResult): Optional Monte Carlo bands; cached results
+            from get_simulation are reused objects, so they are matched by identity.
+        
+    Returns:
+        Figure: Shared figure object; treat it as read-only.
+    """
+    # The optimistic-only chart does not depend on the delay
+    key = (frame_fingerprint(transactions), delay_days if show_reality or bands is not None else None,
+           show_reality, bands is not None)
+    with _figure_lock:
+        entry = _figure_cache.get(key)
+        if entry is not None and entry[1] is bands:
+            _figure_cache.move_to_end(key)
+            return entry[0]
+    
+    if projection is None:
+        projection = build_projection(transactions, delay_days=delay_days, sweep=sweep)
+    fig = build_dual_cash_flow_figure(projection, show_reality=show_reality, bands=bands)
+    with _figure_lock:
+        _figure_cache[key] = (fig, bands)
+        _figure_cache.move_to_end(key)
+        while len(_figure_cache) > _FIGURE_CACHE_SIZE:
+            _figure_cache.popitem(last=False)
+    return fig
+
+
+def plot_dual_cash_flow(transactions, delay_days=0, show_reality=True, sweep=None, projection=None, bands=None):
+    """
+    Plot dual-line cash flow: Optimistic vs Reality with cash crunch highlighting.
+    
+    Args:
+        transactions (DataFrame): Transaction data.
+        delay_days (int): Customer delay factor in days.
+        show_reality (bool): Whether to show the reality line.
+        sweep (DelaySweep): Optional precomputed curves for this dataset.
+        projection (CashFlowProjection): Optional projection already built for
+            this rerun; when given, no curves are recomputed.
+        bands (SimulationResult): Optional Monte Carlo result drawn as a
+            P10-P90 band with a P50 line.
+    """
+    fig = get_dual_cash_flow_figure(transactions, delay_days=delay_days, show_reality=show_reality,
+                                    sweep=sweep, projection=projection, bands=bands)
     st.plotly_chart(fig, use_container_width=True)
     
+    if show_reality and projection is None:
+        projection = build_projection(transactions, delay_days=delay_days, sweep=sweep)
+    
     # Cash crunch warning
-    if show_reality and (balance_real < 0).any():
-        min_balance = balance_real.min()
-        min_date = dates_real[balance_real.idxmin()]
+    if show_reality and projection.has_crunch:
+        min_balance = projection.min_balance
+        min_date = projection.min_date
         st.error(f"⚠️ **Cash Crunch Warning**: Your balance will drop to **${min_balance:,.0f}** on **{min_date.strftime('%Y-%m-%d')}** if delays persist!")
 
 
+def _band_points(bands):
+    """Downsample the bands to the point budget, picking the points on the P10 curve."""
+    x = bands.dates.to_numpy().astype('datetime64[ns]').astype(np.int64)
+    keep = downsample_indices(x, bands.p10, CHART_POINT_BUDGET, bands.threshold)
+    return bands.dates[keep], bands.p10[keep], bands.p50[keep], bands.p90[keep]
+
+
+def _add_simulation_bands(fig, bands):
+    """Draw P10-P90 as a shaded band and P50 as a dotted line."""
+    dates, p10, p50, p90 = _band_points(bands)
+    n_points = len(dates)
+    fig.add_trace(_scatter(
+        n_points,
+        x=dates,
+        y=p90,
+        mode='lines',
+        line=dict(width=0),
+        showlegend=False,
+        hoverinfo='skip'
+    ))
+    fig.add_trace(_scatter(
+        n_points,
+        x=dates,
+        y=p10,
+        mode='lines',
+        line=dict(width=0),
+        fill='tonexty',
+        fillcolor='rgba(231, 76, 60, 0.15)',
+        name=f'🎲 P10–P90 ({bands.n_scenarios:,} scenarios)',
+        hovertemplate='<b>P10</b><br>Date: %{x}<br>Balance: $%{y:,.0f}<extra></extra>'
+    ))
+    fig.add_trace(_scatter(
+        n_points,
+        x=dates,
+        y=p50,
+        mode='lines',
+        name='🎲 Median (P50)',
+        line=dict(color='#C0392B', width=1, dash='dot'),
+        hovertemplate='<b>P50</b><br>Date: %{x}<br>Balance: $%{y:,.0f}<extra></extra>'
+    ))
+
+
 def plot_cash_flow(transactions):
     """
     Legacy function for backward compatibility - plots simple cumulative cash flow.
@@ -95,10 +224,12 @@ def plot_cash_flow(transactions):
     transactions.sort_values('Date', inplace=True)
 
     cumulative_cash_flow = transactions.groupby('Date')['Amount'].sum().cumsum()
+    cumulative_cash_flow = downsample_series(cumulative_cash_flow, CHART_POINT_BUDGET)
     cash_crunch = cumulative_cash_flow[cumulative_cash_flow < 0]
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(
+    fig.add_trace(_scatter(
+        len(cumulative_cash_flow),
         x=cumulative_cash_flow.index,
         y=cumulative_cash_flow,
         mode='lines',
@@ -106,7 +237,8 @@ def plot_cash_flow(transactions):
     ))
     
     if not cash_crunch.empty:
-        fig.add_trace(go.Scatter(
+        fig.add_trace(_scatter(
+            len(cash_crunch),
             x=cash_crunch.index,
             y=cash_crunch,
             mode='markers',
@@ -1,9 +1,34 @@
 # Configuration settings for the FinFlow Reality application
+import os
 
 # Default values for the application settings
 CUSTOMER_DELAY_FACTOR = 1.5
-DEFAULT_CURRENCY = "USD"
+# The delay sweep holds a row order (int32) and a balance (int64) per step, about
+# 12 bytes x rows x (MAX_DELAY_DAYS / DELAY_STEP_DAYS + 1): ~460 MB for 2M rows with
+# the defaults. Cached sweeps are kept within INGEST_CACHE_BUDGET_MB (the latest always stays).
+MAX_DELAY_DAYS = 90  # Upper bound of the customer delay slider
+DELAY_STEP_DAYS = 5  # Delay slider step; the delay sweep precomputes every step
+SIMULATION_SCENARIOS = 1000  # Monte Carlo scenarios behind the delay bands
+PROJECTION_HORIZON_DAYS = 30  # Horizon of the projected gap and risk level
+FORECAST_HORIZONS_DAYS = (30, 60, 90)  # Rows of the dashboard horizon table
+DEFAULT_CURRENCY = "USD"  # Reporting currency of mixed-currency ledgers
+FX_BASE_CURRENCY = "USD"  # Currency the FX rate file is quoted in
+FX_RATES_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                             'data', 'fx_rates.csv')
 MAX_UPLOAD_SIZE_MB = 5
-SUPPORTED_FILE_TYPES = ['csv']
+INGEST_CACHE_BUDGET_MB = MAX_UPLOAD_SIZE_MB * 20  # Cleaned frames kept in memory across sessions
+CHART_POINT_BUDGET = 2000  # Max points per chart line after downsampling
+WEBGL_POINT_THRESHOLD = 1000  # Render with Scattergl above this many points
+SUPPORTED_FILE_TYPES = ['csv', 'feather', 'arrow', 'parquet']
+EINVOICE_FILE_TYPES = ['xml', 'zip']  # Peppol/UBL invoices, one per XML file or zipped
+PEPPOL_OWN_PARTY = os.environ.get('FINFLOW_PEPPOL_PARTY', '')  # Our endpoint/VAT ids, comma separated; empty treats every invoice as issued by us
 DATA_CLEANING_THRESHOLD = 0.1  # 10% threshold for cleaning data
-CASH_CRUNCH_ALERT_THRESHOLD = 1000  # Alert if cash balance goes below this amount
\ No newline at end of file
+CASH_CRUNCH_ALERT_THRESHOLD = 1000  # Alert if cash balance goes below this amount
+LEDGER_STORE_PATH = os.environ.get('FINFLOW_LEDGER_DB', '')  # SQLite ledger store; empty disables it
+SERVICE_HOST = os.environ.get('FINFLOW_SERVICE_HOST', '127.0.0.1')  # Analysis service bind address
+SERVICE_PORT = int(os.environ.get('FINFLOW_SERVICE_PORT', '8765'))
+SERVICE_MAX_CONCURRENT = 4  # Analyses running at once in the service worker pool
+SERVICE_MAX_QUEUE = 64  # Requests waiting for a worker before the service answers 503
+SERVICE_RESULT_CACHE_SIZE = 512  # Analysis results kept per (dataset, analysis, parameters)
+SERVICE_MAX_BODY_MB = 100  # Largest ledger upload the service accepts
+PERF_DEBUG_MODE = os.environ.get('FINFLOW_PERF', '')  # '1' shows the performance panel, 'memory' also samples memory
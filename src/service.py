@@ -0,0 +1,594 @@
+import argparse
+import asyncio
+import bisect
+import functools
+import json
+import logging
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+from config.settings import (
+    CHART_POINT_BUDGET,
+    INGEST_CACHE_BUDGET_MB,
+    MAX_DELAY_DAYS,
+    PROJECTION_HORIZON_DAYS,
+    SERVICE_HOST,
+    SERVICE_MAX_BODY_MB,
+    SERVICE_MAX_CONCURRENT,
+    SERVICE_MAX_QUEUE,
+    SERVICE_PORT,
+    SERVICE_RESULT_CACHE_SIZE,
+    SUPPORTED_FILE_TYPES,
+)
+from utils.cash_flow_analyzer import (
+    build_projection,
+    calculate_cumulative_cash_flow,
+    calculate_metrics,
+    get_delay_sweep,
+    get_top_offenders,
+)
+from utils.data_processor import load_and_process_csv, load_transactions, read_snapshot
+from utils.downsampling import daily_end_of_day, downsample_series
+from utils.fx import CURRENCY_COLUMN, normalize_currency
+from utils.hashing import content_hash
+from utils.ingest_cache import cached_load_csv
+from utils.transaction_index import get_transaction_index
+from utils.validation import DataValidationError
+
+logger = logging.getLogger('finflow.service')
+
+ANALYSES = ('metrics', 'offenders', 'cash-flow')
+ROUTES = ('/health', '/stats', '/metrics') + tuple(f'/v1/{kind}' for kind in ANALYSES)
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_REASONS = {
+    200: 'OK', 400: 'Bad Request', 403: 'Forbidden', 404: 'Not Found', 405: 'Method Not Allowed',
+    411: 'Length Required', 413: 'Payload Too Large', 422: 'Unprocessable Entity',
+    500: 'Internal Server Error', 503: 'Service Unavailable'
+}
+
+
+# Analysis jobs: module-level so process pools can pickle them
+
+def load_source(source):
+    """
+    Load the transactions behind a request, reusing this worker's ingest cache.
+
+    Args:
+        source (tuple): ('bytes', data, format) for uploads or ('path', path) for references.
+
+    Returns:
+        DataFrame: Cleaned transactions in the reporting currency.
+    """
+    if source[0] == 'bytes':
+        _, data, file_format = source
+        loader = load_and_process_csv if file_format == 'csv' else read_snapshot
+        transactions = cached_load_csv(data, loader=loader)
+    else:
+        transactions = load_transactions(source[1])
+    if CURRENCY_COLUMN in transactions:
+        transactions = normalize_currency(transactions)
+    return transactions
+
+
+def run_analysis(kind, source, params):
+    """
+    Run one analysis; executed in the service's worker pool.
+
+    Args:
+        kind (str): One of ANALYSES.
+        source (tuple): See load_source.
+        params (dict): Validated query parameters.
+
+    Returns:
+        dict: JSON-ready result.
+    """
+    transactions = load_source(source)
+    result = {'rows': len(transactions)}
+    if kind == 'offenders':
+        offenders = get_top_offenders(transactions, top_n=params['top_n'], index=get_transaction_index(transactions))
+        result['top_offenders'] = [
+            {'customer': str(customer), 'locked_amount': float(amount)}
+            for customer, amount in zip(offenders['Customer'], offenders['Locked Amount'])
+        ]
+        return result
+
+    # The delay sweep is cached per dataset, so other delays of the same ledger are lookups
+    sweep = get_delay_sweep(transactions)
+    if kind == 'metrics':
+        projection = build_projection(transactions, delay_days=params['delay_days'], sweep=sweep)
+        metrics = calculate_metrics(transactions, params['delay_days'], projection=projection,
+                                    index=get_transaction_index(transactions), horizon_days=params['horizon_days'])
+        result['metrics'] = {key: value if isinstance(value, str) else float(value) for key, value in metrics.items()}
+        return result
+
+    dates, balance = calculate_cumulative_cash_flow(transactions, delay_days=params['delay_days'],
+                                                    reality_mode=bool(params['reality']), sweep=sweep)
+    curve = downsample_series(daily_end_of_day(dates, balance), params['points'])
+    result['cash_flow'] = {
+        'dates': [date.strftime('%Y-%m-%d') for date in curve.index],
+        'balance': np.round(curve.to_numpy(dtype=np.float64), 2).tolist()
+    }
+    return result
+
+
+def _parse_params(kind, query):
+    """Validate the query parameters of an analysis; unknown parameters are ignored."""
+    def integer(name, default, low, high):
+        raw = query.get(name, [default])[-1]
+        try:
+            value = int(raw)
+        except (TypeError, ValueError):
+            raise HttpError(400, f"{name} must be an integer") from None
+        if not low <= value <= high:
+            raise HttpError(400, f"{name} must be between {low} and {high}")
+        return value
+
+    if kind == 'offenders':
+        return {'top_n': integer('top_n', 5, 1, 1000)}
+    params = {'delay_days': integer('delay_days', 30, 0, 10 * MAX_DELAY_DAYS)}
+    if kind == 'metrics':
+        params['horizon_days'] = integer('horizon_days', PROJECTION_HORIZON_DAYS, 1, 3650)
+    if kind == 'cash-flow':
+        params['reality'] = integer('reality', 1, 0, 1)
+        params['points'] = integer('points', CHART_POINT_BUDGET, 2, 100_000)
+    return params
+
+
+# HTTP plumbing
+
+class HttpError(Exception):
+    """An error answered with ``status`` and a JSON body."""
+
+    def __init__(self, status, message, **details):
+        super().__init__(message)
+        self.status = status
+        self.payload = {'error': message, **details}
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    query: dict
+    headers: dict
+    body: bytes
+    keep_alive: bool
+
+
+async def read_request(reader, max_body_bytes):
+    """
+    Parse one HTTP/1.1 request from a stream.
+
+    Returns:
+        Request or None: None when the client closed the connection.
+
+    Raises:
+        HttpError: For malformed, chunked or oversized requests.
+    """
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, target, version = line.decode('latin-1').split()
+    except ValueError:
+        raise HttpError(400, "Malformed request line") from None
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if 'transfer-encoding' in headers:
+        raise HttpError(411, "Send the body with a Content-Length")
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise HttpError(400, "Invalid Content-Length") from None
+    if length > max_body_bytes:
+        raise HttpError(413, f"Body exceeds {max_body_bytes:,} bytes")
+    body = await reader.readexactly(length) if length else b''
+
+    connection = headers.get('connection', '').lower()
+    keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+    url = urlsplit(target)
+    return Request(method.upper(), url.path, parse_qs(url.query), headers, body, keep_alive)
+
+
+def _response(status, body, content_type='application/json', keep_alive=True, headers=None):
+    head = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    head.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+    return ("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + body
+
+
+def _route_label(path):
+    """Latency label for a path; unknown paths share one label so the histograms stay bounded."""
+    return path if path in ROUTES else 'other'
+
+
+def _json(payload):
+    return json.dumps(payload, separators=(',', ':')).encode()
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (Prometheus style), updated from the event loop only."""
+
+    __slots__ = ('counts', 'count', 'total')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the ``q`` quantile (inf past the last bucket)."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float('inf'),), self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return float('inf')
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'mean_seconds': self.total / self.count if self.count else 0.0,
+            'p50_seconds': self.quantile(0.5),
+            'p95_seconds': self.quantile(0.95),
+            'p99_seconds': self.quantile(0.99)
+        }
+
+
+class LruCache:
+    """Entry- or byte-bounded LRU mapping with hit/miss/eviction counters."""
+
+    def __init__(self, max_entries=None, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value, nbytes=0):
+        if key in self._entries:
+            self.current_bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, nbytes)
+        self.current_bytes += nbytes
+        while self._entries and ((self.max_entries is not None and len(self._entries) > self.max_entries)
+                                 or (self.max_bytes is not None and self.current_bytes > self.max_bytes)):
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted
+            self.evictions += 1
+
+    def stats(self):
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'bytes': self.current_bytes}
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class AnalysisService:
+    """
+    Asyncio HTTP/JSON front end for the headless analytics.
+
+    The event loop only parses requests and serves cached results; analyses
+    run in a thread (or process) pool. Results are cached per (dataset
+    hash, analysis, parameters) in an LRU, identical requests already in
+    flight share one job, at most ``max_concurrent`` jobs run at once and
+    at most ``max_queue`` wait, beyond which the service answers 503.
+
+    Routes:
+        POST /v1/metrics?delay_days=30&horizon_days=30
+                                             calculate_metrics
+        POST /v1/offenders?top_n=5           get_top_offenders
+        POST /v1/cash-flow?delay_days=30&reality=1&points=2000
+                                             calculate_cumulative_cash_flow (end of day, downsampled)
+        GET  /health, /stats (JSON), /metrics (Prometheus text)
+
+    Analysis bodies are raw ledger bytes (``?format=csv|parquet|feather|arrow``)
+    or JSON ``{"dataset": "<id>"}`` (a previous upload) or ``{"path": "..."}``
+    (a file under ``data_root``; references are disabled without one).
+    """
+
+    def __init__(self, workers=None, processes=False, max_concurrent=SERVICE_MAX_CONCURRENT,
+                 max_queue=SERVICE_MAX_QUEUE, cache_size=SERVICE_RESULT_CACHE_SIZE, data_root=None,
+                 max_body_bytes=SERVICE_MAX_BODY_MB * 1024 * 1024):
+        workers = workers or max_concurrent
+        self.executor = ProcessPoolExecutor(workers) if processes else ThreadPoolExecutor(workers)
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.data_root = os.path.realpath(data_root) if data_root else None
+        self.max_body_bytes = max_body_bytes
+        self.results = LruCache(max_entries=cache_size)
+        # Raw uploads by dataset id, so clients can reference a ledger instead of resending it
+        self.datasets = LruCache(max_bytes=INGEST_CACHE_BUDGET_MB * 1024 * 1024)
+        self.latency = {}
+        self.rejected = 0
+        self.active = 0
+        self._waiting = 0
+        self._inflight = {}
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._server = None
+        self._connections = set()
+
+    # Connection handling
+
+    async def handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                started = time.perf_counter()
+                request = None
+                try:
+                    request = await read_request(reader, self.max_body_bytes)
+                    if request is None:
+                        break
+                    route = _route_label(request.path)
+                    status, body, content_type, headers = await self.dispatch(request)
+                except HttpError as e:
+                    route = _route_label(request.path) if request is not None else 'invalid'
+                    status, body, content_type, headers = e.status, _json(e.payload), 'application/json', {}
+                    if status == 503:
+                        headers = {'Retry-After': '1'}
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception:
+                    logger.exception("Request to %s failed", request.path if request is not None else '?')
+                    route = _route_label(request.path) if request is not None else 'invalid'
+                    status, body, content_type, headers = 500, _json({'error': "Internal error"}), 'application/json', {}
+                # A rejected body may still be unread, so the connection cannot be reused
+                keep_alive = request is not None and request.keep_alive
+                writer.write(_response(status, body, content_type, keep_alive, headers))
+                await writer.drain()
+                self.latency.setdefault(route, LatencyHistogram()).observe(time.perf_counter() - started)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def dispatch(self, request):
+        """Route a request; returns (status, body, content type, extra headers)."""
+        if request.path in ROUTES[:3]:
+            if request.method != 'GET':
+                raise HttpError(405, "Use GET")
+            if request.path == '/health':
+                return 200, _json({'status': 'ok'}), 'application/json', {}
+            if request.path == '/stats':
+                return 200, _json(self.stats()), 'application/json', {}
+            return 200, self.prometheus_text().encode(), 'text/plain; version=0.0.4', {}
+
+        kind = request.path[len('/v1/'):] if request.path.startswith('/v1/') else None
+        if kind not in ANALYSES:
+            raise HttpError(404, f"Unknown route {request.path}")
+        if request.method != 'POST':
+            raise HttpError(405, "Use POST with a ledger body or reference")
+
+        params = _parse_params(kind, request.query)
+        dataset, source = await self._resolve_source(request)
+        result = await self.analyze(kind, dataset, source, params)
+        return 200, _json({'dataset': dataset, 'analysis': kind, 'params': params, **result}), 'application/json', {}
+
+    async def _resolve_source(self, request):
+        """Dataset id and job source for an upload or a reference."""
+        if request.headers.get('content-type', '').startswith('application/json'):
+            try:
+                reference = json.loads(request.body or b'{}')
+            except ValueError:
+                raise HttpError(400, "Invalid JSON body") from None
+            if 'dataset' in reference:
+                source = self.datasets.get(reference['dataset'])
+                if source is None:
+                    raise HttpError(404, "Unknown or evicted dataset; upload the ledger again")
+                return reference['dataset'], source
+            if 'path' in reference:
+                return self._path_source(str(reference['path']))
+            raise HttpError(400, "JSON bodies must reference a 'dataset' or a 'path'")
+
+        file_format = request.query.get('format', ['csv'])[-1]
+        if file_format not in SUPPORTED_FILE_TYPES:
+            raise HttpError(400, f"format must be one of {', '.join(SUPPORTED_FILE_TYPES)}")
+        if not request.body:
+            raise HttpError(400, "Empty ledger upload")
+        # Hashing a large upload takes a while; keep the event loop serving other requests
+        dataset = await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(content_hash, request.body, format=file_format))
+        source = ('bytes', request.body, file_format)
+        self.datasets.put(dataset, source, nbytes=len(request.body))
+        return dataset, source
+
+    def _path_source(self, path):
+        if self.data_root is None:
+            raise HttpError(403, "Path references are disabled; start the service with --data-root")
+        resolved = os.path.realpath(os.path.join(self.data_root, path))
+        if os.path.commonpath([resolved, self.data_root]) != self.data_root:
+            raise HttpError(403, "Path is outside the data root")
+        try:
+            stat = os.stat(resolved)
+        except OSError:
+            raise HttpError(404, f"No ledger at {path}") from None
+        # Unchanged size and mtime identify unchanged content without hashing the file
+        dataset = content_hash(resolved.encode(), mtime=stat.st_mtime_ns, size=stat.st_size)
+        return dataset, ('path', resolved)
+
+    # Analysis scheduling
+
+    async def analyze(self, kind, dataset, source, params):
+        key = (dataset, kind, tuple(sorted(params.items())))
+        cached = self.results.get(key)
+        if cached is not None:
+            return cached
+
+        # Identical requests already running share the same job
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        if self._waiting + self.active >= self.max_concurrent + self.max_queue:
+            self.rejected += 1
+            raise HttpError(503, "Too many analyses in progress; retry later")
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            self._waiting += 1
+            try:
+                await self._semaphore.acquire()
+            finally:
+                self._waiting -= 1
+            self.active += 1
+            try:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, run_analysis, kind, source, params)
+            finally:
+                self.active -= 1
+                self._semaphore.release()
+        except DataValidationError as e:
+            error = HttpError(422, str(e), rejections=e.report.to_frame().to_dict(orient='records'))
+            future.set_exception(error)
+            raise error from None
+        except (ValueError, KeyError, OSError) as e:
+            error = HttpError(422, f"{type(e).__name__}: {e}")
+            future.set_exception(error)
+            raise error from None
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            self.results.put(key, result)
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+            # Nobody else may be awaiting the shared future; mark its exception retrieved
+            if future.done() and not future.cancelled():
+                future.exception()
+
+    # Observability
+
+    def stats(self):
+        return {
+            'active': self.active,
+            'waiting': self._waiting,
+            'rejected': self.rejected,
+            'results': self.results.stats(),
+            'datasets': self.datasets.stats(),
+            'latency': {route: histogram.to_dict() for route, histogram in sorted(self.latency.items())}
+        }
+
+    def prometheus_text(self, prefix='finflow_service'):
+        """Request latency histograms and cache counters in the Prometheus text format."""
+        lines = [
+            f"# HELP {prefix}_request_seconds Request latency per route.",
+            f"# TYPE {prefix}_request_seconds histogram",
+        ]
+        for route, histogram in sorted(self.latency.items()):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), histogram.counts):
+                cumulative += count
+                lines.append(f'{prefix}_request_seconds_bucket{{route="{route}",le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_request_seconds_sum{{route="{route}"}} {histogram.total:.6f}')
+            lines.append(f'{prefix}_request_seconds_count{{route="{route}"}} {histogram.count}')
+
+        results = self.results.stats()
+        for name, kind, value in (
+            ('active_analyses', 'gauge', self.active),
+            ('waiting_analyses', 'gauge', self._waiting),
+            ('rejected_total', 'counter', self.rejected),
+            ('result_cache_entries', 'gauge', results['entries']),
+            ('result_cache_hits_total', 'counter', results['hits']),
+            ('result_cache_misses_total', 'counter', results['misses']),
+            ('result_cache_evictions_total', 'counter', results['evictions']),
+        ):
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            lines.append(f"{prefix}_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    # Lifecycle
+
+    async def start(self, host=SERVICE_HOST, port=SERVICE_PORT):
+        """Start listening; returns the asyncio server (port 0 picks a free port)."""
+        self._server = await asyncio.start_server(self.handle_connection, host, port)
+        return self._server
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        # Connections idling in keep-alive would otherwise outlive the server
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def serve(host, port, **options):
+    service = AnalysisService(**options)
+    server = await service.start(host, port)
+    address = server.sockets[0].getsockname()
+    print(f"FinFlow analysis service listening on http://{address[0]}:{address[1]}", file=sys.stderr)
+    try:
+        await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON FinFlow Reality analysis service.")
+    parser.add_argument('--host', default=SERVICE_HOST, help="Bind address")
+    parser.add_argument('--port', type=int, default=SERVICE_PORT, help="Port (0 picks a free one)")
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help="Worker threads or processes (default: --max-concurrent)")
+    parser.add_argument('--processes', action='store_true', help="Run analyses in worker processes")
+    parser.add_argument('--max-concurrent', type=int, default=SERVICE_MAX_CONCURRENT, help="Analyses running at once")
+    parser.add_argument('--max-queue', type=int, default=SERVICE_MAX_QUEUE,
+                        help="Analyses waiting for a worker before answering 503")
+    parser.add_argument('--cache-size', type=int, default=SERVICE_RESULT_CACHE_SIZE, help="Cached analysis results")
+    parser.add_argument('--data-root', default=None, help="Directory ledgers may be referenced from by path")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, workers=args.workers, processes=args.processes,
+                          max_concurrent=args.max_concurrent, max_queue=args.max_queue,
+                          cache_size=args.cache_size, data_root=args.data_root))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
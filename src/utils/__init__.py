@@ -1 +1,84 @@
-# This file is intentionally left blank.
\ No newline at end of file
+"""
+Headless FinFlow Reality core: ingest, projection, metrics and offenders.
+
+Nothing here imports Streamlit or Plotly, and the public names below are
+resolved lazily, so ``import utils`` is instant and each submodule (and
+pandas/NumPy with it) is imported on first attribute access. Batch workers,
+services and tests can use the core without paying UI startup:
+
+    import utils
+    df = utils.load_transactions('ledger.csv')
+    metrics = utils.calculate_metrics(df, delay_days=30)
+"""
+import importlib
+
+_EXPORTS = {
+    # Ingest
+    'load_and_process_csv': 'data_processor',
+    'load_and_process_csv_chunked': 'data_processor',
+    'load_transactions': 'data_processor',
+    'read_snapshot': 'data_processor',
+    'write_snapshot': 'data_processor',
+    'generate_mock_data': 'data_processor',
+    'generate_transactions': 'data_processor',
+    'load_accounts': 'data_processor',
+    'merge_sorted_frames': 'data_processor',
+    'cached_load_csv': 'ingest_cache',
+    'cached_load_accounts': 'ingest_cache',
+    'get_ingest_cache': 'ingest_cache',
+    'ValidationReport': 'validation',
+    'DataValidationError': 'validation',
+    'validate_transactions': 'validation',
+    'import_invoices': 'peppol',
+    'load_einvoices': 'peppol',
+    'parse_invoice': 'peppol',
+    'ImportManifest': 'peppol',
+    'LedgerStore': 'ledger_store',
+    'get_ledger_store': 'ledger_store',
+    # Currency normalization
+    'FxRateTable': 'fx',
+    'get_fx_rates': 'fx',
+    'load_fx_rates': 'fx',
+    'normalize_currency': 'fx',
+    # Projection
+    'DelaySweep': 'cash_flow_analyzer',
+    'CashFlowProjection': 'cash_flow_analyzer',
+    'build_projection': 'cash_flow_analyzer',
+    'calculate_cumulative_cash_flow': 'cash_flow_analyzer',
+    'get_delay_sweep': 'cash_flow_analyzer',
+    'simulate_payment_delays': 'simulation',
+    'get_simulation': 'simulation',
+    # Metrics and offenders
+    'analyze_cash_flow': 'cash_flow_analyzer',
+    'calculate_metrics': 'cash_flow_analyzer',
+    'calculate_liquidity_locked': 'cash_flow_analyzer',
+    'calculate_average_monthly_outflow': 'cash_flow_analyzer',
+    'horizon_table': 'cash_flow_analyzer',
+    'CashFlowWindows': 'cash_windows',
+    'CrunchIntervals': 'crunch',
+    'detect_crunches': 'crunch',
+    'get_top_offenders': 'cash_flow_analyzer',
+    'TransactionIndex': 'transaction_index',
+    'get_transaction_index': 'transaction_index',
+    'select_accounts': 'transaction_index',
+    # Transaction explorer
+    'ExplorerQuery': 'explorer',
+    'TransactionExplorer': 'explorer',
+    'get_explorer': 'explorer',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
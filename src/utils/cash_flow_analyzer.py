@@ -1,60 +1,107 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
 import pandas as pd
 from datetime import timedelta
 
+from config.settings import (
+    CASH_CRUNCH_ALERT_THRESHOLD,
+    DELAY_STEP_DAYS,
+    FORECAST_HORIZONS_DAYS,
+    INGEST_CACHE_BUDGET_MB,
+    MAX_DELAY_DAYS,
+    PROJECTION_HORIZON_DAYS,
+)
+
+from .cash_windows import CashFlowWindows, default_as_of
+from .compact_ledger import MINOR_UNITS, from_day_numbers, local_datetimes, to_day_numbers, to_minor_units
+from .crunch import detect_crunches
+from .hashing import frame_fingerprint
+
+# Delay values offered by the dashboard slider
+DELAY_SWEEP_VALUES = tuple(range(0, MAX_DELAY_DAYS + 1, DELAY_STEP_DAYS))
+_SWEEP_CACHE_BYTES = INGEST_CACHE_BUDGET_MB * 1024 * 1024
+_NS_PER_DAY = 86_400 * 10**9
+
+
+def _months_spanned(first_day, last_day):
+    """Number of calendar months from the month of ``first_day`` to that of ``last_day``, inclusive."""
+    first, last = from_day_numbers([first_day, last_day], 'datetime64[M]').astype(np.int64)
+    return int(last - first) + 1
 
-def calculate_average_monthly_outflow(transactions):
+
+def calculate_average_monthly_outflow(transactions, index=None):
     """
     Calculate the average monthly outflow from the transactions.
 
+    The average runs over every calendar month from the first to the last
+    outflow, months without outflows counting as zero, so it is the outflow
+    total divided by the number of months spanned; with an index that is O(1).
+
     Args:
         transactions (DataFrame): A DataFrame containing transaction data.
+        index (TransactionIndex): Optional precomputed index for this dataset.
 
     Returns:
         float: The average monthly outflow (absolute value).
     """
-    outflows = transactions[transactions['Type'] == 'Outflow'].copy()
-    if len(outflows) == 0:
+    if index is not None:
+        if index.outflow_day_range is None:
+            return 0
+        return abs(index.outflow_total) / _months_spanned(*index.outflow_day_range)
+
+    outflows = transactions['Type'] == 'Outflow'
+    if not outflows.any():
         return 0
-    
-    outflows['Date'] = pd.to_datetime(outflows['Date'])
-    outflows.set_index('Date', inplace=True)
-    monthly_outflows = outflows.resample('M').sum()
-    average_monthly_outflow = abs(monthly_outflows['Amount'].mean())
-    return average_monthly_outflow
+
+    days = to_day_numbers(transactions.loc[outflows, 'Date'])
+    total = transactions.loc[outflows, 'Amount'].sum()
+    return abs(total) / _months_spanned(days.min(), days.max())
 
 
-def calculate_liquidity_locked(transactions):
+def calculate_liquidity_locked(transactions, index=None):
     """
     Determine the potential liquidity locked based on pending INFLOW transactions.
 
     Args:
         transactions (DataFrame): A DataFrame containing transaction data.
+        index (TransactionIndex): Optional precomputed index for this dataset.
 
     Returns:
         float: The total liquidity locked (positive value).
     """
+    if index is not None:
+        return index.liquidity_locked()
+    
     pending_inflows = transactions[(transactions['Type'] == 'Inflow') & (transactions['Status'] == 'Pending')]
     total_liquidity_locked = pending_inflows['Amount'].sum()
     return total_liquidity_locked
 
 
-def get_top_offenders(transactions, top_n=5):
+def get_top_offenders(transactions, top_n=5, index=None):
     """
     Identify customers with the most pending cash (liquidity locked).
 
     Args:
         transactions (DataFrame): A DataFrame containing transaction data.
         top_n (int): Number of top offenders to return.
+        index (TransactionIndex): Optional precomputed index; selects the top
+            customers from per-customer sums without scanning rows.
 
     Returns:
         DataFrame: Top customers with pending amounts.
     """
+    if index is not None:
+        return index.top_offenders(top_n)
+    
     pending_inflows = transactions[(transactions['Type'] == 'Inflow') & (transactions['Status'] == 'Pending')]
     
     if len(pending_inflows) == 0:
         return pd.DataFrame(columns=['Customer', 'Locked Amount'])
     
-    top_customers = pending_inflows.groupby('Description')['Amount'].sum().sort_values(ascending=False).head(top_n)
+    top_customers = pending_inflows.groupby('Description', observed=True)['Amount'].sum().sort_values(ascending=False).head(top_n)
     
     result_df = pd.DataFrame({
         'Customer': top_customers.index,
@@ -64,7 +111,142 @@ def get_top_offenders(transactions, top_n=5):
     return result_df
 
 
-def calculate_cumulative_cash_flow(transactions, delay_days=0, reality_mode=False):
+class DelaySweep:
+    """
+    Reality balance curves for a set of delay values, computed in one pass.
+
+    Rows that are not pending inflows are sorted once; pending inflows are
+    sorted once and merged into them at every delay offset with a vectorized
+    searchsorted. Dates are int64 wall-clock nanoseconds (time of day and
+    time zone are kept) and amounts int64 minor units, so the sweep is pure
+    integer work and the balances are exact.
+    ``order[k]`` holds the row positions in date order for ``delays[k]`` and
+    ``balances[k]`` the matching cumulative balance in minor units.
+    """
+
+    def __init__(self, transactions, delays=DELAY_SWEEP_VALUES):
+        self.delays = tuple(sorted(set(int(delay) for delay in delays)))
+        self._positions = {delay: i for i, delay in enumerate(self.delays)}
+        self.index = transactions.index
+
+        self.dates = pd.DatetimeIndex(pd.to_datetime(transactions['Date']))
+        times = local_datetimes(self.dates).view(np.int64)
+        # Whole-day shifts move the day number by the delay, whatever the time of day
+        self.days = (times // _NS_PER_DAY).astype(np.int32)
+        amounts = to_minor_units(transactions['Amount'])
+        self.pending = ((transactions['Type'] == 'Inflow') & (transactions['Status'] == 'Pending')).to_numpy()
+
+        base_rows = np.flatnonzero(~self.pending)
+        base_rows = base_rows[np.argsort(times[base_rows], kind='stable')]
+        pending_rows = np.flatnonzero(self.pending)
+        pending_rows = pending_rows[np.argsort(times[pending_rows], kind='stable')]
+
+        n_delays, n_rows = len(self.delays), len(transactions)
+        shifted = times[pending_rows][None, :] + np.asarray(self.delays, dtype=np.int64)[:, None] * _NS_PER_DAY
+
+        # Merged slot of each pending inflow: base rows at or before its time plus earlier pending rows
+        slots = np.searchsorted(times[base_rows], shifted, side='right') + np.arange(len(pending_rows))
+
+        self.order = np.empty((n_delays, n_rows), dtype=np.int32 if n_rows < 2**31 else np.int64)
+        pending_slot = np.zeros((n_delays, n_rows), dtype=bool)
+        delay_axis = np.arange(n_delays)[:, None]
+        self.order[delay_axis, slots] = pending_rows
+        pending_slot[delay_axis, slots] = True
+        # Remaining slots take the base rows in date order, row by row
+        self.order[~pending_slot] = np.tile(base_rows, n_delays)
+
+        self.balances = np.cumsum(amounts[self.order], axis=1)
+
+    def __contains__(self, delay_days):
+        return delay_days in self._positions
+
+    @property
+    def nbytes(self):
+        arrays = (self.order, self.balances, self.days, self.pending, self.dates)
+        return sum(array.nbytes for array in arrays)
+
+    def curve(self, delay_days):
+        """
+        Look up the reality curve for one delay value.
+
+        Args:
+            delay_days (int): One of the precomputed delay values.
+
+        Returns:
+            tuple: (dates, cumulative_balance) as returned by calculate_cumulative_cash_flow.
+        """
+        position = self._positions[delay_days]
+        rows = self.order[position]
+        shift = pd.to_timedelta(np.where(self.pending[rows], delay_days, 0), unit='D')
+        index = self.index[rows]
+        # DatetimeIndex arithmetic keeps the column's dtype, time zone included
+        dates = pd.Series(self.dates[rows] + shift, index=index, name='Date')
+        balance = pd.Series(self.balances[position] / MINOR_UNITS, index=index, name='Cumulative')
+        return dates, balance
+
+    def crunches(self, threshold=CASH_CRUNCH_ALERT_THRESHOLD):
+        """
+        Crunch intervals of every delay's reality curve in one vectorized call.
+
+        Args:
+            threshold (float): Balance below which a day is a crunch.
+
+        Returns:
+            CrunchIntervals: Intervals whose scenario is the position in ``delays``.
+        """
+        delays = np.asarray(self.delays, dtype=np.int32)[:, None]
+        days = self.days[self.order] + np.where(self.pending[self.order], delays, np.int32(0))
+        return detect_crunches(self.balances / MINOR_UNITS, days, threshold)
+
+    def earliest_crunches(self, threshold=CASH_CRUNCH_ALERT_THRESHOLD):
+        """
+        First date the balance closes below ``threshold``, per delay value.
+
+        Returns:
+            Series: Crunch start (NaT when none) indexed by delay in days.
+        """
+        return pd.Series(self.crunches(threshold).earliest(),
+                         index=pd.Index(self.delays, name='Delay (Days)'), name='First Crunch')
+
+
+_sweep_cache = OrderedDict()
+_sweep_lock = threading.Lock()
+
+
+def get_delay_sweep(transactions, delays=DELAY_SWEEP_VALUES):
+    """
+    Return the DelaySweep for a dataset, building it on first use.
+
+    Sweeps are cached by dataset fingerprint so every rerun of the dashboard
+    for the same data turns a delay change into a lookup. A sweep costs about
+    12 bytes per row and delay value, so the cache keeps the least recently
+    used sweeps within INGEST_CACHE_BUDGET_MB; the newest is always kept.
+
+    Args:
+        transactions (DataFrame): A DataFrame containing transaction data.
+        delays (iterable): Delay values to precompute.
+
+    Returns:
+        DelaySweep: Precomputed reality curves.
+    """
+    key = (frame_fingerprint(transactions), tuple(delays))
+    with _sweep_lock:
+        sweep = _sweep_cache.get(key)
+        if sweep is not None:
+            _sweep_cache.move_to_end(key)
+            return sweep
+
+    sweep = DelaySweep(transactions, delays)
+    with _sweep_lock:
+        _sweep_cache[key] = sweep
+        _sweep_cache.move_to_end(key)
+        total = sum(cached.nbytes for cached in _sweep_cache.values())
+        while total > _SWEEP_CACHE_BYTES and len(_sweep_cache) > 1:
+            total -= _sweep_cache.popitem(last=False)[1].nbytes
+    return sweep
+
+
+def calculate_cumulative_cash_flow(transactions, delay_days=0, reality_mode=False, sweep=None):
     """
     Calculate cumulative cash flow with optional delay factor for pending inflows.
 
@@ -72,10 +254,15 @@ def calculate_cumulative_cash_flow(transactions, delay_days=0, reality_mode=Fals
         transactions (DataFrame): A DataFrame containing transaction data.
         delay_days (int): Number of days to delay pending inflows.
         reality_mode (bool): If True, apply delay to pending inflows.
+        sweep (DelaySweep): Optional precomputed curves for this dataset.
 
     Returns:
         tuple: (dates, cumulative_balance) for plotting.
     """
+    effective_delay = delay_days if reality_mode and delay_days > 0 else 0
+    if sweep is not None and effective_delay in sweep:
+        return sweep.curve(effective_delay)
+
     df = transactions.copy()
     df['Date'] = pd.to_datetime(df['Date'])
     
@@ -91,28 +278,127 @@ def calculate_cumulative_cash_flow(transactions, delay_days=0, reality_mode=Fals
     return df['Date'], df['Cumulative']
 
 
-def calculate_metrics(transactions, delay_days=0):
+@dataclass
+class CashFlowProjection:
+    """
+    Optimistic and reality curves for one delay value, shared by the metric
+    cards, the chart and the crunch warning within a rerun.
+    """
+    delay_days: int
+    optimistic_dates: pd.Series
+    optimistic_balance: pd.Series
+    reality_dates: pd.Series
+    reality_balance: pd.Series
+    crunch_mask: pd.Series
+    min_date: pd.Timestamp = None
+    min_balance: float = None
+    _windows: dict = field(default_factory=dict, repr=False, compare=False)
+    _crunches: dict = field(default_factory=dict, repr=False, compare=False)
+
+    @property
+    def has_crunch(self):
+        return bool(self.crunch_mask.any())
+
+    def windows(self, reality=True):
+        """Prefix-sum windows over the reality (or optimistic) curve, built on first use."""
+        windows = self._windows.get(reality)
+        if windows is None:
+            if reality:
+                windows = CashFlowWindows.from_curve(self.reality_dates, self.reality_balance)
+            else:
+                windows = CashFlowWindows.from_curve(self.optimistic_dates, self.optimistic_balance)
+            self._windows[reality] = windows
+        return windows
+
+    def crunches(self, threshold=CASH_CRUNCH_ALERT_THRESHOLD):
+        """Periods the reality curve closes below ``threshold``, computed once per threshold."""
+        crunches = self._crunches.get(threshold)
+        if crunches is None:
+            crunches = detect_crunches(self.reality_balance.to_numpy(), self.reality_dates.to_numpy(), threshold)
+            self._crunches[threshold] = crunches
+        return crunches
+
+    @property
+    def as_of(self):
+        """Reference date of the horizon analytics (see default_as_of)."""
+        return default_as_of(self.optimistic_dates)
+
+
+def build_projection(transactions, delay_days=0, sweep=None):
+    """
+    Compute the optimistic and reality projections once.
+
+    Args:
+        transactions (DataFrame): A DataFrame containing transaction data.
+        delay_days (int): Customer delay factor in days.
+        sweep (DelaySweep): Optional precomputed curves for this dataset.
+
+    Returns:
+        CashFlowProjection: Both curves, the negative-balance mask of the
+        reality curve and its minimum point.
+    """
+    optimistic_dates, optimistic_balance = calculate_cumulative_cash_flow(
+        transactions, delay_days=0, reality_mode=False, sweep=sweep
+    )
+    if delay_days > 0:
+        reality_dates, reality_balance = calculate_cumulative_cash_flow(
+            transactions, delay_days=delay_days, reality_mode=True, sweep=sweep
+        )
+    else:
+        # Without a delay the reality curve is the optimistic one
+        reality_dates, reality_balance = optimistic_dates, optimistic_balance
+
+    projection = CashFlowProjection(
+        delay_days=delay_days,
+        optimistic_dates=optimistic_dates,
+        optimistic_balance=optimistic_balance,
+        reality_dates=reality_dates,
+        reality_balance=reality_balance,
+        crunch_mask=reality_balance < 0
+    )
+    if len(reality_balance) > 0:
+        min_label = reality_balance.idxmin()
+        projection.min_date = reality_dates[min_label]
+        projection.min_balance = reality_balance[min_label]
+    return projection
+
+
+def calculate_metrics(transactions, delay_days=0, sweep=None, projection=None, index=None,
+                      horizon_days=PROJECTION_HORIZON_DAYS, as_of=None):
     """
     Calculate key metrics for the dashboard.
 
     Args:
         transactions (DataFrame): A DataFrame containing transaction data.
         delay_days (int): Customer delay factor in days.
+        sweep (DelaySweep): Optional precomputed curves for this dataset.
+        projection (CashFlowProjection): Optional projection already built for
+            this dataset and delay; takes precedence over ``sweep``.
+        index (TransactionIndex): Optional precomputed index for this dataset.
+        horizon_days (int): Days after ``as_of`` at which both projections are compared.
+        as_of: Reference date; defaults to today, or the last transaction date
+            for ledgers that end in the past.
 
     Returns:
         dict: Dictionary containing current balance, 30-day gap, and risk level.
     """
     # Current balance (all paid transactions)
-    paid_transactions = transactions[transactions['Status'] == 'Paid']
-    current_balance = paid_transactions['Amount'].sum()
+    if index is not None:
+        current_balance = index.paid_total
+    else:
+        paid_transactions = transactions[transactions['Status'] == 'Paid']
+        current_balance = paid_transactions['Amount'].sum()
     
-    # Optimistic 30-day projection
-    _, optimistic_flow = calculate_cumulative_cash_flow(transactions, delay_days=0, reality_mode=False)
-    optimistic_30day = optimistic_flow.iloc[-1] if len(optimistic_flow) > 0 else current_balance
+    if projection is None:
+        projection = build_projection(transactions, delay_days=delay_days, sweep=sweep)
     
-    # Reality 30-day projection
-    _, reality_flow = calculate_cumulative_cash_flow(transactions, delay_days=delay_days, reality_mode=True)
-    reality_30day = reality_flow.iloc[-1] if len(reality_flow) > 0 else current_balance
+    if len(projection.optimistic_balance) == 0:
+        optimistic_30day = reality_30day = current_balance
+    else:
+        # Both curves at the horizon date, one binary search each
+        horizon_date = (as_of if as_of is not None else projection.as_of) + pd.Timedelta(days=horizon_days)
+        optimistic_30day = projection.windows(reality=False).balance_at(horizon_date)[0]
+        reality_30day = projection.windows().balance_at(horizon_date)[0]
     
     # Gap and risk assessment
     projected_gap = optimistic_30day - reality_30day
@@ -134,18 +420,49 @@ def calculate_metrics(transactions, delay_days=0):
     }
 
 
-def analyze_cash_flow(transactions):
+def horizon_table(projection, horizons=FORECAST_HORIZONS_DAYS, as_of=None):
+    """
+    Outlook for several horizons from one vectorized lookup per curve.
+
+    Args:
+        projection (CashFlowProjection): Projection for the selected delay.
+        horizons (iterable): Horizon lengths in days.
+        as_of: Reference date; defaults to ``projection.as_of``.
+
+    Returns:
+        DataFrame: Per horizon, the date, optimistic and reality balance and
+        their gap, the reality inflows/outflows up to that date, the monthly
+        burn over the trailing horizon and the resulting runway in months.
+    """
+    as_of = as_of if as_of is not None else projection.as_of
+    optimistic = projection.windows(reality=False).horizons(as_of, horizons)
+    reality = projection.windows().horizons(as_of, horizons)
+    return pd.DataFrame({
+        'Horizon (Days)': list(horizons),
+        'Date': reality['date'],
+        'Optimistic Balance': optimistic['balance'],
+        'Reality Balance': reality['balance'],
+        'Gap': optimistic['balance'] - reality['balance'],
+        'Inflows': reality['inflow'],
+        'Outflows': reality['outflow'],
+        'Monthly Burn': reality['burn_rate'],
+        'Runway (Months)': reality['runway_months']
+    })
+
+
+def analyze_cash_flow(transactions, index=None):
     """
     Analyze cash flow based on the provided transactions.
 
     Args:
         transactions (DataFrame): A DataFrame containing transaction data.
+        index (TransactionIndex): Optional precomputed index for this dataset.
 
     Returns:
         dict: A dictionary containing analysis results.
     """
-    average_outflow = calculate_average_monthly_outflow(transactions)
-    liquidity_locked = calculate_liquidity_locked(transactions)
+    average_outflow = calculate_average_monthly_outflow(transactions, index=index)
+    liquidity_locked = calculate_liquidity_locked(transactions, index=index)
     
     analysis_results = {
         'average_monthly_outflow': average_outflow,
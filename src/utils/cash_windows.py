@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+
+from .compact_ledger import from_day_numbers, local_datetimes, to_day_numbers
+
+AVERAGE_MONTH_DAYS = 365.25 / 12
+
+
+def default_as_of(dates):
+    """
+    Reference date for horizon analytics: today, or the last transaction
+    date when the ledger ends in the past (e.g. a historical export).
+
+    Args:
+        dates (Series): Transaction dates.
+
+    Returns:
+        Timestamp: Normalized, tz-naive reference date.
+    """
+    today = pd.Timestamp.now().normalize()
+    if len(dates) == 0:
+        return today
+    # Wall-clock dates, so tz-aware ledgers compare with the naive 'today'
+    return min(today, pd.Timestamp(local_datetimes(dates).max()).normalize())
+
+
+def _day_numbers(dates):
+    return to_day_numbers(pd.DatetimeIndex(np.atleast_1d(pd.to_datetime(dates))))
+
+
+class CashFlowWindows:
+    """
+    Windowed analytics over one date-sorted cash flow curve.
+
+    Balance, inflow and outflow are kept as prefix sums aligned with the
+    sorted day numbers, so the balance at any date and the flows in any
+    (start, end] window are two ``searchsorted`` lookups, O(log n), and many
+    dates or windows are answered by one vectorized call.
+    """
+
+    def __init__(self, days, amounts):
+        self.days = np.asarray(days, dtype=np.int32)
+        amounts = np.asarray(amounts, dtype=np.float64)
+        # A leading zero makes "no rows yet" a regular lookup
+        self.balance = np.r_[0.0, np.cumsum(amounts)]
+        self.inflow = np.r_[0.0, np.cumsum(np.where(amounts > 0, amounts, 0.0))]
+        self.outflow = np.r_[0.0, np.cumsum(np.where(amounts < 0, amounts, 0.0))]
+
+    @classmethod
+    def from_curve(cls, dates, balance):
+        """
+        Build from a cumulative curve such as calculate_cumulative_cash_flow returns.
+
+        Args:
+            dates (Series): Sorted dates of the curve.
+            balance (Series): Cumulative balance aligned with ``dates``.
+
+        Returns:
+            CashFlowWindows: Windows over the curve's per-row amounts.
+        """
+        values = np.asarray(balance, dtype=np.float64)
+        return cls(to_day_numbers(dates), np.diff(values, prepend=0.0))
+
+    @classmethod
+    def from_frame(cls, transactions):
+        """Build from a transaction frame, sorting it by date once."""
+        days = to_day_numbers(transactions['Date'])
+        order = np.argsort(days, kind='stable')
+        return cls(days[order], transactions['Amount'].to_numpy(dtype=np.float64)[order])
+
+    def _rows_through(self, days):
+        return np.searchsorted(self.days, days, side='right')
+
+    def balance_at(self, dates):
+        """
+        End-of-day balance at each date.
+
+        Args:
+            dates: One date or an array of dates.
+
+        Returns:
+            ndarray: Balance after every transaction on or before each date.
+        """
+        return self.balance[self._rows_through(_day_numbers(dates))]
+
+    def flows_between(self, start, end):
+        """
+        Inflows and outflows in the window (start, end].
+
+        Args:
+            start: Window start date(s), exclusive.
+            end: Window end date(s), inclusive.
+
+        Returns:
+            tuple: (inflow, outflow) arrays; outflows are negative.
+        """
+        first, last = self._rows_through(_day_numbers(start)), self._rows_through(_day_numbers(end))
+        return self.inflow[last] - self.inflow[first], self.outflow[last] - self.outflow[first]
+
+    def burn_rate(self, as_of, window_days=90):
+        """
+        Monthly net burn over the trailing window ending at ``as_of``.
+
+        Args:
+            as_of: Window end date(s).
+            window_days: Window length(s) in days.
+
+        Returns:
+            ndarray: Net cash lost per average month; 0 when the window was cash positive.
+        """
+        window_days = np.asarray(window_days, dtype=np.int64)
+        end = _day_numbers(as_of)
+        net = self.balance[self._rows_through(end)] - self.balance[self._rows_through(end - window_days)]
+        return np.maximum(-net, 0.0) * AVERAGE_MONTH_DAYS / np.maximum(window_days, 1)
+
+    def horizons(self, as_of, horizons):
+        """
+        Balance, forward flows, trailing burn and runway for many horizons at once.
+
+        Args:
+            as_of: Reference date ("today").
+            horizons (iterable): Horizon lengths in days.
+
+        Returns:
+            dict: Arrays keyed 'date', 'balance' (at as_of + N), 'inflow' and
+            'outflow' (in (as_of, as_of + N]), 'burn_rate' (monthly, trailing N
+            days) and 'runway_months' (balance at as_of / burn rate; inf
+            without burn).
+        """
+        horizons = np.asarray(list(horizons), dtype=np.int64)
+        today = int(_day_numbers(as_of)[0])
+        # One searchsorted per boundary array: as_of, as_of + N and as_of - N
+        now, ahead, behind = (self._rows_through(days) for days in (today, today + horizons, today - horizons))
+
+        burn = np.maximum(self.balance[behind] - self.balance[now], 0.0) * AVERAGE_MONTH_DAYS \
+            / np.maximum(horizons, 1)
+        current = max(self.balance[now], 0.0)
+        return {
+            'date': pd.DatetimeIndex(from_day_numbers(today + horizons)),
+            'balance': self.balance[ahead],
+            'inflow': self.inflow[ahead] - self.inflow[now],
+            'outflow': self.outflow[ahead] - self.outflow[now],
+            'burn_rate': burn,
+            'runway_months': np.divide(current, burn, out=np.full(len(horizons), np.inf), where=burn > 0)
+        }
@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+
+MINOR_UNITS = 100  # Cents per currency unit
+ACCOUNT_COLUMN = 'Account'  # Source account of each row in multi-account datasets
+_EPOCH = np.datetime64('1970-01-01', 'D')
+
+
+def _code_dtype(n_labels):
+    for dtype in (np.int8, np.int16):
+        if n_labels <= np.iinfo(dtype).max:
+            return dtype
+    return np.int32
+
+
+def encode_labels(column, keep_missing=False):
+    """
+    Dictionary-encode a label column into (codes, labels).
+
+    Codes use the smallest integer dtype that holds the labels. Missing
+    values get code -1 unless ``keep_missing`` makes them a label of their own.
+    """
+    codes, labels = pd.factorize(column, use_na_sentinel=not keep_missing)
+    return codes.astype(_code_dtype(len(labels))), np.asarray(labels, dtype=object)
+
+
+def label_mask(codes, labels, label):
+    """Boolean mask of the rows whose code points at ``label``."""
+    positions = np.flatnonzero(labels == label)
+    if len(positions) == 0:
+        return np.zeros(len(codes), dtype=bool)
+    return codes == positions[0]
+
+
+def to_minor_units(amounts, minor_units=MINOR_UNITS):
+    """Convert decimal amounts to exact int64 minor units (e.g. cents)."""
+    return np.rint(np.asarray(amounts, dtype=np.float64) * minor_units).astype(np.int64)
+
+
+def local_datetimes(dates):
+    """Naive datetime64[ns] wall-clock times; tz-aware dates keep their local time."""
+    dates = pd.DatetimeIndex(pd.to_datetime(dates))
+    if dates.tz is not None:
+        dates = dates.tz_localize(None)
+    return dates.to_numpy().astype('datetime64[ns]')
+
+
+def to_day_numbers(dates):
+    """Convert dates to int32 days since 1970-01-01 (local calendar days for tz-aware dates)."""
+    days = local_datetimes(dates).astype('datetime64[D]')
+    return (days - _EPOCH).astype(np.int32)
+
+
+def from_day_numbers(days, dtype='datetime64[ns]'):
+    """Convert int32 day numbers back to datetime64 values of the given dtype."""
+    return (_EPOCH + np.asarray(days, dtype=np.int64)).astype(dtype)
+
+
+class CompactLedger:
+    """
+    Column-oriented ledger using exact integer representations.
+
+    Amounts are int64 minor units, dates int32 day numbers and the label
+    columns small integer codes into per-column dictionaries. Cumulative sums
+    over millions of rows are exact and the hot paths are integer NumPy
+    operations; conversion to and from DataFrames happens only at the edges.
+    """
+
+    def __init__(self, amount_minor, day, description_codes, descriptions, type_codes, types,
+                 status_codes, statuses, index=None, minor_units=MINOR_UNITS):
+        self.amount_minor = amount_minor
+        self.day = day
+        self.description_codes = description_codes
+        self.descriptions = descriptions
+        self.type_codes = type_codes
+        self.types = types
+        self.status_codes = status_codes
+        self.statuses = statuses
+        self.index = index if index is not None else pd.RangeIndex(len(day))
+        self.minor_units = minor_units
+
+    @classmethod
+    def from_frame(cls, transactions, minor_units=MINOR_UNITS):
+        """
+        Encode a transaction DataFrame.
+
+        Args:
+            transactions (DataFrame): Date, Description, Amount, Type and Status columns.
+            minor_units (int): Minor units per currency unit.
+
+        Returns:
+            CompactLedger: Encoded ledger keeping the frame's index.
+        """
+        description_codes, descriptions = encode_labels(transactions['Description'])
+        type_codes, types = encode_labels(transactions['Type'])
+        status_codes, statuses = encode_labels(transactions['Status'])
+        return cls(
+            amount_minor=to_minor_units(transactions['Amount'], minor_units),
+            day=to_day_numbers(transactions['Date']),
+            description_codes=description_codes,
+            descriptions=descriptions,
+            type_codes=type_codes,
+            types=types,
+            status_codes=status_codes,
+            statuses=statuses,
+            index=transactions.index,
+            minor_units=minor_units
+        )
+
+    def to_frame(self):
+        """Decode back to the Date/Description/Amount/Type/Status DataFrame."""
+        return pd.DataFrame({
+            'Date': from_day_numbers(self.day),
+            'Description': self.descriptions[self.description_codes],
+            'Amount': self.amount_minor / self.minor_units,
+            'Type': self.types[self.type_codes],
+            'Status': self.statuses[self.status_codes]
+        }, index=self.index)
+
+    def __len__(self):
+        return len(self.day)
+
+    @property
+    def nbytes(self):
+        arrays = (self.amount_minor, self.day, self.description_codes, self.type_codes, self.status_codes)
+        return sum(array.nbytes for array in arrays)
+
+    def type_mask(self, label):
+        return label_mask(self.type_codes, self.types, label)
+
+    def status_mask(self, label):
+        return label_mask(self.status_codes, self.statuses, label)
+
+    def pending_inflow_mask(self):
+        return self.type_mask('Inflow') & self.status_mask('Pending')
+
+    def paid_balance_minor(self):
+        """Sum of paid amounts in minor units."""
+        return int(self.amount_minor[self.status_mask('Paid')].sum())
+
+    def liquidity_locked_minor(self):
+        """Sum of pending inflows in minor units."""
+        return int(self.amount_minor[self.pending_inflow_mask()].sum())
+
+    def cumulative_minor(self, delay_days=0):
+        """
+        Exact cumulative balance in date order with pending inflows delayed.
+
+        Args:
+            delay_days (int): Days added to pending inflow dates.
+
+        Returns:
+            tuple: (order, day, cumulative) where ``order`` are row positions,
+            ``day`` the (shifted) day numbers and ``cumulative`` int64 balances.
+        """
+        day = self.day
+        if delay_days:
+            day = day + np.where(self.pending_inflow_mask(), np.int32(delay_days), np.int32(0))
+        order = np.argsort(day, kind='stable')
+        return order, day[order], np.cumsum(self.amount_minor[order])
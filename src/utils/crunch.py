@@ -0,0 +1,163 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from config.settings import CASH_CRUNCH_ALERT_THRESHOLD
+
+from .compact_ledger import from_day_numbers, to_day_numbers
+
+
+def _as_day_numbers(dates):
+    """int64 day numbers from datetime-like or integer dates, keeping the array shape."""
+    dates = np.asarray(dates)
+    if np.issubdtype(dates.dtype, np.integer):
+        return dates.astype(np.int64)
+    return to_day_numbers(dates.ravel()).astype(np.int64).reshape(dates.shape)
+
+
+def crunch_runs(values, threshold=CASH_CRUNCH_ALERT_THRESHOLD):
+    """
+    Run-length encode the points below ``threshold`` in every row of a matrix.
+
+    The matrix is flattened with a False separator after each row, so the
+    runs of all scenarios come out of one diff and one nonzero.
+
+    Args:
+        values (ndarray): One balance curve, or one curve per row.
+        threshold (float): Balance below which a point is in a crunch.
+
+    Returns:
+        tuple: (row, start, end) int64 arrays, one entry per run, ordered by
+        row and start; ``end`` is the last position below the threshold.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    n_rows, n_points = values.shape
+    below = np.zeros((n_rows, n_points + 1), dtype=np.int8)
+    below[:, :n_points] = values < threshold
+    edges = np.diff(below.ravel(), prepend=0)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1) - 1
+    width = n_points + 1
+    return starts // width, starts % width, ends % width
+
+
+@dataclass
+class CrunchIntervals:
+    """
+    Crunch intervals of one or more scenarios, one array entry per interval.
+
+    Intervals are ordered by scenario and start. ``end`` is the last date
+    below the threshold and ``recovery`` the first date back at or above
+    it (NaT while the crunch is still open at the end of the curve);
+    ``duration_days`` runs from start to recovery, or to the last date + 1
+    for open crunches.
+    """
+    scenario: np.ndarray
+    start: np.ndarray
+    end: np.ndarray
+    recovery: np.ndarray
+    duration_days: np.ndarray
+    min_balance: np.ndarray
+    threshold: float
+    n_scenarios: int
+
+    def __len__(self):
+        return len(self.scenario)
+
+    @property
+    def depth(self):
+        """How far each interval fell below the threshold."""
+        return self.threshold - self.min_balance
+
+    def earliest(self):
+        """Start of the first crunch per scenario (NaT for scenarios without one)."""
+        first = np.full(self.n_scenarios, np.datetime64('NaT'), dtype=self.start.dtype)
+        scenarios, positions = np.unique(self.scenario, return_index=True)
+        first[scenarios] = self.start[positions]
+        return first
+
+    def counts(self):
+        """Number of crunch intervals per scenario."""
+        return np.bincount(self.scenario, minlength=self.n_scenarios)
+
+    def total_days(self):
+        """Days spent below the threshold per scenario."""
+        return np.bincount(self.scenario, weights=self.duration_days, minlength=self.n_scenarios).astype(np.int64)
+
+    def lowest(self):
+        """Lowest balance per scenario (NaN for scenarios without a crunch)."""
+        lowest = np.full(self.n_scenarios, np.nan)
+        if len(self):
+            boundaries = np.flatnonzero(np.r_[True, self.scenario[1:] != self.scenario[:-1]])
+            lowest[self.scenario[boundaries]] = np.minimum.reduceat(self.min_balance, boundaries)
+        return lowest
+
+    def to_frame(self):
+        return pd.DataFrame({
+            'Scenario': self.scenario,
+            'Start': self.start,
+            'End': self.end,
+            'Recovery': self.recovery,
+            'Duration (Days)': self.duration_days,
+            'Lowest Balance': self.min_balance,
+            'Depth': self.depth
+        })
+
+
+def detect_crunches(balances, dates, threshold=CASH_CRUNCH_ALERT_THRESHOLD, end_of_day=True):
+    """
+    Find every period a balance curve spends below ``threshold``.
+
+    Works on one curve or a whole matrix of scenarios (delay values,
+    simulations, ledgers padded to one grid) in one vectorized pass:
+    run-length encoding of the below-threshold mask, then one
+    ``minimum.reduceat`` for the lowest balance of every run.
+
+    Args:
+        balances (ndarray): Balance per point, shape (n_points,) or (n_scenarios, n_points).
+        dates: Date (or day number) per point; either one shared row or one row per scenario.
+            Each row must be sorted.
+        threshold (float): Balance below which the business is in a crunch.
+        end_of_day (bool): Judge each date by its closing balance, so dips within
+            a day that recover the same day are not crunches.
+
+    Returns:
+        CrunchIntervals: All intervals, ordered by scenario and start.
+    """
+    values = np.atleast_2d(np.asarray(balances, dtype=np.float64))
+    days = np.broadcast_to(np.atleast_2d(_as_day_numbers(dates)), values.shape)
+    n_scenarios, n_points = values.shape
+
+    if end_of_day and n_points > 1:
+        # Replace each point by the closing balance of its date (the last point of that date)
+        closing = np.ones(values.shape, dtype=bool)
+        closing[:, :-1] = days[:, 1:] != days[:, :-1]
+        closing_positions = np.flatnonzero(closing)
+        values = values.ravel()[closing_positions[np.searchsorted(closing_positions, np.arange(values.size))]]
+        values = values.reshape(n_scenarios, n_points)
+
+    rows, starts, ends = crunch_runs(values, threshold)
+    flat_days = days.ravel()
+    # Runs are separated by points at or above the threshold, so the minimum
+    # from one run start to the next is the minimum of the run itself
+    flat_starts = rows * n_points + starts
+    min_balance = np.minimum.reduceat(values.ravel(), flat_starts) if len(flat_starts) else np.empty(0)
+
+    open_ended = ends == n_points - 1
+    recovered_at = np.where(open_ended, 0, ends + 1)
+    start_days = flat_days[flat_starts]
+    recovery_days = flat_days[rows * n_points + recovered_at]
+    last_days = flat_days[rows * n_points + ends]
+    duration = np.where(open_ended, last_days + 1, recovery_days) - start_days
+
+    return CrunchIntervals(
+        scenario=rows,
+        start=from_day_numbers(start_days),
+        end=from_day_numbers(last_days),
+        recovery=np.where(open_ended, np.datetime64('NaT'), from_day_numbers(recovery_days)).astype('datetime64[ns]'),
+        duration_days=duration.astype(np.int64),
+        min_balance=min_balance,
+        threshold=threshold,
+        n_scenarios=n_scenarios
+    )
@@ -1,67 +1,590 @@
-def load_and_process_csv(file):
-    import pandas as pd
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from config.settings import DATA_CLEANING_THRESHOLD, EINVOICE_FILE_TYPES
+
+from .compact_ledger import ACCOUNT_COLUMN
+from .profiling import instrument
+from .validation import ValidationReport, check_rejection_threshold, validate_chunk
+
+
+@instrument()
+def load_and_process_csv(file, threshold=DATA_CLEANING_THRESHOLD, report=None):
     # Load the CSV file
     df = pd.read_csv(file)
 
-    # Data cleaning: Remove rows with missing values
-    df.dropna(inplace=True)
+    # Data cleaning: drop rows failing any validation rule (see utils.validation),
+    # parsing 'Date' and coercing 'Amount' to numeric on the way
+    report = report if report is not None else ValidationReport()
+    df = validate_chunk(df, report)
+
+    # Reject the file when too many rows were dropped
+    check_rejection_threshold(report, threshold)
+
+    return df
+
+# Explicit schema used by the streaming ingest path
+TRANSACTION_COLUMNS = ['Date', 'Description', 'Amount', 'Type', 'Status']
+CATEGORICAL_COLUMNS = ['Description', 'Type', 'Status']
+DEFAULT_CHUNKSIZE = 250_000
+
+
+def combine_chunks(chunks, categorical_columns=CATEGORICAL_COLUMNS):
+    """
+    Concatenate cleaned chunks, unifying categorical dictionaries first.
+
+    Args:
+        chunks (list): Validated transaction frames.
+        categorical_columns (list): Label columns whose categories are merged
+            when any chunk holds them as categoricals.
+
+    Returns:
+        DataFrame: The rows of every chunk, in order.
+    """
+    if not chunks:
+        return pd.DataFrame(columns=TRANSACTION_COLUMNS)
+
+    for column in categorical_columns:
+        if not all(column in chunk for chunk in chunks):
+            continue
+        if not any(isinstance(chunk[column].dtype, pd.CategoricalDtype) for chunk in chunks):
+            continue
+        chunks = [chunk.assign(**{column: chunk[column].astype('category')}) for chunk in chunks]
+        categories = union_categoricals([chunk[column] for chunk in chunks]).categories
+        chunks = [chunk.assign(**{column: chunk[column].cat.set_categories(categories)}) for chunk in chunks]
+
+    return pd.concat(chunks)
+
+
+def _iter_csv_chunks(file, chunksize):
+    dtypes = {column: 'category' for column in CATEGORICAL_COLUMNS}
+    yield from pd.read_csv(file, chunksize=chunksize, dtype=dtypes, parse_dates=['Date'])
+
+
+def _iter_pyarrow_chunks(file, chunksize):
+    try:
+        import pyarrow as pa
+        from pyarrow import csv
+    except ImportError as e:
+        raise ImportError("The 'pyarrow' engine requires the pyarrow package") from e
+
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    convert_options = csv.ConvertOptions(
+        column_types={
+            'Date': pa.timestamp('us'),
+            'Description': dictionary,
+            'Type': dictionary,
+            'Status': dictionary,
+            # Parsed as text so invalid amounts are coerced like the default path
+            'Amount': pa.string()
+        },
+        strings_can_be_null=True
+    )
+    # pyarrow batches by bytes; assume roughly 64 bytes per ledger row
+    read_options = csv.ReadOptions(block_size=max(chunksize * 64, 1 << 16))
+
+    offset = 0
+    for batch in csv.open_csv(file, read_options=read_options, convert_options=convert_options):
+        chunk = batch.to_pandas()
+        chunk.index = chunk.index + offset
+        offset += len(chunk)
+        yield chunk
+
+
+def load_and_process_csv_chunked(file, chunksize=DEFAULT_CHUNKSIZE, engine='c', threshold=DATA_CLEANING_THRESHOLD,
+                                 report=None, total_rows=None):
+    """
+    Streaming variant of load_and_process_csv for very large ledgers.
+
+    The file is read in chunks with an explicit schema (dates parsed at read
+    time, labels as categoricals) and each chunk is validated as it arrives, so
+    peak memory stays close to the size of the cleaned result. The rejected
+    fraction is checked over the whole file, so the verdict matches
+    load_and_process_csv. When the file's row count is known, a file fails
+    as soon as its rejections exceed what the whole file allows, without
+    being read to the end.
+
+    Args:
+        file: Path or file-like object containing the CSV.
+        chunksize (int): Approximate number of rows per chunk.
+        engine (str): 'c' for the pandas reader or 'pyarrow' for the Arrow
+            streaming reader (requires pyarrow).
+        threshold (float): Maximum fraction of rejected rows; None disables the check.
+        report (ValidationReport): Filled with the rejection counts when given.
+        total_rows (int): Data rows in the file, if known, for failing early.
+
+    Returns:
+        DataFrame: Processed transaction data with the same rows and values as
+        load_and_process_csv, using categorical dtypes for label columns.
+
+    Raises:
+        DataValidationError: If the rejected fraction exceeds ``threshold``.
+    """
+    if engine == 'pyarrow':
+        reader = _iter_pyarrow_chunks(file, chunksize)
+    elif engine == 'c':
+        reader = _iter_csv_chunks(file, chunksize)
+    else:
+        raise ValueError(f"Unknown engine: {engine!r}")
+
+    report = report if report is not None else ValidationReport()
+    chunks = []
+    for chunk in reader:
+        chunks.append(validate_chunk(chunk, report))
+        if total_rows is not None:
+            check_rejection_threshold(report, threshold, total_rows=total_rows)
+    check_rejection_threshold(report, threshold)
+    return combine_chunks(chunks)
+
+# Columnar snapshots written next to the source CSV
+SNAPSHOT_SUFFIX = '.snapshot.feather'
+SNAPSHOT_EXTENSIONS = ('.feather', '.arrow', '.parquet')
+_SNAPSHOT_HASH_KEY = b'finflow.source_sha256'
+_SNAPSHOT_STAT_KEY = b'finflow.source_stat'
+
+
+def file_sha256(path, block_size=1 << 20):
+    """
+    Hash a file's content without loading it into memory at once.
+
+    Args:
+        path (str): Path to the file.
+        block_size (int): Number of bytes read per iteration.
+
+    Returns:
+        str: Hex SHA-256 digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def snapshot_path(source_path):
+    """Return the snapshot location used for a source CSV."""
+    return f"{source_path}{SNAPSHOT_SUFFIX}"
+
+
+def _source_stat(path):
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}".encode()
+
+
+def write_snapshot(df, path, source_path=None):
+    """
+    Write a processed transaction frame to an uncompressed Arrow IPC (Feather)
+    file, or to Parquet when the path ends in '.parquet'.
+
+    Args:
+        df (DataFrame): Processed transaction data.
+        path (str): Destination file.
+        source_path (str): Optional CSV the frame was built from; its hash is
+            stored in the snapshot metadata so stale snapshots are detected.
+    """
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df)
+    if source_path is not None:
+        metadata = dict(table.schema.metadata or {})
+        metadata[_SNAPSHOT_HASH_KEY] = file_sha256(source_path).encode()
+        metadata[_SNAPSHOT_STAT_KEY] = _source_stat(source_path)
+        table = table.replace_schema_metadata(metadata)
+
+    if str(path).endswith('.parquet'):
+        import pyarrow.parquet as pq
+        pq.write_table(table, path)
+    else:
+        import pyarrow.feather as feather
+        # Uncompressed so the file can be memory-mapped without decoding
+        feather.write_feather(table, path, compression='uncompressed')
+
+
+def _read_snapshot_table(source, memory_map=True):
+    import pyarrow as pa
+
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as handle:
+            magic = handle.read(6)
+        if magic[:4] == b'PAR1':
+            import pyarrow.parquet as pq
+            return pq.read_table(source, memory_map=memory_map)
+        stream = pa.memory_map(str(source)) if memory_map else pa.OSFile(str(source))
+        return pa.ipc.open_file(stream).read_all()
+
+    data = source.getvalue() if hasattr(source, 'getvalue') else source.read()
+    if data[:4] == b'PAR1':
+        import pyarrow.parquet as pq
+        return pq.read_table(pa.BufferReader(data))
+    return pa.ipc.open_file(pa.BufferReader(data)).read_all()
+
+
+@instrument()
+def read_snapshot(source, memory_map=True):
+    """
+    Load a processed transaction frame from a Feather/Arrow or Parquet snapshot.
+
+    Args:
+        source: Path or file-like object containing the snapshot.
+        memory_map (bool): Memory-map the file instead of reading it into memory.
+
+    Returns:
+        DataFrame: Processed transaction data.
+    """
+    return _read_snapshot_table(source, memory_map=memory_map).to_pandas()
+
+
+def _snapshot_is_fresh(snapshot, source_path):
+    import pyarrow as pa
+
+    if not os.path.exists(snapshot):
+        return False
+    try:
+        with pa.memory_map(snapshot) as stream:
+            metadata = pa.ipc.open_file(stream).schema.metadata or {}
+    except (pa.ArrowInvalid, OSError):
+        return False
+
+    stored_hash = metadata.get(_SNAPSHOT_HASH_KEY)
+    if stored_hash is None:
+        return False
+    # Unchanged size and mtime means unchanged content; skip hashing
+    if metadata.get(_SNAPSHOT_STAT_KEY) == _source_stat(source_path):
+        return True
+    return stored_hash.decode() == file_sha256(source_path)
+
+
+def load_transactions(source, use_snapshot=True, report=None):
+    """
+    Load processed transactions from a CSV or a columnar snapshot.
+
+    For CSV paths, a snapshot next to the source is reused when the source
+    hash is unchanged and (re)written otherwise.
 
-    # Convert 'Date' column to datetime
-    df['Date'] = pd.to_datetime(df['Date'])
+    Args:
+        source (str): Path to a CSV, Feather/Arrow or Parquet file.
+        use_snapshot (bool): Read and maintain the snapshot for CSV sources.
+        report (ValidationReport): Filled with rejection counts when the CSV
+            is parsed; snapshots hold already validated rows.
 
-    # Ensure 'Amount' is numeric
-    df['Amount'] = pd.to_numeric(df['Amount'], errors='coerce')
+    Returns:
+        DataFrame: Processed transaction data with categorical label columns,
+        whichever path it was loaded through.
+    """
+    path = os.fspath(source)
+    if path.endswith(SNAPSHOT_EXTENSIONS):
+        df = read_snapshot(path)
+        labels = [column for column in CATEGORICAL_COLUMNS
+                  if column in df and not isinstance(df[column].dtype, pd.CategoricalDtype)]
+        return df.astype({column: 'category' for column in labels}) if labels else df
 
-    # Filter out any rows where 'Amount' could not be converted
-    df.dropna(subset=['Amount'], inplace=True)
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        use_snapshot = False
 
+    if not use_snapshot:
+        return load_and_process_csv_chunked(path, report=report)
+
+    snapshot = snapshot_path(path)
+    if _snapshot_is_fresh(snapshot, path):
+        return read_snapshot(snapshot)
+
+    df = load_and_process_csv_chunked(path, report=report)
+    try:
+        write_snapshot(df, snapshot, source_path=path)
+    except OSError:
+        pass  # Read-only location: serve the parsed frame without caching
     return df
 
-def generate_mock_data():
-    import pandas as pd
-    from datetime import datetime, timedelta
-    import random
-
-    # Generate a realistic 50-transaction dataset for Asian SMEs
-    random.seed(42)  # For reproducible demo data
-    
-    # Realistic customer/vendor names for Asian SME context
-    customers = ['Acme Corp SG', 'TechVision Ltd', 'Global Traders HK', 'Metro Solutions', 'Pacific Imports']
-    vendors = ['Office Supplies Co', 'Cloud Services Inc', 'Utilities Provider', 'Marketing Agency', 'Logistics Partner']
-    
-    transactions = []
-    base_date = datetime.now() - timedelta(days=90)
-    
-    for i in range(50):
-        transaction_date = base_date + timedelta(days=random.randint(0, 90))
-        
-        # 60% inflows, 40% outflows (typical for healthy business)
-        is_inflow = random.random() < 0.6
-        
-        if is_inflow:
-            description = random.choice(customers)
-            amount = round(random.uniform(2000, 15000), 2)
-            trans_type = 'Inflow'
-            # 70% paid, 30% pending for inflows
-            status = 'Paid' if random.random() < 0.7 else 'Pending'
-        else:
-            description = random.choice(vendors)
-            amount = -round(random.uniform(500, 5000), 2)
-            trans_type = 'Outflow'
-            # 90% paid, 10% pending for outflows
-            status = 'Paid' if random.random() < 0.9 else 'Pending'
-        
-        transactions.append({
-            'Date': transaction_date.strftime('%Y-%m-%d'),
-            'Description': description,
-            'Amount': amount,
-            'Type': trans_type,
-            'Status': status
-        })
-    
-    # Sort by date
-    mock_data = pd.DataFrame(transactions)
-    mock_data = mock_data.sort_values('Date').reset_index(drop=True)
-    
-    return mock_data
\ No newline at end of file
+# Multi-account ingest: one file per bank account or entity
+
+
+def account_name(source):
+    """
+    Derive an account label from a path or an uploaded file's name.
+
+    Args:
+        source: Path or object with a ``name`` attribute (e.g. a Streamlit UploadedFile).
+
+    Returns:
+        str: File name without directory and extension (snapshot suffix included).
+    """
+    name = os.path.basename(os.fspath(getattr(source, 'name', source)))
+    for suffix in (SNAPSHOT_SUFFIX, '.csv') + SNAPSHOT_EXTENSIONS + tuple(f'.{ext}' for ext in EINVOICE_FILE_TYPES):
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+def unique_account_names(sources):
+    """Account labels for several sources, suffixing duplicates with ' (2)', ' (3)', ..."""
+    names, seen = [], {}
+    for source in sources:
+        name = account_name(source)
+        seen[name] = seen.get(name, 0) + 1
+        names.append(name if seen[name] == 1 else f"{name} ({seen[name]})")
+    return names
+
+
+def _merge_order(runs):
+    """
+    Stable k-way merge order for sorted int64 key runs, without sorting.
+
+    Each run is walked as its groups of equal keys. A group lands after the
+    rows of every other run that precede it (ties go to the earlier run),
+    found with one searchsorted per other run, so the cost grows with the
+    number of distinct dates rather than rows. Rows are then scattered to
+    their merged positions.
+
+    Args:
+        runs (list): Sorted int64 arrays, one per frame.
+
+    Returns:
+        ndarray: Positions into the concatenated runs, in merged order.
+    """
+    starts = np.cumsum([0] + [len(run) for run in runs])
+    order = np.empty(starts[-1], dtype=np.intp)
+    for r, run in enumerate(runs):
+        first = np.flatnonzero(np.diff(run, prepend=run[:1] - 1))
+        keys = run[first]
+        offsets = np.zeros(len(keys), dtype=np.intp)
+        for s, other in enumerate(runs):
+            if s != r:
+                offsets += np.searchsorted(other, keys, side='right' if s < r else 'left')
+        positions = np.repeat(offsets, np.diff(first, append=len(run))) + np.arange(len(run))
+        order[positions] = np.arange(starts[r], starts[r + 1])
+    return order
+
+
+def merge_sorted_frames(frames, accounts=None, on='Date'):
+    """
+    Combine per-account frames that are each sorted by date into one sorted frame.
+
+    The date columns are already sorted runs, so they are merged rather than
+    re-sorted: _merge_order places every row from the sorted keys alone and
+    the frames are then gathered once in merged order. Rows with equal dates
+    keep file order, then their order within the file.
+
+    Args:
+        frames (list): Processed transaction frames; unsorted ones are sorted first.
+        accounts (list): Account label per frame, stored in an 'Account' column.
+        on (str): Sort column.
+
+    Returns:
+        DataFrame: All rows in date order with a fresh RangeIndex.
+    """
+    frames = [frame if frame[on].is_monotonic_increasing else frame.sort_values(on, kind='stable')
+              for frame in frames]
+    if accounts is not None:
+        if len(accounts) != len(frames):
+            raise ValueError("Expected one account label per frame")
+        account_dtype = pd.CategoricalDtype(list(accounts))
+        frames = [frame.assign(**{ACCOUNT_COLUMN: pd.Categorical.from_codes(np.full(len(frame), code),
+                                                                            dtype=account_dtype)})
+                  for code, frame in enumerate(frames)]
+
+    combined = combine_chunks(frames)
+    if len(frames) < 2:
+        return combined.reset_index(drop=True)
+
+    runs = [frame[on].to_numpy(dtype='datetime64[ns]').view(np.int64) for frame in frames]
+    return combined.take(_merge_order(runs)).reset_index(drop=True)
+
+
+def load_accounts(sources, accounts=None, loader=load_transactions, max_workers=None):
+    """
+    Load several account ledgers concurrently and merge them in date order.
+
+    Files are parsed in a thread pool (the pandas and Arrow readers release
+    the GIL while parsing), then combined with merge_sorted_frames.
+
+    Args:
+        sources (list): Paths (or file objects accepted by ``loader``), one per account.
+        accounts (list): Account labels; defaults to the file names.
+        loader (callable): Function loading one source into a processed frame.
+        max_workers (int): Parser threads; defaults to one per source, up to the CPU count.
+
+    Returns:
+        DataFrame: Merged transactions with an 'Account' column.
+    """
+    sources = list(sources)
+    accounts = list(accounts) if accounts is not None else unique_account_names(sources)
+    if len(sources) <= 1:
+        frames = [loader(source) for source in sources]
+    else:
+        workers = max_workers or min(len(sources), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            frames = list(executor.map(loader, sources))
+    return merge_sorted_frames(frames, accounts)
+
+
+# Realistic customer/vendor names for Asian SME context
+MOCK_CUSTOMERS = ['Acme Corp SG', 'TechVision Ltd', 'Global Traders HK', 'Metro Solutions', 'Pacific Imports']
+MOCK_VENDORS = ['Office Supplies Co', 'Cloud Services Inc', 'Utilities Provider', 'Marketing Agency', 'Logistics Partner']
+GENERATOR_CHUNKSIZE = 1_000_000
+
+
+def _customer_pool(n_customers, skew):
+    """Customer names and Zipf-like selection weights (skew 0 is uniform)."""
+    n_customers = n_customers or len(MOCK_CUSTOMERS)
+    names = MOCK_CUSTOMERS[:n_customers] + [
+        f"Customer {i:05d}" for i in range(len(MOCK_CUSTOMERS), n_customers)
+    ]
+    weights = 1.0 / np.arange(1, n_customers + 1) ** skew
+    return names, weights / weights.sum()
+
+
+def _generate_chunk(rng, n_rows, start, day_low, day_high, customers, customer_weights, currencies=None):
+    # 60% inflows, 40% outflows (typical for healthy business)
+    is_inflow = rng.random(n_rows) < 0.6
+    # 70% of inflows and 90% of outflows are paid
+    paid = rng.random(n_rows) < np.where(is_inflow, 0.7, 0.9)
+    scale = rng.random(n_rows)
+    amounts = np.where(is_inflow, 2000 + 13000 * scale, -(500 + 4500 * scale)).round(2)
+
+    customer_codes = rng.choice(len(customers), n_rows, p=customer_weights)
+    vendor_codes = len(customers) + rng.integers(0, len(MOCK_VENDORS), n_rows)
+    description_codes = np.where(is_inflow, customer_codes, vendor_codes)
+
+    offsets = np.floor(rng.uniform(day_low, day_high, n_rows)).astype(np.int64)
+    order = np.argsort(offsets, kind='stable')
+
+    chunk = pd.DataFrame({
+        'Date': (start + offsets[order].astype('timedelta64[D]')).astype('datetime64[ns]'),
+        'Description': pd.Categorical.from_codes(description_codes[order], customers + MOCK_VENDORS),
+        'Amount': amounts[order],
+        'Type': pd.Categorical.from_codes((~is_inflow[order]).astype(np.int8), ['Inflow', 'Outflow']),
+        'Status': pd.Categorical.from_codes((~paid[order]).astype(np.int8), ['Paid', 'Pending'])
+    })
+    if currencies:
+        # Every customer and vendor invoices in one currency of the pool
+        chunk['Currency'] = pd.Categorical.from_codes(description_codes[order] % len(currencies), list(currencies))
+    return chunk
+
+
+def iter_generated_transactions(n_rows, days=90, end_date=None, n_customers=None, skew=0.0, seed=42,
+                                chunksize=GENERATOR_CHUNKSIZE, currencies=None):
+    """
+    Stream a synthetic ledger in date-sorted chunks.
+
+    Each chunk covers its own slice of the date span, so the concatenated
+    output is sorted by date while only one chunk is in memory at a time.
+
+    Args:
+        n_rows (int): Total number of transactions.
+        days (int): Date span; dates fall in [end_date - days, end_date].
+        end_date: Last possible date (defaults to today).
+        n_customers (int): Size of the customer pool (defaults to the 5 demo customers).
+        skew (float): Zipf exponent for customer popularity; 0 picks customers uniformly.
+        seed (int): Random seed; the same arguments always give the same ledger.
+        chunksize (int): Rows per yielded chunk.
+        currencies (list): Optional currency pool (e.g. ['SGD', 'HKD', 'USD']); adds
+            a 'Currency' column with one currency per customer/vendor.
+
+    Yields:
+        DataFrame: Date-sorted transactions with categorical label columns.
+    """
+    end = pd.Timestamp(end_date if end_date is not None else pd.Timestamp.now()).normalize()
+    start = np.datetime64((end - pd.Timedelta(days=days)).date(), 'D')
+    customers, customer_weights = _customer_pool(n_customers, skew)
+
+    n_chunks = max(1, -(-n_rows // chunksize))
+    boundaries = np.linspace(0, days + 1, n_chunks + 1)
+    for chunk in range(n_chunks):
+        rows = min(chunksize, n_rows - chunk * chunksize)
+        rng = np.random.default_rng(seed if n_chunks == 1 else [seed, chunk])
+        yield _generate_chunk(rng, rows, start, boundaries[chunk], boundaries[chunk + 1],
+                              customers, customer_weights, currencies)
+
+
+def generate_transactions(n_rows=50, days=90, end_date=None, n_customers=None, skew=0.0, seed=42,
+                          chunksize=GENERATOR_CHUNKSIZE, currencies=None):
+    """
+    Generate a synthetic ledger in memory with vectorized NumPy sampling.
+
+    Args:
+        n_rows (int): Number of transactions.
+        days (int): Date span ending at ``end_date``.
+        end_date: Last possible date (defaults to today).
+        n_customers (int): Size of the customer pool.
+        skew (float): Zipf exponent for customer popularity.
+        seed (int): Random seed.
+        chunksize (int): Rows generated per internal chunk.
+        currencies (list): Optional currency pool for a 'Currency' column.
+
+    Returns:
+        DataFrame: Date-sorted transactions.
+    """
+    chunks = list(iter_generated_transactions(n_rows, days=days, end_date=end_date, n_customers=n_customers,
+                                              skew=skew, seed=seed, chunksize=chunksize, currencies=currencies))
+    return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+
+def write_generated_transactions(path, n_rows, chunksize=GENERATOR_CHUNKSIZE, **options):
+    """
+    Write a synthetic ledger chunk by chunk with bounded memory.
+
+    Args:
+        path (str): Destination; '.csv', '.parquet' or Feather/Arrow ('.feather', '.arrow').
+        n_rows (int): Number of transactions.
+        chunksize (int): Rows generated and written per chunk.
+        **options: Forwarded to iter_generated_transactions.
+
+    Returns:
+        int: Number of rows written.
+    """
+    chunks = iter_generated_transactions(n_rows, chunksize=chunksize, **options)
+    path = os.fspath(path)
+    written = 0
+
+    if path.endswith('.csv'):
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False, date_format='%Y-%m-%d')
+            written += len(chunk)
+        return written
+
+    import pyarrow as pa
+
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                if path.endswith('.parquet'):
+                    import pyarrow.parquet as pq
+                    writer = pq.ParquetWriter(path, table.schema)
+                else:
+                    writer = pa.ipc.new_file(path, table.schema)
+            writer.write_table(table)
+            written += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return written
+
+
+def generate_mock_data(n_rows=50, seed=42):
+    """
+    Generate the demo dataset: a reproducible ledger for Asian SMEs covering
+    the last 90 days, with dates as 'YYYY-MM-DD' strings.
+
+    Args:
+        n_rows (int): Number of transactions.
+        seed (int): Random seed for reproducible demo data.
+
+    Returns:
+        DataFrame: Date-sorted transactions.
+    """
+    mock_data = generate_transactions(n_rows, days=90, seed=seed)
+    return mock_data.assign(
+        Date=mock_data['Date'].dt.strftime('%Y-%m-%d'),
+        Description=mock_data['Description'].astype(str),
+        Type=mock_data['Type'].astype(str),
+        Status=mock_data['Status'].astype(str)
+    )
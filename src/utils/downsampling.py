@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+
+from .crunch import crunch_runs
+
+
+def daily_end_of_day(dates, balance):
+    """
+    Collapse a date-sorted balance curve to one end-of-day value per day.
+
+    Args:
+        dates (Series): Sorted transaction dates.
+        balance (Series): Cumulative balance aligned with ``dates``.
+
+    Returns:
+        Series: End-of-day balance indexed by day.
+    """
+    days = pd.to_datetime(dates).dt.normalize().to_numpy()
+    values = np.asarray(balance, dtype=np.float64)
+    if len(days) == 0:
+        return pd.Series(values, index=pd.DatetimeIndex(days), name='Balance')
+
+    last_of_day = np.r_[days[1:] != days[:-1], True]
+    return pd.Series(values[last_of_day], index=pd.DatetimeIndex(days[last_of_day]), name='Balance')
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Select points with the Largest-Triangle-Three-Buckets algorithm.
+
+    Args:
+        x (ndarray): Monotonic x coordinates (numeric).
+        y (ndarray): Values.
+        n_out (int): Number of points to keep (at least 3).
+
+    Returns:
+        ndarray: Sorted indices of the selected points, first and last included.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # Bucket edges over the interior points; first and last are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_start = stop
+        next_stop = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        avg_x = x[next_start:next_stop].mean()
+        avg_y = y[next_start:next_stop].mean()
+
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (avg_y - y[previous])
+        )
+        previous = start + int(area.argmax())
+        selected[bucket + 1] = previous
+    return selected
+
+
+def crunch_keep_indices(values, threshold=0, max_points=None):
+    """
+    Indices that must survive downsampling: the global minimum and every
+    point below ``threshold``.
+
+    When ``max_points`` cannot hold all crunch points, each run below the
+    threshold is cut to its first, last and lowest point; if even those do
+    not fit, they are thinned with LTTB to ``max_points`` (the minimum kept).
+
+    Args:
+        values (ndarray): Balance values.
+        threshold (float): Balance below which a point is a cash crunch.
+        max_points (int): Most indices to return; None keeps every crunch point.
+
+    Returns:
+        ndarray: Sorted unique indices.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return np.array([], dtype=np.int64)
+
+    minimum = np.array([values.argmin()])
+    keep = np.union1d(minimum, np.flatnonzero(values < threshold))
+    if max_points is None or len(keep) <= max_points:
+        return keep
+
+    _, starts, ends = crunch_runs(values, threshold)
+    run_ids = np.repeat(np.arange(len(starts)), ends - starts + 1)
+    positions = np.flatnonzero(values < threshold)
+    order = np.lexsort((values[positions], run_ids))
+    first_of_run = np.r_[True, run_ids[order][1:] != run_ids[order][:-1]]
+    keep = np.unique(np.concatenate([minimum, starts, ends, positions[order][first_of_run]]))
+    if len(keep) <= max_points:
+        return keep
+
+    others = keep[keep != minimum[0]]
+    n_others = max_points - 1
+    if n_others >= 3:
+        others = others[lttb_indices(others, values[others], n_others)]
+    else:
+        others = others[np.argsort(values[others], kind='stable')[:max(n_others, 0)]]
+    return np.union1d(minimum, others)
+
+
+def downsample_indices(x, y, max_points, threshold=0):
+    """
+    Positions of at most ``max_points`` points preserving the curve's shape,
+    its minimum and its crunch points.
+
+    Crunch points are counted against the budget: LTTB picks the shape
+    points with whatever room the crunch points leave.
+
+    Args:
+        x (ndarray): Monotonic x coordinates (numeric).
+        y (ndarray): Values.
+        max_points (int): Point budget.
+        threshold (float): Crunch threshold whose points must be preserved.
+
+    Returns:
+        ndarray: Sorted indices of the selected points.
+    """
+    if len(y) <= max_points:
+        return np.arange(len(y))
+
+    forced = crunch_keep_indices(y, threshold, max_points)
+    room = max_points - len(forced)
+    if room >= 3:
+        shape = lttb_indices(x, y, room)
+    else:
+        shape = np.array([0, len(y) - 1][:max(room, 0)], dtype=np.int64)
+    return np.union1d(forced, shape)
+
+
+def downsample_series(series, max_points, threshold=0):
+    """
+    Reduce a date-indexed series to at most ``max_points`` while preserving
+    its shape, its minimum and its cash-crunch points.
+
+    Args:
+        series (Series): Values indexed by date.
+        max_points (int): Point budget.
+        threshold (float): Crunch threshold whose points must be preserved.
+
+    Returns:
+        Series: The selected points in date order.
+    """
+    if len(series) <= max_points:
+        return series
+
+    x = series.index.to_numpy().astype('datetime64[ns]').astype(np.int64)
+    return series.iloc[downsample_indices(x, series.to_numpy(dtype=np.float64), max_points, threshold)]
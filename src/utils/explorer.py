@@ -0,0 +1,171 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .compact_ledger import to_day_numbers
+from .hashing import frame_fingerprint
+from .transaction_index import get_transaction_index
+
+SORTABLE_COLUMNS = ('Date', 'Amount', 'Description')
+DEFAULT_PAGE_SIZE = 50
+_EXPLORER_CACHE_SIZE = 4
+
+
+@dataclass
+class ExplorerQuery:
+    """Filters and sort order of one explorer view; ``None`` filters match everything."""
+    start: pd.Timestamp = None
+    end: pd.Timestamp = None
+    customers: tuple = None
+    types: tuple = None
+    statuses: tuple = None
+    sort_by: str = 'Date'
+    ascending: bool = True
+
+
+class TransactionExplorer:
+    """
+    Server-side filtering, sorting and pagination over one dataset.
+
+    Label filters reuse the dictionary codes of the TransactionIndex (a
+    lookup table per column instead of string comparisons), and a row order
+    per sortable column is computed once. Dates are searched in the date
+    order, so a pure date-range view is a slice. Only the requested page is
+    materialized as a DataFrame.
+    """
+
+    def __init__(self, transactions, index=None):
+        self.transactions = transactions
+        self.index = index if index is not None else get_transaction_index(transactions)
+        self.days = self.index.ledger.day
+        self._orders = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.days)
+
+    def order(self, column):
+        """Row positions sorted ascending by ``column`` (stable), computed once per column."""
+        if column not in SORTABLE_COLUMNS:
+            raise ValueError(f"Cannot sort by {column!r}; choose one of {SORTABLE_COLUMNS}")
+        with self._lock:
+            order = self._orders.get(column)
+        if order is None:
+            if column == 'Date':
+                order = np.argsort(self.days, kind='stable')
+            elif column == 'Amount':
+                order = np.argsort(self.index.amounts, kind='stable')
+            else:
+                # Sort the dictionary once, then rows by the rank of their code
+                ranks = np.empty(len(self.index.customers), dtype=np.int64)
+                ranks[np.argsort(self.index.customers.astype(str), kind='stable')] = np.arange(len(ranks))
+                order = np.argsort(ranks[self.index.customer_codes], kind='stable')
+            with self._lock:
+                self._orders[column] = order
+        return order
+
+    def _label_filter(self, codes, labels, selected):
+        if selected is None:
+            return None
+        allowed = np.isin(labels, list(selected))
+        return allowed[codes] if len(labels) else np.zeros(len(codes), dtype=bool)
+
+    def _date_bounds(self, query):
+        """Slice of the date order covering the query's date range."""
+        date_order = self.order('Date')
+        sorted_days = self.days[date_order]
+        low = 0 if query.start is None else np.searchsorted(sorted_days, to_day_numbers([query.start])[0], 'left')
+        high = len(sorted_days) if query.end is None \
+            else np.searchsorted(sorted_days, to_day_numbers([query.end])[0], 'right')
+        return date_order, low, high
+
+    def select(self, query):
+        """
+        Row positions matching a query, in display order.
+
+        Args:
+            query (ExplorerQuery): Filters and sort order.
+
+        Returns:
+            ndarray: Positional row indices.
+        """
+        masks = [mask for mask in (
+            self._label_filter(self.index.customer_codes, self.index.customers, query.customers),
+            self._label_filter(self.index.type_codes, self.index.type_labels, query.types),
+            self._label_filter(self.index.status_codes, self.index.status_labels, query.statuses),
+        ) if mask is not None]
+
+        date_order, low, high = self._date_bounds(query)
+        if query.sort_by == 'Date':
+            rows = date_order[low:high]
+        else:
+            rows = self.order(query.sort_by)
+            if low > 0 or high < len(date_order):
+                in_range = np.zeros(len(self), dtype=bool)
+                in_range[date_order[low:high]] = True
+                masks.append(in_range)
+
+        if masks:
+            mask = masks[0] if len(masks) == 1 else np.logical_and.reduce(masks)
+            rows = rows[mask[rows]]
+        return rows if query.ascending else rows[::-1]
+
+    def page(self, rows, page=1, page_size=DEFAULT_PAGE_SIZE):
+        """
+        Materialize one page of selected rows.
+
+        Args:
+            rows (ndarray): Output of select.
+            page (int): 1-based page number, clipped to the available pages.
+            page_size (int): Rows per page.
+
+        Returns:
+            DataFrame: The page's rows with their original index labels.
+        """
+        n_pages = max(1, -(-len(rows) // page_size))
+        page = min(max(int(page), 1), n_pages)
+        return self.transactions.iloc[rows[(page - 1) * page_size:page * page_size]]
+
+    def summary(self, rows):
+        """
+        Totals of the selected rows from the index arrays.
+
+        Returns:
+            dict: 'rows', 'inflow', 'outflow' and 'net' amounts.
+        """
+        amounts = self.index.amounts[rows]
+        inflow = amounts[amounts > 0].sum()
+        outflow = amounts[amounts < 0].sum()
+        return {'rows': len(rows), 'inflow': inflow, 'outflow': outflow, 'net': inflow + outflow}
+
+
+_explorer_cache = OrderedDict()
+_explorer_lock = threading.Lock()
+
+
+def get_explorer(transactions):
+    """
+    Return the TransactionExplorer for a dataset, building it on first use.
+
+    Args:
+        transactions (DataFrame): A DataFrame containing transaction data.
+
+    Returns:
+        TransactionExplorer: Cached explorer keyed by dataset fingerprint.
+    """
+    key = frame_fingerprint(transactions)
+    with _explorer_lock:
+        explorer = _explorer_cache.get(key)
+        if explorer is not None:
+            _explorer_cache.move_to_end(key)
+            return explorer
+
+    explorer = TransactionExplorer(transactions)
+    with _explorer_lock:
+        _explorer_cache[key] = explorer
+        while len(_explorer_cache) > _EXPLORER_CACHE_SIZE:
+            _explorer_cache.popitem(last=False)
+    return explorer
@@ -0,0 +1,180 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from config.settings import DEFAULT_CURRENCY, FX_BASE_CURRENCY, FX_RATES_FILE
+
+from .compact_ledger import to_day_numbers
+from .hashing import content_hash, frame_fingerprint, remember_fingerprint
+
+CURRENCY_COLUMN = 'Currency'
+RATE_COLUMNS = ['Date', 'Currency', 'Rate']
+_NORMALIZED_CACHE_SIZE = 8
+
+
+class FxRateTable:
+    """
+    Dated FX rates quoted as units of ``base_currency`` per unit of currency.
+
+    Rows are kept sorted by (currency code, day) and packed into one int64
+    key per row, so the as-of lookup for every transaction (latest rate on or
+    before its date) is a single vectorized ``searchsorted`` over all
+    currencies at once.
+    """
+
+    def __init__(self, rates, base_currency=FX_BASE_CURRENCY):
+        missing = set(RATE_COLUMNS) - set(rates.columns)
+        if missing:
+            raise ValueError(f"FX rate table is missing columns: {sorted(missing)}")
+
+        self.base_currency = base_currency
+        rates = rates[RATE_COLUMNS].dropna()
+        codes, currencies = pd.factorize(rates['Currency'].astype(str).str.upper(), sort=True)
+        self.currencies = np.asarray(currencies, dtype=object)
+        days = to_day_numbers(rates['Date'])
+        order = np.lexsort((days, codes))
+
+        self.codes = codes[order].astype(np.int64)
+        self.days = days[order]
+        self.rates = rates['Rate'].to_numpy(dtype=np.float64)[order]
+        self.keys = self._pack(self.codes, self.days)
+        self.fingerprint = content_hash(
+            self.keys.tobytes() + self.rates.tobytes(), currencies=tuple(self.currencies), base=base_currency
+        )
+
+    @staticmethod
+    def _pack(codes, days):
+        # Day numbers are shifted to non-negative so the packed keys sort by (code, day)
+        return (codes << 32) | (np.asarray(days, dtype=np.int64) + (1 << 31))
+
+    def __contains__(self, currency):
+        return currency == self.base_currency or currency in set(self.currencies)
+
+    def rates_for(self, currencies, dates):
+        """
+        Rates to the base currency effective on each date.
+
+        Dates before a currency's first quote use that first quote.
+
+        Args:
+            currencies: Currency code per row.
+            dates: Date per row.
+
+        Returns:
+            ndarray: float64 rate per row (1.0 for the base currency).
+
+        Raises:
+            ValueError: If a currency has no rates in the table.
+        """
+        currencies = pd.Series(np.asarray(currencies, dtype=object)).astype(str).str.upper().to_numpy()
+        base = currencies == self.base_currency
+        codes = pd.Index(self.currencies).get_indexer(currencies).astype(np.int64)
+        unknown = (codes < 0) & ~base
+        if unknown.any():
+            raise ValueError(f"No FX rates for currencies: {', '.join(sorted(set(map(str, currencies[unknown]))))}")
+        if len(self.rates) == 0:
+            return np.ones(len(codes))
+
+        codes[base] = 0  # Any valid code; base rows are set to 1.0 below
+        position = np.searchsorted(self.keys, self._pack(codes, to_day_numbers(dates)), side='right') - 1
+        # Dates before a currency's first quote take that first quote
+        position = np.maximum(position, np.searchsorted(self.codes, codes, side='left'))
+        return np.where(base, 1.0, self.rates[position])
+
+    def conversion_factors(self, currencies, dates, reporting_currency=DEFAULT_CURRENCY):
+        """Multipliers converting each row's amount to ``reporting_currency`` via the base currency."""
+        factors = self.rates_for(currencies, dates)
+        if reporting_currency != self.base_currency:
+            n_rows = len(factors)
+            factors = factors / self.rates_for(np.repeat(reporting_currency, n_rows), dates)
+        return factors
+
+
+def load_fx_rates(path=FX_RATES_FILE, base_currency=FX_BASE_CURRENCY):
+    """
+    Load a Date,Currency,Rate CSV (units of ``base_currency`` per unit of Currency).
+
+    Args:
+        path (str): Rate file.
+        base_currency (str): Currency the rates are quoted in.
+
+    Returns:
+        FxRateTable: The parsed table.
+    """
+    return FxRateTable(pd.read_csv(path, parse_dates=['Date']), base_currency=base_currency)
+
+
+_rates_cache = {}
+_rates_lock = threading.Lock()
+
+
+def get_fx_rates(path=FX_RATES_FILE, base_currency=FX_BASE_CURRENCY):
+    """Return the rate table for a file, reloading it only when the file changes."""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, base_currency)
+    with _rates_lock:
+        table = _rates_cache.get(key)
+    if table is None:
+        table = load_fx_rates(path, base_currency)
+        with _rates_lock:
+            _rates_cache.clear()
+            _rates_cache[key] = table
+    return table
+
+
+_normalized_cache = OrderedDict()
+_normalized_lock = threading.Lock()
+
+
+def normalize_currency(transactions, rates=None, reporting_currency=DEFAULT_CURRENCY):
+    """
+    Convert amounts of a mixed-currency ledger to the reporting currency.
+
+    Ledgers without a 'Currency' column are returned unchanged. Otherwise
+    rows without a currency (e.g. a CSV account merged with e-invoices)
+    are taken to be in DEFAULT_CURRENCY, and
+    'Amount' is replaced by the converted amount (the original is kept in
+    'Original Amount' with the applied 'FX Rate'). Results are cached per
+    (dataset, rate table, reporting currency), and the converted frame
+    carries a derived fingerprint so downstream caches never rehash it.
+
+    Args:
+        transactions (DataFrame): Transaction data, optionally with 'Currency'.
+        rates (FxRateTable): Rate table; defaults to get_fx_rates().
+        reporting_currency (str): Target currency.
+
+    Returns:
+        DataFrame: Transactions with amounts in ``reporting_currency``. Treat it as read-only.
+    """
+    if CURRENCY_COLUMN not in transactions:
+        return transactions
+
+    rates = rates if rates is not None else get_fx_rates()
+    key = content_hash(frame_fingerprint(transactions).encode(), rates=rates.fingerprint,
+                       reporting=reporting_currency)
+    with _normalized_lock:
+        normalized = _normalized_cache.get(key)
+        if normalized is not None:
+            _normalized_cache.move_to_end(key)
+            return normalized
+
+    currencies = transactions[CURRENCY_COLUMN]
+    if currencies.isna().any():
+        currencies = currencies.astype(object).where(currencies.notna(), DEFAULT_CURRENCY).astype('category')
+    factors = rates.conversion_factors(currencies, transactions['Date'], reporting_currency)
+    original = transactions['Amount'].to_numpy(dtype=np.float64)
+    normalized = transactions.assign(**{
+        CURRENCY_COLUMN: currencies,
+        'Amount': np.round(original * factors, 2),
+        'Original Amount': original,
+        'FX Rate': factors
+    })
+    remember_fingerprint(normalized, key)
+    with _normalized_lock:
+        _normalized_cache[key] = normalized
+        while len(_normalized_cache) > _NORMALIZED_CACHE_SIZE:
+            _normalized_cache.popitem(last=False)
+    return normalized
@@ -0,0 +1,60 @@
+import hashlib
+import weakref
+
+import pandas as pd
+
+# id(frame) -> (weak reference, fingerprint) for frames already hashed
+_known_fingerprints = {}
+
+
+def content_hash(data, **options):
+    """
+    Hash raw file bytes together with the options used to parse them.
+
+    Args:
+        data (bytes): Raw file content.
+        **options: Parser options that influence the processed result.
+
+    Returns:
+        str: Hex digest identifying this (content, options) pair.
+    """
+    digest = hashlib.sha256(data)
+    for key in sorted(options):
+        digest.update(f"|{key}={options[key]!r}".encode())
+    return digest.hexdigest()
+
+
+def remember_fingerprint(df, fingerprint):
+    """
+    Record a known fingerprint for a frame so frame_fingerprint is O(1) for it.
+
+    Args:
+        df (DataFrame): Frame that will be treated as immutable.
+        fingerprint (str): Fingerprint to associate with it.
+    """
+    key = id(df)
+    _known_fingerprints[key] = (weakref.ref(df, lambda _: _known_fingerprints.pop(key, None)), fingerprint)
+
+
+def frame_fingerprint(df):
+    """
+    Identify a transaction frame by its content.
+
+    The result is memoized per frame object, so frames must not be mutated in
+    place after being fingerprinted.
+
+    Args:
+        df (DataFrame): Transaction data.
+
+    Returns:
+        str: Hex digest of the frame's columns, dtypes, index and values.
+    """
+    entry = _known_fingerprints.get(id(df))
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+
+    digest = hashlib.sha256(repr(list(zip(df.columns, map(str, df.dtypes)))).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    fingerprint = digest.hexdigest()
+    remember_fingerprint(df, fingerprint)
+    return fingerprint
@@ -0,0 +1,200 @@
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from config.settings import EINVOICE_FILE_TYPES, INGEST_CACHE_BUDGET_MB
+
+from .data_processor import (
+    SNAPSHOT_EXTENSIONS,
+    load_and_process_csv,
+    merge_sorted_frames,
+    read_snapshot,
+    unique_account_names,
+)
+from .hashing import content_hash, frame_fingerprint, remember_fingerprint
+from .peppol import load_einvoices
+
+
+def _read_bytes(file):
+    """Return the raw bytes of a path or file-like object without consuming it."""
+    if isinstance(file, (bytes, bytearray)):
+        return bytes(file)
+    if hasattr(file, 'getvalue'):
+        return file.getvalue()
+    if hasattr(file, 'read'):
+        position = file.tell() if hasattr(file, 'tell') else None
+        data = file.read()
+        if position is not None:
+            file.seek(position)
+        return data
+    with open(file, 'rb') as handle:
+        return handle.read()
+
+
+def _frame_nbytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class IngestCache:
+    """
+    Thread-safe LRU cache of processed transaction frames with a memory budget.
+
+    Entries are keyed by ``content_hash`` so identical uploads share one cleaned
+    frame across Streamlit sessions. Least recently used frames are evicted once
+    the total in-memory size exceeds ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, df):
+        nbytes = _frame_nbytes(df)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (df, nbytes)
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        """
+        Report cache counters.
+
+        Returns:
+            dict: Hits, misses, evictions, entry count and memory usage.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'current_bytes': self.current_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Process-wide cache shared by every Streamlit session
+_shared_cache = IngestCache(max_bytes=INGEST_CACHE_BUDGET_MB * 1024 * 1024)
+
+
+def get_ingest_cache():
+    """Return the process-wide ingest cache."""
+    return _shared_cache
+
+
+def cached_load_csv(file, loader=load_and_process_csv, cache=None, **options):
+    """
+    Load and clean a transaction file, reusing a previously cleaned frame when
+    the same bytes were already parsed with the same options.
+
+    Args:
+        file: Path, bytes or file-like object (e.g. a Streamlit UploadedFile).
+        loader (callable): Function turning a file-like object into a cleaned frame.
+        cache (IngestCache): Cache to use; defaults to the shared process cache.
+        **options: Extra keyword arguments forwarded to ``loader``.
+
+    Returns:
+        DataFrame: Processed transaction data. Treat it as read-only.
+    """
+    cache = cache if cache is not None else _shared_cache
+    data = _read_bytes(file)
+    key = content_hash(data, loader=f"{loader.__module__}.{loader.__qualname__}", **options)
+
+    df = cache.get(key)
+    if df is None:
+        df = loader(io.BytesIO(data), **options)
+        cache.put(key, df)
+
+    # Shallow copy so callers adding columns never touch the cached frame
+    result = df.copy(deep=False)
+    remember_fingerprint(result, key)
+    return result
+
+
+def _loader_for(file):
+    """Pick the snapshot reader, the e-invoice importer or the CSV loader from the file name."""
+    name = str(getattr(file, 'name', file))
+    if name.endswith(SNAPSHOT_EXTENSIONS):
+        return read_snapshot
+    if name.lower().endswith(tuple(f'.{ext}' for ext in EINVOICE_FILE_TYPES)):
+        return load_einvoices
+    return load_and_process_csv
+
+
+def cached_load_accounts(files, accounts=None, cache=None, max_workers=None):
+    """
+    Load one file per account concurrently and merge them in date order.
+
+    Each file goes through cached_load_csv (parsed in a thread pool on a miss),
+    and the merged frame is cached under the combination of the per-file
+    content keys, so reruns with the same uploads skip parsing and merging.
+
+    Args:
+        files (list): Paths or file-like objects (e.g. Streamlit UploadedFiles).
+        accounts (list): Account labels; defaults to the file names.
+        cache (IngestCache): Cache to use; defaults to the shared process cache.
+        max_workers (int): Parser threads; defaults to one per file.
+
+    Returns:
+        DataFrame: Merged transactions with an 'Account' column. Treat it as read-only.
+    """
+    cache = cache if cache is not None else _shared_cache
+    files = list(files)
+    accounts = list(accounts) if accounts is not None else unique_account_names(files)
+
+    def load(file):
+        return cached_load_csv(file, loader=_loader_for(file), cache=cache)
+
+    if len(files) <= 1:
+        frames = [load(file) for file in files]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers or len(files)) as executor:
+            frames = list(executor.map(load, files))
+
+    # cached_load_csv remembers each content key, so these lookups are O(1)
+    keys = "|".join(frame_fingerprint(frame) for frame in frames)
+    key = content_hash(keys.encode(), merge='accounts', accounts=tuple(accounts))
+    df = cache.get(key)
+    if df is None:
+        # A single file's merged frame shares its columns with the per-file
+        # entry (only Account is new), so caching it too costs little
+        df = merge_sorted_frames(frames, accounts)
+        cache.put(key, df)
+
+    result = df.copy(deep=False)
+    remember_fingerprint(result, key)
+    return result
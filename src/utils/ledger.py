@@ -0,0 +1,281 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+STATUSES = ('Paid', 'Pending')
+_EPOCH = pd.Timestamp('1970-01-01')
+
+
+def _day_number(date):
+    return (pd.Timestamp(date).normalize() - _EPOCH).days
+
+
+class FenwickTree:
+    """
+    Binary indexed tree over a fixed number of slots.
+
+    Supports point updates and prefix sums in O(log n).
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._tree = [0.0] * (size + 1)
+
+    @classmethod
+    def from_values(cls, values):
+        """Build a tree from per-slot values in O(n)."""
+        tree = cls(len(values))
+        data = tree._tree
+        for i, value in enumerate(values, start=1):
+            data[i] += float(value)
+            parent = i + (i & -i)
+            if parent <= tree.size:
+                data[parent] += data[i]
+        return tree
+
+    def add(self, slot, delta):
+        i = slot + 1
+        while i <= self.size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, slot):
+        """Sum of slots 0..slot inclusive; 0 for negative slots."""
+        i = min(slot, self.size - 1) + 1
+        total = 0.0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def total(self):
+        return self.prefix_sum(self.size - 1)
+
+
+class IncrementalLedger:
+    """
+    Append-only transaction ledger with logarithmic balance queries.
+
+    Amounts are accumulated per calendar day in three Fenwick trees (all
+    transactions, paid transactions and pending inflows), so appends, status
+    changes and "balance as of date D" queries never re-sort the ledger.
+    Out-of-order dates are accepted; the day range grows by doubling.
+    """
+
+    def __init__(self, start_date=None, capacity_days=366):
+        self._origin = _day_number(start_date) if start_date is not None else None
+        self._capacity = capacity_days
+        self._records = {}
+        self._ids = itertools.count()
+        self._reset_trees()
+
+    def _reset_trees(self, all_days=None, paid_days=None, pending_days=None):
+        size = self._capacity
+        self._all = FenwickTree.from_values(all_days if all_days is not None else np.zeros(size))
+        self._paid = FenwickTree.from_values(paid_days if paid_days is not None else np.zeros(size))
+        self._pending = FenwickTree.from_values(pending_days if pending_days is not None else np.zeros(size))
+
+    def _daily_totals(self, origin, capacity):
+        all_days = np.zeros(capacity)
+        paid_days = np.zeros(capacity)
+        pending_days = np.zeros(capacity)
+        for day, amount, is_inflow, status in self._records.values():
+            slot = day - origin
+            all_days[slot] += amount
+            if status == 'Paid':
+                paid_days[slot] += amount
+            elif is_inflow:
+                pending_days[slot] += amount
+        return all_days, paid_days, pending_days
+
+    def _slot(self, day):
+        """Map a day number to a tree slot, growing the covered range if needed."""
+        if self._origin is None:
+            self._origin = day
+        if self._origin <= day < self._origin + self._capacity:
+            return day - self._origin
+
+        first = min(day, self._origin)
+        last = max(day, self._origin + self._capacity - 1)
+        capacity = self._capacity
+        while capacity <= last - first:
+            capacity *= 2
+        # Keep room on the side that grew so further appends there are cheap
+        origin = first if day >= self._origin else last - capacity + 1
+        totals = self._daily_totals(origin, capacity)
+        self._origin, self._capacity = origin, capacity
+        self._reset_trees(*totals)
+        return day - self._origin
+
+    def append(self, date, amount, trans_type, status, txn_id=None):
+        """
+        Add one transaction.
+
+        Args:
+            date: Transaction date (anything pd.Timestamp accepts).
+            amount (float): Signed amount.
+            trans_type (str): 'Inflow' or 'Outflow'.
+            status (str): 'Paid' or 'Pending'.
+            txn_id: Optional unique identifier; generated when omitted.
+
+        Returns:
+            The transaction identifier.
+        """
+        if status not in STATUSES:
+            raise ValueError(f"Unknown status: {status!r}")
+        if txn_id is None:
+            # Skip ids already taken explicitly
+            txn_id = next(self._ids)
+            while txn_id in self._records:
+                txn_id = next(self._ids)
+        elif txn_id in self._records:
+            raise ValueError(f"Duplicate transaction id: {txn_id!r}")
+
+        day = _day_number(date)
+        slot = self._slot(day)
+        is_inflow = trans_type == 'Inflow'
+        amount = float(amount)
+        self._records[txn_id] = [day, amount, is_inflow, status]
+
+        self._all.add(slot, amount)
+        if status == 'Paid':
+            self._paid.add(slot, amount)
+        elif is_inflow:
+            self._pending.add(slot, amount)
+        return txn_id
+
+    def set_status(self, txn_id, status):
+        """
+        Change a transaction's status, e.g. when a pending invoice gets paid.
+
+        Args:
+            txn_id: Identifier returned by append.
+            status (str): 'Paid' or 'Pending'.
+        """
+        if status not in STATUSES:
+            raise ValueError(f"Unknown status: {status!r}")
+        record = self._records[txn_id]
+        day, amount, is_inflow, previous = record
+        if previous == status:
+            return
+
+        slot = day - self._origin
+        sign = 1 if status == 'Paid' else -1
+        self._paid.add(slot, sign * amount)
+        if is_inflow:
+            self._pending.add(slot, -sign * amount)
+        record[3] = status
+
+    def extend(self, transactions):
+        """
+        Append every row of a transaction DataFrame.
+
+        Args:
+            transactions (DataFrame): Rows with Date, Amount, Type and Status.
+
+        Returns:
+            list: Identifiers of the appended rows (the frame's index).
+        """
+        dates = pd.to_datetime(transactions['Date'])
+        rows = zip(transactions.index, dates, transactions['Amount'], transactions['Type'], transactions['Status'])
+        return [self.append(date, amount, trans_type, status, txn_id=txn_id)
+                for txn_id, date, amount, trans_type, status in rows]
+
+    @classmethod
+    def from_frame(cls, transactions):
+        """
+        Build a ledger from a transaction DataFrame, keyed by its index.
+
+        Raises:
+            ValueError: If the index has duplicate labels, as append does for duplicate ids.
+        """
+        ledger = cls()
+        if len(transactions) == 0:
+            return ledger
+        if transactions.index.has_duplicates:
+            duplicate = transactions.index[transactions.index.duplicated()][0]
+            raise ValueError(f"Duplicate transaction id: {duplicate!r}")
+
+        days = (pd.to_datetime(transactions['Date']).dt.normalize() - _EPOCH).dt.days.to_numpy()
+        ledger._origin = int(days.min())
+        span = int(days.max()) - ledger._origin + 1
+        while ledger._capacity < span:
+            ledger._capacity *= 2
+
+        amounts = transactions['Amount'].to_numpy(dtype=np.float64)
+        is_inflow = (transactions['Type'] == 'Inflow').to_numpy()
+        statuses = transactions['Status'].to_numpy()
+        if not np.isin(statuses, STATUSES).all():
+            raise ValueError("Status must be 'Paid' or 'Pending'")
+
+        slots = days - ledger._origin
+        paid = statuses == 'Paid'
+        all_days = np.bincount(slots, weights=amounts, minlength=ledger._capacity)
+        paid_days = np.bincount(slots[paid], weights=amounts[paid], minlength=ledger._capacity)
+        pending = ~paid & is_inflow
+        pending_days = np.bincount(slots[pending], weights=amounts[pending], minlength=ledger._capacity)
+        ledger._reset_trees(all_days, paid_days, pending_days)
+
+        ledger._records = {
+            txn_id: [int(day), float(amount), bool(inflow), str(status)]
+            for txn_id, day, amount, inflow, status in zip(transactions.index, days, amounts, is_inflow, statuses)
+        }
+        # Generated ids continue after the frame's integer labels
+        integer_ids = [txn_id for txn_id in ledger._records if isinstance(txn_id, (int, np.integer))]
+        ledger._ids = itertools.count(int(max(integer_ids)) + 1 if integer_ids else 0)
+        return ledger
+
+    def __len__(self):
+        return len(self._records)
+
+    def _prefix(self, tree, day):
+        if self._origin is None or day < self._origin:
+            return 0.0
+        return tree.prefix_sum(day - self._origin)
+
+    def balance_as_of(self, date, delay_days=0):
+        """
+        Cumulative balance of every transaction dated on or before ``date``.
+
+        Args:
+            date: Cut-off date (inclusive).
+            delay_days (int): Shift pending inflows later by this many days,
+                matching calculate_cumulative_cash_flow's reality mode.
+
+        Returns:
+            float: Projected balance at end of day ``date``.
+        """
+        day = _day_number(date)
+        balance = self._prefix(self._all, day)
+        if delay_days:
+            balance += self._prefix(self._pending, day - delay_days) - self._prefix(self._pending, day)
+        return balance
+
+    def paid_balance_as_of(self, date):
+        """Balance of paid transactions dated on or before ``date``."""
+        return self._prefix(self._paid, _day_number(date))
+
+    def paid_balance(self):
+        """Current balance from all paid transactions."""
+        return self._paid.total()
+
+    def liquidity_locked(self):
+        """Total of pending inflows, as calculate_liquidity_locked."""
+        return self._pending.total()
+
+    def to_frame(self):
+        """
+        Export the ledger as a Date/Amount/Type/Status DataFrame indexed by id.
+
+        Returns:
+            DataFrame: One row per transaction.
+        """
+        ids = list(self._records)
+        days, amounts, inflows, statuses = zip(*self._records.values()) if ids else ((), (), (), ())
+        return pd.DataFrame({
+            'Date': _EPOCH + pd.to_timedelta(np.asarray(days, dtype=np.int64), unit='D'),
+            'Amount': np.asarray(amounts, dtype=np.float64),
+            'Type': np.where(np.asarray(inflows, dtype=bool), 'Inflow', 'Outflow'),
+            'Status': list(statuses)
+        }, index=ids)
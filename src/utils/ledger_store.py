@@ -0,0 +1,370 @@
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from config.settings import LEDGER_STORE_PATH
+
+from .compact_ledger import ACCOUNT_COLUMN, MINOR_UNITS, from_day_numbers, to_day_numbers, to_minor_units
+
+TRANSACTION_ID_COLUMN = 'Transaction ID'
+# Fields a transaction keeps for life; Status and Amount change as invoices get paid
+_ID_SOURCE_COLUMNS = ['Date', 'Description', 'Type']
+_LOAD_CACHE_SIZE = 4
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id TEXT PRIMARY KEY,
+    day INTEGER NOT NULL,
+    description TEXT NOT NULL,
+    amount_minor INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    account TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_day ON transactions (day, amount_minor);
+CREATE INDEX IF NOT EXISTS idx_transactions_customer ON transactions (description, status, type);
+CREATE INDEX IF NOT EXISTS idx_transactions_status ON transactions (status, type, day, amount_minor);
+"""
+
+_INSERT = """
+INSERT INTO transactions (id, day, description, amount_minor, type, status, account)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+_UPSERT = """
+INSERT INTO transactions (id, day, description, amount_minor, type, status, account)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    day = excluded.day,
+    description = excluded.description,
+    amount_minor = excluded.amount_minor,
+    type = excluded.type,
+    status = excluded.status,
+    account = excluded.account
+"""
+
+
+def transaction_ids(transactions):
+    """
+    Stable ids for rows without a 'Transaction ID' column.
+
+    The id hashes the row's account, date, customer and type, which do not
+    change when an invoice moves from Pending to Paid, so re-importing an
+    updated ledger replaces its rows instead of duplicating them. Rows
+    sharing those fields are told apart by their occurrence number in the
+    file, so such rows must keep their relative order between imports;
+    ledgers where that does not hold need a 'Transaction ID' column.
+
+    Args:
+        transactions (DataFrame): Transaction data.
+
+    Returns:
+        Series: String id per row.
+    """
+    if TRANSACTION_ID_COLUMN in transactions:
+        return transactions[TRANSACTION_ID_COLUMN].astype(str)
+
+    columns = _ID_SOURCE_COLUMNS + ([ACCOUNT_COLUMN] if ACCOUNT_COLUMN in transactions else [])
+    # Day numbers rather than timestamps, so the datetime resolution does not change the id
+    values = transactions[columns].astype({column: str for column in columns if column != 'Date'})
+    values['Date'] = to_day_numbers(transactions['Date'])
+    hashes = pd.Series(pd.util.hash_pandas_object(values, index=False).to_numpy(), index=transactions.index)
+    occurrence = hashes.groupby(hashes).cumcount()
+    return hashes.astype(str) + '-' + occurrence.astype(str)
+
+
+def _day_bound(date):
+    return None if date is None else int(to_day_numbers([date])[0])
+
+
+class LedgerStore:
+    """
+    Persistent ledger in embedded SQLite, indexed by date, customer and status.
+
+    Dates are stored as day numbers and amounts as integer minor units (as
+    in CompactLedger), so pushed-down sums are exact. Aggregates run inside
+    SQLite and only their results reach pandas; ``load`` returns one row
+    per (day, type, status, customer, account), which the analyzers accept
+    as a regular transaction frame.
+
+    One connection is shared by all threads and serialized by a lock.
+    """
+
+    def __init__(self, path=':memory:'):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self._writes = 0
+        self._load_cache = OrderedDict()
+        with self._lock:
+            if path != ':memory:':
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def __len__(self):
+        return self._query("SELECT COUNT(*) FROM transactions")[0][0]
+
+    def _filters(self, start=None, end=None, accounts=None, **equals):
+        """WHERE clause and parameters for the common filters; ``start``/``end`` are inclusive."""
+        clauses, params = [], []
+        for column, value in equals.items():
+            clauses.append(f"{column} = ?")
+            params.append(value)
+        if start is not None:
+            clauses.append("day >= ?")
+            params.append(_day_bound(start))
+        if end is not None:
+            clauses.append("day <= ?")
+            params.append(_day_bound(end))
+        if accounts is not None:
+            accounts = list(accounts)
+            clauses.append(f"account IN ({', '.join('?' * len(accounts))})")
+            params.extend(map(str, accounts))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _write(self, statement, transactions, account):
+        if account is not None:
+            accounts = np.full(len(transactions), str(account), dtype=object)
+        elif ACCOUNT_COLUMN in transactions:
+            accounts = transactions[ACCOUNT_COLUMN].astype(str).to_numpy(dtype=object)
+        else:
+            accounts = np.full(len(transactions), '', dtype=object)
+
+        rows = zip(
+            transaction_ids(transactions).tolist(),
+            to_day_numbers(transactions['Date']).tolist(),
+            transactions['Description'].astype(str).tolist(),
+            to_minor_units(transactions['Amount']).tolist(),
+            transactions['Type'].astype(str).tolist(),
+            transactions['Status'].astype(str).tolist(),
+            accounts.tolist()
+        )
+        with self._lock, self._conn:
+            self._conn.executemany(statement, rows)
+            self._writes += 1
+        return len(transactions)
+
+    def insert(self, transactions, account=None):
+        """
+        Bulk insert new transactions in one SQLite transaction.
+
+        Ids come from a 'Transaction ID' column when present and from the
+        row values otherwise (see transaction_ids).
+
+        Args:
+            transactions (DataFrame): Cleaned transactions, amounts in the reporting currency.
+            account (str): Account for every row; defaults to the 'Account' column or ''.
+
+        Returns:
+            int: Number of rows written.
+
+        Raises:
+            sqlite3.IntegrityError: If an id is already stored; nothing is written.
+        """
+        return self._write(_INSERT, transactions, account)
+
+    def upsert(self, transactions, account=None):
+        """
+        Insert transactions, replacing rows whose transaction id already exists.
+
+        Args:
+            transactions (DataFrame): Cleaned transactions, amounts in the reporting currency.
+            account (str): Account for every row; defaults to the 'Account' column or ''.
+
+        Returns:
+            int: Number of rows written.
+        """
+        return self._write(_UPSERT, transactions, account)
+
+    def delete(self, ids):
+        """Delete transactions by id; returns the number of rows removed."""
+        with self._lock, self._conn:
+            removed = self._conn.executemany("DELETE FROM transactions WHERE id = ?", ((str(i),) for i in ids))
+            self._writes += 1
+        return removed.rowcount
+
+    def accounts(self):
+        """Distinct account labels in the store."""
+        return [row[0] for row in self._query("SELECT DISTINCT account FROM transactions ORDER BY account")]
+
+    def date_span(self):
+        """First and last stored dates, or None for an empty store."""
+        first, last = self._query("SELECT MIN(day), MAX(day) FROM transactions")[0]
+        if first is None:
+            return None
+        return tuple(pd.Timestamp(date) for date in from_day_numbers([first, last]))
+
+    def paid_balance(self, end=None, accounts=None):
+        """
+        Balance of paid transactions up to ``end`` (inclusive).
+
+        Args:
+            end: Last date included; defaults to every row.
+            accounts (list): Accounts to include; defaults to all.
+
+        Returns:
+            float: Paid balance.
+        """
+        where, params = self._filters(end=end, accounts=accounts, status='Paid')
+        total = self._query(f"SELECT COALESCE(SUM(amount_minor), 0) FROM transactions{where}", params)[0][0]
+        return total / MINOR_UNITS
+
+    def pending_inflow_by_customer(self, accounts=None):
+        """
+        Pending inflows (liquidity locked) per customer, largest first.
+
+        Returns:
+            Series: Amount per customer name.
+        """
+        where, params = self._filters(accounts=accounts, status='Pending', type='Inflow')
+        rows = self._query(
+            f"SELECT description, SUM(amount_minor) AS locked FROM transactions{where} "
+            "GROUP BY description ORDER BY locked DESC, description", params
+        )
+        return pd.Series([locked / MINOR_UNITS for _, locked in rows],
+                         index=pd.Index([name for name, _ in rows], name='Customer'), dtype=np.float64)
+
+    def top_offenders(self, top_n=5, accounts=None):
+        """Top customers by pending inflow, shaped like get_top_offenders."""
+        locked = self.pending_inflow_by_customer(accounts=accounts).head(top_n)
+        return pd.DataFrame({'Customer': locked.index, 'Locked Amount': locked.to_numpy()})
+
+    def daily_net_flow(self, start=None, end=None, accounts=None, status=None):
+        """
+        Net cash flow per day over a date range.
+
+        Args:
+            start: First date (inclusive); defaults to the first transaction.
+            end: Last date (inclusive); defaults to the last transaction.
+            accounts (list): Accounts to include; defaults to all.
+            status (str): Only rows with this status, e.g. 'Paid'.
+
+        Returns:
+            DataFrame: 'Date', 'Inflow', 'Outflow' and 'Net' per day with activity.
+        """
+        equals = {'status': status} if status is not None else {}
+        where, params = self._filters(start=start, end=end, accounts=accounts, **equals)
+        rows = self._query(
+            "SELECT day, SUM(MAX(amount_minor, 0)), SUM(MIN(amount_minor, 0)), SUM(amount_minor) "
+            f"FROM transactions{where} GROUP BY day ORDER BY day", params
+        )
+        days, inflow, outflow, net = (np.array(column, dtype=np.int64) for column in zip(*rows)) if rows \
+            else (np.empty(0, dtype=np.int64),) * 4
+        return pd.DataFrame({
+            'Date': from_day_numbers(days),
+            'Inflow': inflow / MINOR_UNITS,
+            'Outflow': outflow / MINOR_UNITS,
+            'Net': net / MINOR_UNITS
+        })
+
+    def _version(self):
+        # data_version changes when another connection commits; _writes covers this one
+        return self._writes, self._query("PRAGMA data_version")[0][0]
+
+    def load(self, start=None, end=None, accounts=None, aggregate=True):
+        """
+        Stored transactions, by default aggregated per (day, type, status, customer, account).
+
+        Sums, pending amounts per customer and daily curves are unchanged by
+        the aggregation, so the aggregated frame gives the same balances,
+        metrics and offenders while holding far fewer rows than the stored
+        ledger. Consumers that look at single transactions see merged rows,
+        though: the Monte Carlo simulation draws one delay per merged row
+        instead of per invoice, and an explorer lists daily totals. Pass
+        ``aggregate=False`` for one row per transaction. Results are cached
+        until the store changes.
+
+        Args:
+            start: First date (inclusive).
+            end: Last date (inclusive).
+            accounts (list): Accounts to include; defaults to all.
+            aggregate (bool): Merge transactions per day, type, status, customer and account.
+
+        Returns:
+            DataFrame: Date, Description, Amount, Type and Status columns (plus
+            'Transaction ID' when not aggregated), and 'Account' when more than
+            one account is present. Treat it as read-only.
+        """
+        key = (_day_bound(start), _day_bound(end), tuple(accounts) if accounts is not None else None,
+               aggregate, self._version())
+        with self._lock:
+            cached = self._load_cache.get(key)
+            if cached is not None:
+                self._load_cache.move_to_end(key)
+                return cached
+
+        where, params = self._filters(start=start, end=end, accounts=accounts)
+        if aggregate:
+            rows = self._query(
+                "SELECT day, description, SUM(amount_minor), type, status, account "
+                f"FROM transactions{where} GROUP BY day, type, status, description, account "
+                "ORDER BY day, type, status, description, account", params
+            )
+        else:
+            rows = self._query(
+                "SELECT day, description, amount_minor, type, status, account, id "
+                f"FROM transactions{where} ORDER BY day, id", params
+            )
+        n_columns = 6 if aggregate else 7
+        columns = [list(column) for column in zip(*rows)] if rows else [[]] * n_columns
+        days, descriptions, amounts, types, statuses, account_labels = columns[:6]
+        frame = pd.DataFrame({
+            'Date': from_day_numbers(np.array(days, dtype=np.int64)),
+            'Description': pd.Categorical(descriptions),
+            'Amount': np.array(amounts, dtype=np.int64) / MINOR_UNITS,
+            'Type': pd.Categorical(types),
+            'Status': pd.Categorical(statuses)
+        })
+        if not aggregate:
+            frame[TRANSACTION_ID_COLUMN] = columns[6]
+        if len(set(account_labels)) > 1:
+            frame[ACCOUNT_COLUMN] = pd.Categorical(account_labels)
+
+        with self._lock:
+            self._load_cache[key] = frame
+            while len(self._load_cache) > _LOAD_CACHE_SIZE:
+                self._load_cache.popitem(last=False)
+        return frame
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_ledger_store(path=LEDGER_STORE_PATH):
+    """
+    Return the process-wide store for a database file, opening it on first use.
+
+    Args:
+        path (str): SQLite database path.
+
+    Returns:
+        LedgerStore: Shared store for ``path``.
+    """
+    if not path:
+        raise ValueError("No ledger store configured; set FINFLOW_LEDGER_DB")
+    key = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = LedgerStore(key)
+    return store
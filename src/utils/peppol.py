@@ -0,0 +1,519 @@
+import contextlib
+import hashlib
+import io
+import json
+import os
+import xml.etree.ElementTree as ET
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from config.settings import DATA_CLEANING_THRESHOLD, DEFAULT_CURRENCY, PEPPOL_OWN_PARTY
+
+from .data_processor import CATEGORICAL_COLUMNS, combine_chunks
+from .fx import CURRENCY_COLUMN
+from .ledger_store import TRANSACTION_ID_COLUMN
+from .validation import ValidationReport, check_rejection_threshold, validate_chunk
+
+DUE_DATE_COLUMN = 'Due Date'
+INVOICE_COLUMNS = ['Date', 'Description', 'Amount', 'Type', 'Status', CURRENCY_COLUMN, TRANSACTION_ID_COLUMN]
+INVOICE_CHUNKSIZE = 20_000  # Invoices per validated frame chunk
+INVOICE_BATCH_SIZE = 256  # Files handed to a worker process per task
+
+# UBL document root (local name) -> sign of its amounts
+_DOCUMENT_SIGNS = {'Invoice': 1, 'CreditNote': -1}
+
+# Element path below the document root -> field; the first occurrence wins
+_FIELDS = {
+    ('ID',): 'id',
+    ('IssueDate',): 'issue_date',
+    ('DueDate',): 'due_date',
+    ('PaymentMeans', 'PaymentDueDate'): 'due_date',
+    ('DocumentCurrencyCode',): 'currency',
+    ('LegalMonetaryTotal', 'TaxInclusiveAmount'): 'total',
+    ('LegalMonetaryTotal', 'PayableAmount'): 'payable',
+}
+_PARTY_FIELDS = {
+    ('Party', 'EndpointID'): 'id',
+    ('Party', 'PartyIdentification', 'ID'): 'id',
+    ('Party', 'PartyTaxScheme', 'CompanyID'): 'id',
+    ('Party', 'PartyLegalEntity', 'CompanyID'): 'id',
+    ('Party', 'PartyName', 'Name'): 'name',
+    ('Party', 'PartyLegalEntity', 'RegistrationName'): 'name',
+}
+for _party, _role in (('AccountingSupplierParty', 'supplier'), ('AccountingCustomerParty', 'customer')):
+    for _path, _kind in _PARTY_FIELDS.items():
+        _FIELDS[(_party,) + _path] = f'{_role}_{_kind}'
+
+
+def _local_name(tag):
+    return tag.rpartition('}')[2]
+
+
+def normalize_party_id(value):
+    """Compare party identifiers case- and whitespace-insensitively."""
+    return ''.join(str(value).split()).casefold()
+
+
+def own_party_ids(own_party=PEPPOL_OWN_PARTY):
+    """Normalized identifiers of our own company from a comma-separated string or an iterable."""
+    if isinstance(own_party, str):
+        own_party = own_party.split(',')
+    return frozenset(normalize_party_id(value) for value in own_party or () if str(value).strip())
+
+
+class _HashingReader:
+    """File-like wrapper hashing the bytes as the XML parser consumes them."""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self.digest = hashlib.sha256()
+
+    def read(self, size=-1):
+        data = self._stream.read(size)
+        self.digest.update(data)
+        return data
+
+    def finish(self):
+        """Hash whatever the parser left unread (e.g. after the document root) and return the digest."""
+        for block in iter(lambda: self._stream.read(1 << 20), b''):
+            self.digest.update(block)
+        return self.digest.hexdigest()
+
+
+def _read_fields(stream):
+    """
+    Stream one UBL document, keeping only the header fields in _FIELDS.
+
+    Top-level children of the document are cleared as soon as they end, so
+    memory is bounded by the largest single child (one invoice line), not
+    by the file. Wrappers around the document (e.g. a Peppol SBDH envelope)
+    are skipped.
+    """
+    fields = {}
+    path = []
+    root, root_depth = None, 0
+    for event, element in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            name = _local_name(element.tag)
+            if root is None and name in _DOCUMENT_SIGNS:
+                root, root_depth = element, len(path)
+                fields['document'] = name
+            path.append(name)
+            continue
+
+        path.pop()
+        if root is None:
+            continue
+        if element is root:
+            break
+        key = _FIELDS.get(tuple(path[root_depth + 1:]) + (_local_name(element.tag),))
+        if key is not None and element.text and element.text.strip():
+            text = element.text.strip()
+            fields.setdefault(key, text)
+            if key.endswith('_id'):
+                # Parties are matched on every id, with and without the scheme ('0195:SGUEN...')
+                ids = fields.setdefault(f'{key}s', [])
+                ids.append(text)
+                if element.get('schemeID'):
+                    ids.append(f"{element.get('schemeID')}:{text}")
+        if len(path) == root_depth + 1:
+            root.clear()
+
+    if root is None:
+        raise ValueError("Not a UBL Invoice or CreditNote document")
+    return fields
+
+
+def _amount(text):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _invoice_record(fields, own_ids):
+    """
+    Map header fields to one transaction row (see INVOICE_COLUMNS, then the due date).
+
+    Invoices we issued become inflows from the customer and invoices we
+    received outflows to the supplier; credit notes reverse the direction.
+    The open PayableAmount is pending; a document with nothing left to pay
+    is recorded as paid for its full TaxInclusiveAmount. Documents naming
+    neither party as us get no Type and are rejected by validation.
+    """
+    supplier, customer = (
+        {normalize_party_id(value) for value in fields.get(f'{role}_ids', []) + [fields.get(f'{role}_name', '')]}
+        for role in ('supplier', 'customer'))
+    if not own_ids or supplier & own_ids:
+        issued, counterparty = True, fields.get('customer_name')
+    elif customer & own_ids:
+        issued, counterparty = False, fields.get('supplier_name')
+    else:
+        issued, counterparty = None, fields.get('customer_name')
+
+    payable, total = _amount(fields.get('payable')), _amount(fields.get('total'))
+    status = 'Pending'
+    if payable == 0 and not np.isnan(total) and total != 0:
+        payable, status = total, 'Paid'
+    # + 0.0 turns -0.0 into 0.0
+    amount = _DOCUMENT_SIGNS[fields['document']] * (-1 if issued is False else 1) * payable + 0.0
+    transaction_type = None if issued is None else ('Outflow' if amount < 0 else 'Inflow')
+
+    supplier_key = fields.get('supplier_id') or fields.get('supplier_name', '')
+    transaction_id = f"peppol:{supplier_key}:{fields['document']}:{fields.get('id', '')}"
+    return (fields.get('issue_date'), counterparty, amount, transaction_type, status,
+            fields.get('currency', DEFAULT_CURRENCY), transaction_id, fields.get('due_date'))
+
+
+def parse_invoice(source, own_party=PEPPOL_OWN_PARTY):
+    """
+    Parse one Peppol BIS / UBL invoice or credit note into a transaction row.
+
+    Args:
+        source: Path, bytes or binary file-like object with the XML.
+        own_party: Our own endpoint, VAT or company ids (or names), as a
+            comma-separated string or an iterable; empty treats every document
+            as issued by us.
+
+    Returns:
+        dict: INVOICE_COLUMNS plus 'Due Date' (None when the document has none).
+
+    Raises:
+        ValueError: If the XML is malformed or not a UBL invoice or credit note.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    try:
+        fields = _read_fields(source)
+    except ET.ParseError as e:
+        raise ValueError(f"Malformed XML: {e}") from None
+    return dict(zip(INVOICE_COLUMNS + [DUE_DATE_COLUMN], _invoice_record(fields, own_party_ids(own_party))))
+
+
+def _parse_entry(archive, name, own_ids):
+    """Parse one file or archive member; returns (content hash, row or None, error or None)."""
+    try:
+        if hasattr(name, 'read'):
+            stream = contextlib.nullcontext(name)
+        else:
+            stream = archive.open(name) if archive is not None else open(name, 'rb')
+    except (OSError, KeyError, zipfile.BadZipFile) as e:
+        return None, None, str(e)
+    with stream as stream:
+        reader = _HashingReader(stream)
+        try:
+            fields = _read_fields(reader)
+        except ET.ParseError as e:
+            return reader.finish(), None, f"Malformed XML: {e}"
+        except ValueError as e:
+            return reader.finish(), None, str(e)
+        return reader.finish(), _invoice_record(fields, own_ids), None
+
+
+def _parse_batch(task):
+    """Worker task: parse a batch of files, or of members of one zip archive."""
+    archive_path, names, own_ids = task
+    if archive_path is None:
+        return [_parse_entry(None, name, own_ids) for name in names]
+    with zipfile.ZipFile(archive_path) as archive:
+        return [_parse_entry(archive, name, own_ids) for name in names]
+
+
+def _iter_parsed(archive, names, own_ids, workers):
+    """
+    Parse entries in order, across worker processes when there is more than one batch.
+
+    ``archive`` is None for plain files, a zip path, or an open ZipFile
+    (in-memory uploads, always parsed inline).
+
+    At most two batches per worker are in flight, so results (and, for
+    huge runs, pending tasks) never pile up in memory.
+    """
+    batches = [names[start:start + INVOICE_BATCH_SIZE] for start in range(0, len(names), INVOICE_BATCH_SIZE)]
+    if isinstance(archive, zipfile.ZipFile) or workers == 1 or len(batches) <= 1:
+        with zipfile.ZipFile(archive) if isinstance(archive, str) else contextlib.nullcontext(archive) as opened:
+            for name in names:
+                yield _parse_entry(opened, name, own_ids)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        window = deque()
+        tasks = iter(batches)
+        for batch in tasks:
+            window.append(executor.submit(_parse_batch, (archive, batch, own_ids)))
+            if len(window) >= 2 * workers:
+                break
+        while window:
+            yield from window.popleft().result()
+            batch = next(tasks, None)
+            if batch is not None:
+                window.append(executor.submit(_parse_batch, (archive, batch, own_ids)))
+
+
+def find_invoice_files(source):
+    """
+    List the invoice XML files of a directory, zip archive or single file.
+
+    Args:
+        source (str): Directory (searched recursively), '.zip' archive or XML file.
+
+    Returns:
+        tuple: (archive path or None, sorted member or file names, stamp per name);
+        a stamp changes whenever the file's size or modification time (for
+        zip members: size and CRC) does.
+    """
+    source = os.fspath(source)
+    if os.path.isdir(source):
+        names = sorted(os.path.join(directory, name)
+                       for directory, _, files in os.walk(source)
+                       for name in files if name.lower().endswith('.xml'))
+        stats = [os.stat(name) for name in names]
+        stamps = [f"{os.path.abspath(name)}:{stat.st_size}:{stat.st_mtime_ns}" for name, stat in zip(names, stats)]
+        return None, names, stamps
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            members = sorted((info for info in archive.infolist()
+                              if not info.is_dir() and info.filename.lower().endswith('.xml')),
+                             key=lambda info: info.filename)
+        archive_path = os.path.abspath(source)
+        return (archive_path, [info.filename for info in members],
+                [f"{archive_path}!{info.filename}:{info.file_size}:{info.CRC}" for info in members])
+    stat = os.stat(source)
+    return None, [source], [f"{os.path.abspath(source)}:{stat.st_size}:{stat.st_mtime_ns}"]
+
+
+class ImportManifest:
+    """
+    Content hashes of invoice files already imported, kept as a JSON-lines file.
+
+    Entries are only appended, so an interrupted import never loses the
+    record of earlier runs. A file whose stamp (path, size, mtime) is
+    unchanged is skipped without being read; a changed stamp with known
+    content (a copy or a touched file) is skipped after hashing.
+    """
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self.hashes = set()
+        self.stamps = set()
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as handle:
+                for line in handle:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.hashes.add(entry['sha256'])
+                        self.stamps.add(entry['stamp'])
+
+    def __contains__(self, sha256):
+        return sha256 in self.hashes
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def record(self, entries):
+        """Append (stamp, sha256, source name) entries."""
+        entries = list(entries)
+        if not entries:
+            return
+        with open(self.path, 'a', encoding='utf-8') as handle:
+            for stamp, sha256, name in entries:
+                handle.write(json.dumps({'sha256': sha256, 'stamp': stamp, 'source': name}) + '\n')
+                self.hashes.add(sha256)
+                self.stamps.add(stamp)
+
+
+@dataclass
+class InvoiceImport:
+    """Result of import_invoices: the new transactions plus what was skipped or failed."""
+    transactions: pd.DataFrame
+    report: ValidationReport
+    files: int = 0
+    imported: int = 0
+    skipped: int = 0
+    errors: list = field(default_factory=list)
+
+    def summary(self):
+        """Describe the import in one line."""
+        parts = [f"{self.imported:,} of {self.files:,} invoice files imported",
+                 f"{self.skipped:,} already imported"]
+        if self.errors:
+            parts.append(f"{len(self.errors):,} unreadable")
+        if self.report.rejected_rows:
+            parts.append(f"{self.report.rejected_rows:,} rejected")
+        return ", ".join(parts)
+
+
+class _FrameBuilder:
+    """
+    Collect invoice rows into validated, categorical chunks of INVOICE_CHUNKSIZE rows.
+
+    Each row carries its manifest entry; ``accepted`` collects the entries
+    of rows that passed validation.
+    """
+
+    def __init__(self, report, threshold, use_due_dates, total_rows, chunksize=INVOICE_CHUNKSIZE):
+        self.report = report
+        self.total_rows = total_rows
+        self.threshold = threshold
+        self.use_due_dates = use_due_dates
+        self.chunksize = chunksize
+        self.rows = []
+        self.entries = []
+        self.chunks = []
+        self.accepted = []
+        self.row_number = 0
+
+    def add(self, row, entry):
+        self.rows.append(row)
+        self.entries.append(entry)
+        if len(self.rows) >= self.chunksize:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        columns = list(zip(*self.rows))
+        chunk = pd.DataFrame({name: values for name, values in zip(INVOICE_COLUMNS, columns)},
+                             index=pd.RangeIndex(self.row_number, self.row_number + len(self.rows)))
+        chunk = chunk.astype({column: 'category' for column in CATEGORICAL_COLUMNS + [CURRENCY_COLUMN]})
+        chunk['Date'] = pd.to_datetime(chunk['Date'], format='%Y-%m-%d', errors='coerce')
+        due = pd.to_datetime(pd.Series(columns[-1], index=chunk.index), format='%Y-%m-%d', errors='coerce')
+        first_row, entries = self.row_number, self.entries
+        self.row_number += len(self.rows)
+        self.rows, self.entries = [], []
+
+        # The due date is optional, so it joins after validation (missing values are not rejections)
+        chunk = validate_chunk(chunk, self.report)
+        chunk[DUE_DATE_COLUMN] = due.loc[chunk.index]
+        if self.use_due_dates:
+            # Only open amounts wait for the due date; paid documents keep their issue date
+            pending = (chunk['Status'] == 'Pending') & chunk[DUE_DATE_COLUMN].notna()
+            chunk['Date'] = chunk['Date'].mask(pending, chunk[DUE_DATE_COLUMN])
+        self.accepted.extend(entries[row - first_row] for row in chunk.index)
+        self.chunks.append(chunk)
+        # Fail early only once the whole import can no longer pass
+        check_rejection_threshold(self.report, self.threshold, total_rows=self.total_rows)
+
+    def finish(self):
+        self.flush()
+        check_rejection_threshold(self.report, self.threshold)
+        if not self.chunks:
+            return pd.DataFrame(columns=INVOICE_COLUMNS + [DUE_DATE_COLUMN])
+        df = combine_chunks(self.chunks, CATEGORICAL_COLUMNS + [CURRENCY_COLUMN])
+        # Files arrive in name order; the analyzers and merges expect date order
+        return df.sort_values('Date', kind='stable').reset_index(drop=True)
+
+
+def import_invoices(source, manifest=None, own_party=PEPPOL_OWN_PARTY, use_due_dates=False, workers=None,
+                    threshold=DATA_CLEANING_THRESHOLD, report=None):
+    """
+    Import a directory, zip archive or file of Peppol BIS / UBL invoices.
+
+    Every file is streamed with iterparse, keeping only header fields and
+    clearing each element as it ends, and batches of files are parsed in
+    worker processes; rows are validated in chunks as they arrive, so
+    memory stays flat however many invoices there are. With a manifest,
+    files imported by an earlier run (by content hash) are skipped, and
+    the imported and unreadable files of this run are recorded once it
+    succeeds; persist the returned transactions (e.g. LedgerStore.upsert)
+    before the next run. Files whose invoice failed validation (e.g. one
+    naming neither party as us) are not recorded, so a re-run with a
+    corrected ``own_party`` imports them.
+
+    Args:
+        source (str): Directory (searched recursively for '*.xml'), '.zip' archive or XML file.
+        manifest (str or ImportManifest): JSON-lines manifest of imported files.
+        own_party: Our own endpoint, VAT or company ids (see parse_invoice).
+        use_due_dates (bool): Date pending cash by the due date where the invoice
+            has one instead of the issue date.
+        workers (int): Worker processes; defaults to the CPU count. 1 parses inline.
+        threshold (float): Maximum fraction of rejected invoices; None disables the check.
+        report (ValidationReport): Filled with the rejection counts when given.
+
+    Returns:
+        InvoiceImport: New transactions (INVOICE_COLUMNS plus 'Due Date') and import counts.
+
+    Raises:
+        DataValidationError: If the rejected fraction exceeds ``threshold``;
+            nothing is recorded in the manifest then.
+    """
+    if manifest is not None and not isinstance(manifest, ImportManifest):
+        manifest = ImportManifest(manifest)
+    archive, names, stamps = find_invoice_files(source)
+    return _import_entries(archive, names, stamps, manifest, own_party, use_due_dates,
+                           workers or os.cpu_count() or 1, threshold, report)
+
+
+def _import_entries(archive, names, stamps, manifest, own_party, use_due_dates, workers, threshold, report):
+    report = report if report is not None else ValidationReport()
+    pending = [position for position, stamp in enumerate(stamps) if manifest is None or stamp not in manifest.stamps]
+    result = InvoiceImport(transactions=None, report=report, files=len(names), skipped=len(names) - len(pending))
+
+    builder = _FrameBuilder(report, threshold, use_due_dates, total_rows=len(pending))
+    seen = set()
+    recorded = []
+    parsed = _iter_parsed(archive, [names[position] for position in pending], own_party_ids(own_party), workers)
+    for position, (sha256, row, error) in zip(pending, parsed):
+        entry = (stamps[position], sha256, names[position])
+        if error is not None:
+            result.errors.append((names[position], error))
+            if sha256 is not None:
+                recorded.append(entry)
+        elif manifest is not None and sha256 in manifest:
+            result.skipped += 1
+            recorded.append(entry)
+        elif sha256 in seen:
+            result.skipped += 1
+        else:
+            seen.add(sha256)
+            builder.add(row, entry)
+
+    result.transactions = builder.finish()
+    result.imported = len(builder.accepted)
+    if manifest is not None:
+        manifest.record(recorded + builder.accepted)
+    return result
+
+
+def load_einvoices(file, threshold=DATA_CLEANING_THRESHOLD, report=None, own_party=PEPPOL_OWN_PARTY,
+                   use_due_dates=False):
+    """
+    Load an uploaded UBL invoice XML file or zip of them into transactions.
+
+    Same signature shape as load_and_process_csv, so uploads go through
+    the ingest cache like CSVs. Members are parsed in this process.
+
+    Args:
+        file: Path or binary file-like object with one XML document or a zip archive.
+        threshold (float): Maximum fraction of rejected invoices; None disables the check.
+        report (ValidationReport): Filled with the rejection counts when given.
+        own_party: Our own endpoint, VAT or company ids (see parse_invoice).
+        use_due_dates (bool): Date pending cash by the due date where available.
+
+    Returns:
+        DataFrame: Processed transactions (INVOICE_COLUMNS plus 'Due Date').
+
+    Raises:
+        ValueError: If no invoice could be read.
+    """
+    if isinstance(file, (str, os.PathLike)):
+        result = import_invoices(file, own_party=own_party, use_due_dates=use_due_dates, workers=1,
+                                 threshold=threshold, report=report)
+    elif zipfile.is_zipfile(file):
+        file.seek(0)
+        with zipfile.ZipFile(file) as archive:
+            names = sorted(info.filename for info in archive.infolist()
+                           if not info.is_dir() and info.filename.lower().endswith('.xml'))
+            result = _import_entries(archive, names, names, None, own_party, use_due_dates, 1, threshold, report)
+    else:
+        file.seek(0)
+        result = _import_entries(None, [file], [''], None, own_party, use_due_dates, 1, threshold, report)
+
+    if result.files and result.imported == 0 and result.errors:
+        raise ValueError(f"No readable invoices: {result.errors[0][1]}")
+    return result.transactions
@@ -0,0 +1,218 @@
+import functools
+import json
+import logging
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+logger = logging.getLogger('finflow.perf')
+
+# Shared no-op context returned by timed() when no recording is active
+_NULL_CONTEXT = nullcontext()
+_local = threading.local()
+
+_totals = {}
+_totals_lock = threading.Lock()
+
+
+class StageTiming:
+    """One timed stage: wall time, optional traced-memory peak and nesting depth."""
+
+    __slots__ = ('name', 'depth', 'seconds', 'peak_bytes', '_base_bytes', '_child_peak')
+
+    def __init__(self, name, depth):
+        self.name = name
+        self.depth = depth
+        self.seconds = 0.0
+        self.peak_bytes = None
+        self._base_bytes = 0
+        self._child_peak = 0
+
+
+class PerfRecorder:
+    """
+    Collects the stage timings of one run (e.g. one Streamlit rerun).
+
+    Stages are listed in the order they started; nested stages keep their
+    depth so the breakdown can be shown as a tree. With ``memory`` enabled,
+    tracemalloc records the peak traced allocation of every stage relative
+    to the memory in use when the stage started.
+    """
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.stages = []
+        self._stack = []
+        self._started = time.perf_counter()
+        self.total_seconds = 0.0
+
+    @contextmanager
+    def stage(self, name):
+        timing = StageTiming(name, len(self._stack))
+        self.stages.append(timing)
+        if self.memory:
+            timing._base_bytes = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self._stack.append(timing)
+        started = time.perf_counter()
+        try:
+            yield timing
+        finally:
+            timing.seconds = time.perf_counter() - started
+            self._stack.pop()
+            if self.memory:
+                self._close_memory(timing)
+            _add_to_totals(name, timing.seconds)
+
+    def _close_memory(self, timing):
+        # reset_peak() in a nested stage hides earlier peaks from its parent,
+        # so every stage hands its absolute peak up the stack
+        peak = max(tracemalloc.get_traced_memory()[1], timing._child_peak)
+        timing.peak_bytes = max(peak - timing._base_bytes, 0)
+        if self._stack:
+            parent = self._stack[-1]
+            parent._child_peak = max(parent._child_peak, peak)
+
+    def finish(self):
+        self.total_seconds = time.perf_counter() - self._started
+        return self
+
+    def to_rows(self):
+        """Stage timings as dicts, in start order."""
+        return [
+            {'stage': stage.name, 'depth': stage.depth, 'seconds': stage.seconds, 'peak_bytes': stage.peak_bytes}
+            for stage in self.stages
+        ]
+
+    def log(self, level=logging.INFO):
+        """Emit the breakdown as one structured (JSON) log record."""
+        if logger.isEnabledFor(level):
+            logger.log(level, json.dumps({'total_seconds': self.total_seconds, 'stages': self.to_rows()}))
+
+
+def _add_to_totals(name, seconds):
+    with _totals_lock:
+        count, total = _totals.get(name, (0, 0.0))
+        _totals[name] = (count + 1, total + seconds)
+
+
+def current_recorder():
+    """The PerfRecorder active on this thread, or None."""
+    return getattr(_local, 'recorder', None)
+
+
+@contextmanager
+def recording(enabled=True, memory=False):
+    """
+    Activate a PerfRecorder for the enclosed block on the current thread.
+
+    Args:
+        enabled (bool): When False, nothing is recorded and None is yielded.
+        memory (bool): Also sample traced memory per stage (slower).
+
+    Yields:
+        PerfRecorder or None: The recorder, finished when the block exits.
+    """
+    if not enabled:
+        yield None
+        return
+
+    recorder = PerfRecorder(memory=memory)
+    started_tracing = memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    previous = current_recorder()
+    _local.recorder = recorder
+    try:
+        yield recorder
+    finally:
+        _local.recorder = previous
+        recorder.finish()
+        if started_tracing:
+            tracemalloc.stop()
+
+
+def timed(name):
+    """
+    Context manager timing a stage of the active recording.
+
+    Without an active recording this returns a shared no-op context, so
+    instrumented code paths cost one attribute lookup.
+    """
+    recorder = getattr(_local, 'recorder', None)
+    if recorder is None:
+        return _NULL_CONTEXT
+    return recorder.stage(name)
+
+
+def instrument(name=None):
+    """
+    Decorator timing every call of a function as a stage of the active recording.
+
+    Args:
+        name (str): Stage name; defaults to the function name.
+    """
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder = getattr(_local, 'recorder', None)
+            if recorder is None:
+                return func(*args, **kwargs)
+            with recorder.stage(stage_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def prometheus_text(recorder=None, prefix='finflow'):
+    """
+    Render timings in the Prometheus text exposition format.
+
+    Args:
+        recorder (PerfRecorder): When given, also export its per-stage gauges.
+        prefix (str): Metric name prefix.
+
+    Returns:
+        str: Cumulative per-stage counters for this process, plus the
+        last-run gauges of ``recorder``.
+    """
+    with _totals_lock:
+        totals = sorted(_totals.items())
+
+    lines = [
+        f"# HELP {prefix}_stage_seconds Cumulative wall time spent per stage.",
+        f"# TYPE {prefix}_stage_seconds summary",
+    ]
+    for stage, (count, seconds) in totals:
+        lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {seconds:.6f}')
+        lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {count}')
+
+    if recorder is not None:
+        # A stage can run several times per run (e.g. once per uploaded file);
+        # each series appears once: total seconds and the largest peak
+        seconds, peaks = {}, {}
+        for stage in recorder.stages:
+            seconds[stage.name] = seconds.get(stage.name, 0.0) + stage.seconds
+            if stage.peak_bytes is not None:
+                peaks[stage.name] = max(peaks.get(stage.name, 0), stage.peak_bytes)
+
+        lines.append(f"# HELP {prefix}_last_run_stage_seconds Wall time per stage in the last run.")
+        lines.append(f"# TYPE {prefix}_last_run_stage_seconds gauge")
+        for name, total in seconds.items():
+            lines.append(f'{prefix}_last_run_stage_seconds{{stage="{name}"}} {total:.6f}')
+        if peaks:
+            lines.append(f"# HELP {prefix}_last_run_stage_peak_bytes Peak traced memory per stage in the last run.")
+            lines.append(f"# TYPE {prefix}_last_run_stage_peak_bytes gauge")
+            for name, peak in peaks.items():
+                lines.append(f'{prefix}_last_run_stage_peak_bytes{{stage="{name}"}} {peak}')
+        lines.append(f"{prefix}_last_run_seconds {recorder.total_seconds:.6f}")
+    return "\n".join(lines) + "\n"
+
+
+def reset_totals():
+    """Clear the cumulative per-stage counters."""
+    with _totals_lock:
+        _totals.clear()
@@ -0,0 +1,170 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .compact_ledger import ACCOUNT_COLUMN, CompactLedger, encode_labels
+from .hashing import content_hash, frame_fingerprint, remember_fingerprint
+
+_INDEX_CACHE_SIZE = 4
+
+
+class TransactionIndex:
+    """
+    Masks and per-customer aggregates for one dataset, built in a single pass.
+
+    The dataset is encoded once into a CompactLedger (small integer label
+    codes, int32 day numbers, int64 minor-unit amounts), kept as ``ledger``;
+    the Inflow, Outflow, Paid, Pending and pending-inflow masks and the
+    per-customer pending sums are derived from its codes, so dashboard
+    queries only touch O(customers) data afterwards. Multi-account datasets
+    (an 'Account' column) also get their account codes for per-account
+    filters and totals; rows without an account form a group of their own.
+    """
+
+    def __init__(self, transactions):
+        self.n_rows = len(transactions)
+        self.amounts = transactions['Amount'].to_numpy(dtype=np.float64)
+
+        self.ledger = ledger = CompactLedger.from_frame(transactions)
+        self.type_codes, self.type_labels = ledger.type_codes, ledger.types
+        self.status_codes, self.status_labels = ledger.status_codes, ledger.statuses
+        self.customer_codes, self.customers = ledger.description_codes, ledger.descriptions
+
+        self.inflow = ledger.type_mask('Inflow')
+        self.outflow = ledger.type_mask('Outflow')
+        self.paid = ledger.status_mask('Paid')
+        self.pending = ledger.status_mask('Pending')
+        self.pending_inflow = self.inflow & self.pending
+
+        self.paid_count = int(self.paid.sum())
+        self.pending_count = int(self.pending.sum())
+        self.paid_total = self.amounts[self.paid].sum()
+
+        # Outflow total and first/last day make the monthly average O(1)
+        outflow_days = ledger.day[self.outflow]
+        self.outflow_total = self.amounts[self.outflow].sum()
+        self.outflow_day_range = (int(outflow_days.min()), int(outflow_days.max())) if len(outflow_days) else None
+
+        pending_codes = self.customer_codes[self.pending_inflow]
+        n_customers = len(self.customers)
+        self.pending_by_customer = np.bincount(
+            pending_codes, weights=self.amounts[self.pending_inflow], minlength=n_customers
+        )
+        self.pending_invoices_by_customer = np.bincount(pending_codes, minlength=n_customers)
+
+        if ACCOUNT_COLUMN in transactions:
+            self.account_codes, self.accounts = encode_labels(transactions[ACCOUNT_COLUMN], keep_missing=True)
+        else:
+            self.account_codes, self.accounts = np.zeros(self.n_rows, dtype=np.int32), np.array([], dtype=object)
+
+    def account_mask(self, accounts):
+        """Boolean row mask selecting the given accounts."""
+        # pandas isin matches a missing account against a selected missing value
+        selected = pd.Index(self.accounts).isin(list(accounts))
+        return selected[self.account_codes] if len(self.accounts) else np.zeros(self.n_rows, dtype=bool)
+
+    def account_summary(self):
+        """
+        Per-account totals from the account codes.
+
+        Returns:
+            DataFrame: 'Account', 'Transactions', 'Current Balance' (paid) and
+            'Liquidity Locked' (pending inflows), one row per account.
+        """
+        n_accounts = len(self.accounts)
+        return pd.DataFrame({
+            'Account': self.accounts,
+            'Transactions': np.bincount(self.account_codes, minlength=n_accounts)[:n_accounts],
+            'Current Balance': np.bincount(self.account_codes[self.paid], weights=self.amounts[self.paid],
+                                           minlength=n_accounts)[:n_accounts],
+            'Liquidity Locked': np.bincount(self.account_codes[self.pending_inflow],
+                                            weights=self.amounts[self.pending_inflow],
+                                            minlength=n_accounts)[:n_accounts]
+        })
+
+    def liquidity_locked(self):
+        """Total of pending inflows."""
+        return self.pending_by_customer.sum()
+
+    def top_offenders(self, top_n=5):
+        """
+        Customers with the most pending inflow, using partial selection.
+
+        Args:
+            top_n (int): Number of customers to return.
+
+        Returns:
+            DataFrame: 'Customer' and 'Locked Amount', largest first.
+        """
+        candidates = np.flatnonzero(self.pending_invoices_by_customer > 0)
+        if len(candidates) == 0 or top_n <= 0:
+            return pd.DataFrame(columns=['Customer', 'Locked Amount'])
+
+        sums = self.pending_by_customer[candidates]
+        if top_n < len(candidates):
+            selected = np.argpartition(-sums, top_n - 1)[:top_n]
+            candidates, sums = candidates[selected], sums[selected]
+
+        # Largest first; ties broken by customer name for a stable result
+        order = np.lexsort((self.customers[candidates].astype(str), -sums))
+        return pd.DataFrame({
+            'Customer': self.customers[candidates[order]],
+            'Locked Amount': sums[order]
+        })
+
+
+_index_cache = OrderedDict()
+_index_lock = threading.Lock()
+
+
+def get_transaction_index(transactions):
+    """
+    Return the TransactionIndex for a dataset, building it on first use.
+
+    Args:
+        transactions (DataFrame): A DataFrame containing transaction data.
+
+    Returns:
+        TransactionIndex: Cached index keyed by dataset fingerprint.
+    """
+    key = frame_fingerprint(transactions)
+    with _index_lock:
+        index = _index_cache.get(key)
+        if index is not None:
+            _index_cache.move_to_end(key)
+            return index
+
+    index = TransactionIndex(transactions)
+    with _index_lock:
+        _index_cache[key] = index
+        while len(_index_cache) > _INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
+
+
+def select_accounts(transactions, accounts):
+    """
+    Restrict a multi-account dataset to some accounts.
+
+    The subset's fingerprint is derived from the parent's, so the cached
+    sweep and index for a selection are found again without rehashing rows.
+
+    Args:
+        transactions (DataFrame): Transactions with an 'Account' column.
+        accounts (list): Accounts to keep.
+
+    Returns:
+        DataFrame: The selected rows, or ``transactions`` itself when every
+        account is selected.
+    """
+    index = get_transaction_index(transactions)
+    mask = index.account_mask(accounts)
+    if mask.all():
+        return transactions
+
+    subset = transactions[mask]
+    parent = frame_fingerprint(transactions)
+    remember_fingerprint(subset, content_hash(parent.encode(), accounts=tuple(sorted(map(str, accounts)))))
+    return subset
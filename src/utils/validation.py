@@ -0,0 +1,212 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from config.settings import DATA_CLEANING_THRESHOLD
+
+TRANSACTION_TYPES = ('Inflow', 'Outflow')
+STATUSES = ('Paid', 'Pending')
+VALIDATED_COLUMNS = ['Date', 'Amount', 'Type', 'Status']
+# Text columns that must be filled in; optional columns such as Currency or
+# Account may be blank and are defaulted or grouped downstream
+REQUIRED_TEXT_COLUMNS = ['Description']
+
+# Rule name -> description; each rule owns one bit of the per-row rejection mask
+VALIDATION_RULES = {
+    'missing_value': "Description is empty",
+    'invalid_date': "Date is missing or cannot be parsed",
+    'invalid_amount': "Amount is missing or not numeric",
+    'invalid_type': f"Type is not one of {', '.join(TRANSACTION_TYPES)}",
+    'invalid_status': f"Status is not one of {', '.join(STATUSES)}",
+    'sign_mismatch': "Inflows must not be negative and outflows must not be positive",
+}
+RULE_BITS = {rule: np.uint8(1 << bit) for bit, rule in enumerate(VALIDATION_RULES)}
+SAMPLE_ROWS_PER_RULE = 5
+
+# mask value -> rules set in it, for turning one bincount into per-rule counts
+_MASK_VALUES = np.arange(1 << len(VALIDATION_RULES), dtype=np.uint8)
+_RULE_MEMBERSHIP = {rule: (_MASK_VALUES & bit) != 0 for rule, bit in RULE_BITS.items()}
+
+
+@dataclass
+class ValidationReport:
+    """
+    Running tally of rejected rows across one or more chunks.
+
+    Only counts and a few sample row numbers per rule are kept, so the
+    report stays a few hundred bytes however many rows are rejected.
+    Row numbers are 0-based data rows (the header is not counted).
+    """
+    total_rows: int = 0
+    rejected_rows: int = 0
+    counts: dict = field(default_factory=lambda: dict.fromkeys(VALIDATION_RULES, 0))
+    samples: dict = field(default_factory=lambda: {rule: [] for rule in VALIDATION_RULES})
+
+    @property
+    def rejected_fraction(self):
+        return self.rejected_rows / self.total_rows if self.total_rows else 0.0
+
+    def update(self, mask, row_numbers):
+        """
+        Add one chunk's rejection mask.
+
+        Args:
+            mask (ndarray): uint8 rule bits per row; 0 means the row is valid.
+            row_numbers (ndarray): Row number of each mask entry.
+        """
+        # One pass over the mask: histogram of bit patterns, then per-rule sums
+        histogram = np.bincount(mask, minlength=len(_MASK_VALUES))
+        rejected_rows = len(mask) - int(histogram[0])
+        self.total_rows += len(mask)
+        self.rejected_rows += rejected_rows
+        if rejected_rows == 0:
+            return
+
+        rejected = None
+        for rule, members in _RULE_MEMBERSHIP.items():
+            count = int(histogram[members].sum())
+            if count == 0:
+                continue
+            self.counts[rule] += count
+            needed = SAMPLE_ROWS_PER_RULE - len(self.samples[rule])
+            if needed > 0:
+                if rejected is None:
+                    rejected = np.flatnonzero(mask)
+                hits = rejected[(mask[rejected] & RULE_BITS[rule]) != 0][:needed]
+                self.samples[rule].extend(int(row) for row in np.asarray(row_numbers)[hits])
+
+    def to_frame(self):
+        """
+        Rules with at least one rejected row.
+
+        Returns:
+            DataFrame: 'Rule', 'Description', 'Rejected Rows' and 'Sample Rows' columns.
+        """
+        return pd.DataFrame([
+            {'Rule': rule, 'Description': VALIDATION_RULES[rule], 'Rejected Rows': count,
+             'Sample Rows': ', '.join(map(str, self.samples[rule]))}
+            for rule, count in self.counts.items() if count
+        ], columns=['Rule', 'Description', 'Rejected Rows', 'Sample Rows'])
+
+    def summary(self):
+        """Describe the rejections in one line."""
+        rules = ', '.join(f"{rule} {count:,}" for rule, count in self.counts.items() if count)
+        return (f"{self.rejected_rows:,} of {self.total_rows:,} rows rejected "
+                f"({self.rejected_fraction:.1%})" + (f": {rules}" if rules else ""))
+
+
+class DataValidationError(ValueError):
+    """Raised when too many rows fail validation; carries the ValidationReport."""
+
+    def __init__(self, report, threshold):
+        self.report = report
+        self.threshold = threshold
+        super().__init__(f"{report.summary()}, above the {threshold:.0%} threshold")
+
+    def __reduce__(self):
+        # Rebuild from the constructor arguments so the error crosses process pools
+        return type(self), (self.report, self.threshold)
+
+
+def _in_set(values, allowed):
+    """Boolean mask of values in ``allowed``; categoricals are checked once per category."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        lookup = np.append(values.cat.categories.isin(allowed), False)  # code -1 (missing) -> False
+        return lookup[values.cat.codes.to_numpy()]
+    return values.isin(allowed).to_numpy()
+
+
+def _flag(mask, rule, invalid):
+    np.bitwise_or(mask, RULE_BITS[rule], out=mask, where=invalid)
+
+
+def validate_chunk(chunk, report=None):
+    """
+    Check every validation rule on a chunk in one vectorized pass.
+
+    Each rule sets its bit in a per-row uint8 mask; rows with any bit set
+    are dropped. Rejected rows are never materialized, only counted (with
+    a few sample row numbers) in ``report``, so this runs per chunk on
+    multi-million-row files.
+
+    Args:
+        chunk (DataFrame): Raw transaction rows; the index holds row numbers.
+        report (ValidationReport): Report to add this chunk's rejections to.
+
+    Returns:
+        DataFrame: Valid rows with 'Date' as datetime and 'Amount' numeric.
+    """
+    missing = [column for column in VALIDATED_COLUMNS if column not in chunk]
+    if missing:
+        raise ValueError(f"Transaction data is missing columns: {missing}")
+
+    dates = chunk['Date']
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates, errors='coerce')
+    amounts = pd.to_numeric(chunk['Amount'], errors='coerce')
+    amount_values = amounts.to_numpy(dtype=np.float64, na_value=np.nan)
+    required = [column for column in REQUIRED_TEXT_COLUMNS if column in chunk]
+
+    mask = np.zeros(len(chunk), dtype=np.uint8)
+    if required:
+        _flag(mask, 'missing_value', chunk[required].isna().to_numpy().any(axis=1))
+    _flag(mask, 'invalid_date', dates.isna().to_numpy())
+    _flag(mask, 'invalid_amount', np.isnan(amount_values))
+    is_inflow = _in_set(chunk['Type'], TRANSACTION_TYPES[:1])
+    is_outflow = _in_set(chunk['Type'], TRANSACTION_TYPES[1:])
+    _flag(mask, 'invalid_type', ~(is_inflow | is_outflow))
+    _flag(mask, 'invalid_status', ~_in_set(chunk['Status'], STATUSES))
+    _flag(mask, 'sign_mismatch', (is_inflow & (amount_values < 0)) | (is_outflow & (amount_values > 0)))
+
+    if report is not None:
+        report.update(mask, chunk.index.to_numpy())
+
+    valid = mask == 0
+    if valid.all():
+        return chunk.assign(Date=dates, Amount=amounts)
+    return chunk[valid].assign(Date=dates[valid], Amount=amounts[valid])
+
+
+def check_rejection_threshold(report, threshold=DATA_CLEANING_THRESHOLD, total_rows=None):
+    """
+    Fail when the rejected fraction exceeds ``threshold``.
+
+    Args:
+        report (ValidationReport): Rejections seen so far.
+        threshold (float): Maximum rejected fraction; None disables the check.
+        total_rows (int): Rows of the whole input when only part of it was
+            validated so far. The check then fails only once the rejections
+            exceed what the whole input allows, so a partial check never
+            rejects an input that the final check would accept.
+
+    Raises:
+        DataValidationError: If the fraction exceeds the threshold.
+    """
+    if threshold is None:
+        return
+    if total_rows is not None:
+        if report.rejected_rows > threshold * total_rows:
+            raise DataValidationError(report, threshold)
+    elif report.rejected_fraction > threshold:
+        raise DataValidationError(report, threshold)
+
+
+def validate_transactions(transactions, threshold=DATA_CLEANING_THRESHOLD):
+    """
+    Validate an in-memory transaction frame.
+
+    Args:
+        transactions (DataFrame): Raw transaction data.
+        threshold (float): Maximum rejected fraction; None disables the check.
+
+    Returns:
+        tuple: (valid rows, ValidationReport).
+
+    Raises:
+        DataValidationError: If too many rows are rejected.
+    """
+    report = ValidationReport()
+    valid = validate_chunk(transactions, report)
+    check_rejection_threshold(report, threshold)
+    return valid, report
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The app runs with src/ as the working directory, so modules import
+# `config` and `utils` as top-level packages.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
@@ -0,0 +1,46 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+from src.batch import discover_ledgers, main, run_batch
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+
+
+@pytest.fixture
+def ledger_dir(tmp_path):
+    for name in ['sample_transactions.csv', 'sample_transactions_negative.csv']:
+        shutil.copy(os.path.join(DATA_DIR, name), tmp_path / name)
+    (tmp_path / 'broken.csv').write_text("not,a,ledger\n1,2,3\n")
+    (tmp_path / 'notes.txt').write_text("ignored")
+    return tmp_path
+
+
+def test_discover_ledgers_from_directory_and_manifest(ledger_dir):
+    paths = discover_ledgers(str(ledger_dir))
+    assert [os.path.basename(path) for path in paths] == [
+        'broken.csv', 'sample_transactions.csv', 'sample_transactions_negative.csv']
+
+    manifest = ledger_dir / 'manifest.txt'
+    manifest.write_text("# nightly run\nsample_transactions.csv\n\n")
+    assert discover_ledgers(str(manifest)) == [str(ledger_dir / 'sample_transactions.csv')]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_run_batch_isolates_failures(ledger_dir, workers):
+    results = run_batch(discover_ledgers(str(ledger_dir)), workers=workers, chunksize=1, use_snapshot=False)
+
+    assert list(results['status']) == ['error', 'ok', 'ok']
+    assert results.loc[1, 'rows'] == 18
+    assert results.loc[1, 'current_balance'] == 11450
+    assert results.loc[2, 'risk_level'] == "🔴 High"
+
+
+def test_main_writes_results_table(ledger_dir, tmp_path, capsys):
+    output = str(tmp_path / 'results.csv')
+    assert main([str(ledger_dir), '--output', output, '--workers', '1']) == 0
+
+    results = pd.read_csv(output)
+    assert len(results) == 3
+    assert '3 ledgers (2 ok, 1 failed)' in capsys.readouterr().out
@@ -0,0 +1,24 @@
+import json
+
+from benchmarks.run_benchmarks import compare, main, synthetic_ledger
+
+
+def test_synthetic_ledger_is_deterministic():
+    first = synthetic_ledger(500, seed=3)
+    assert first.equals(synthetic_ledger(500, seed=3))
+    assert set(first['Status']) == {'Paid', 'Pending'}
+    assert first['Date'].is_monotonic_increasing
+
+
+def test_suite_writes_json_and_compares(tmp_path):
+    output = tmp_path / 'bench.json'
+    assert main(['--sizes', '300', '--repeat', '1', '--output', str(output)]) == 0
+
+    report = json.loads(output.read_text())
+    names = {row['name'] for row in report['results']}
+    assert 'dashboard_rerun[warm]' in names
+    assert 'cash_flow_analyzer.calculate_metrics' in names
+
+    slower = {'results': [dict(row, seconds=row['seconds'] * 10) for row in report['results']]}
+    assert compare(slower, report)
+    assert not compare(report, report)
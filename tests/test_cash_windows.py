@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.cash_flow_analyzer import (
+    build_projection,
+    calculate_average_monthly_outflow,
+    calculate_metrics,
+    horizon_table,
+)
+from src.utils.cash_windows import CashFlowWindows, default_as_of
+from src.utils.data_processor import generate_transactions
+from src.utils.transaction_index import TransactionIndex
+
+AS_OF = pd.Timestamp('2024-03-31')
+
+
+@pytest.fixture
+def transactions():
+    return generate_transactions(3000, days=180, end_date='2024-05-31', seed=5)
+
+
+def test_balance_and_flows_match_brute_force(transactions):
+    windows = CashFlowWindows.from_frame(transactions.sample(frac=1, random_state=1))
+    dates = pd.to_datetime(['2023-01-01', '2024-01-15', '2024-03-31', '2030-01-01'])
+    expected = [transactions.loc[transactions['Date'] <= date, 'Amount'].sum() for date in dates]
+    np.testing.assert_allclose(windows.balance_at(dates), expected)
+
+    inflow, outflow = windows.flows_between('2024-02-01', '2024-02-29')
+    window = transactions[(transactions['Date'] > '2024-02-01') & (transactions['Date'] <= '2024-02-29')]
+    assert inflow[0] == pytest.approx(window.loc[window['Amount'] > 0, 'Amount'].sum())
+    assert outflow[0] == pytest.approx(window.loc[window['Amount'] < 0, 'Amount'].sum())
+
+
+def test_horizons_are_vectorized_and_consistent(transactions):
+    windows = CashFlowWindows.from_frame(transactions)
+    result = windows.horizons(AS_OF, [0, 30, 60])
+    np.testing.assert_allclose(result['balance'], windows.balance_at(result['date']))
+    assert result['inflow'][0] == 0 and result['outflow'][0] == 0
+    np.testing.assert_allclose(result['balance'] - windows.balance_at(AS_OF)[0], result['inflow'] + result['outflow'])
+
+
+def test_burn_rate_and_runway():
+    days = pd.date_range('2024-01-01', periods=4, freq='30D')
+    windows = CashFlowWindows.from_frame(pd.DataFrame({'Date': days, 'Amount': [10000.0, -1000, -1000, -1000]}))
+    as_of = days[-1]
+    assert windows.burn_rate(as_of, 60)[0] == pytest.approx(2000 * 365.25 / 12 / 60)
+    result = windows.horizons(as_of, [60])
+    assert result['runway_months'][0] == pytest.approx(7000 / result['burn_rate'][0])
+    assert np.isinf(CashFlowWindows.from_frame(pd.DataFrame({'Date': days, 'Amount': [1.0] * 4}))
+                    .horizons(as_of, [30])['runway_months'][0])
+
+
+def test_projected_gap_uses_the_horizon(transactions):
+    projection = build_projection(transactions, delay_days=60)
+    metrics = calculate_metrics(transactions, 60, projection=projection, as_of=AS_OF)
+    horizon = AS_OF + pd.Timedelta(days=30)
+
+    optimistic = transactions.loc[transactions['Date'] <= horizon, 'Amount'].sum()
+    pending = (transactions['Type'] == 'Inflow') & (transactions['Status'] == 'Pending')
+    shifted = transactions['Date'] + pd.to_timedelta(np.where(pending, 60, 0), unit='D')
+    reality = transactions.loc[shifted <= horizon, 'Amount'].sum()
+    assert metrics['optimistic_30day'] == pytest.approx(optimistic)
+    assert metrics['reality_30day'] == pytest.approx(reality)
+    assert metrics['projected_gap'] > 0
+
+    table = horizon_table(projection, horizons=(30, 90), as_of=AS_OF)
+    assert table.loc[0, 'Gap'] == pytest.approx(metrics['projected_gap'])
+    assert list(table['Horizon (Days)']) == [30, 90]
+
+
+def test_default_as_of_caps_at_last_transaction(transactions):
+    assert default_as_of(transactions['Date']) == pd.Timestamp('2024-05-31')
+
+
+def test_average_monthly_outflow_matches_resample(transactions):
+    outflows = transactions[transactions['Type'] == 'Outflow'].set_index('Date')['Amount']
+    expected = abs(outflows.resample('MS').sum().mean())
+    assert calculate_average_monthly_outflow(transactions) == pytest.approx(expected)
+    assert calculate_average_monthly_outflow(transactions, index=TransactionIndex(transactions)) == pytest.approx(expected)
+    inflows_only = transactions[transactions['Type'] == 'Inflow']
+    assert calculate_average_monthly_outflow(inflows_only, index=TransactionIndex(inflows_only)) == 0
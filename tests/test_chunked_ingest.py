@@ -0,0 +1,58 @@
+import io
+import os
+
+import pandas as pd
+import pytest
+from src.utils.data_processor import (
+    CATEGORICAL_COLUMNS,
+    load_and_process_csv,
+    load_and_process_csv_chunked,
+)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+SAMPLE_FILES = ['sample_transactions.csv', 'sample_transactions_negative.csv']
+
+
+def _as_strings(df):
+    return df.astype({column: 'str' for column in CATEGORICAL_COLUMNS})
+
+
+@pytest.mark.parametrize('filename', SAMPLE_FILES)
+@pytest.mark.parametrize('chunksize', [4, 1000])
+def test_chunked_matches_default_loader(filename, chunksize):
+    path = os.path.join(DATA_DIR, filename)
+    expected = load_and_process_csv(path)
+    result = load_and_process_csv_chunked(path, chunksize=chunksize)
+
+    assert isinstance(result['Type'].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(_as_strings(result), expected)
+
+
+@pytest.mark.parametrize('filename', SAMPLE_FILES)
+def test_pyarrow_engine_matches_default_loader(filename):
+    pytest.importorskip('pyarrow')
+    path = os.path.join(DATA_DIR, filename)
+    expected = load_and_process_csv(path)
+    result = load_and_process_csv_chunked(path, chunksize=4, engine='pyarrow')
+
+    pd.testing.assert_frame_equal(_as_strings(result), expected)
+
+
+def test_chunked_drops_invalid_rows():
+    data = (
+        b"Date,Description,Amount,Type,Status\n"
+        b"2023-01-01,Salary,5000,Inflow,Paid\n"
+        b"2023-01-02,,150,Inflow,Paid\n"
+        b"2023-01-03,Rent,abc,Outflow,Paid\n"
+        b"2023-01-04,Grocery,-300,Outflow,Pending\n"
+    )
+    expected = load_and_process_csv(io.BytesIO(data), threshold=None)
+    result = load_and_process_csv_chunked(io.BytesIO(data), chunksize=2, threshold=None)
+
+    assert list(result.index) == [0, 3]
+    pd.testing.assert_frame_equal(_as_strings(result), expected)
+
+
+def test_unknown_engine_raises():
+    with pytest.raises(ValueError):
+        load_and_process_csv_chunked(io.BytesIO(b"Date\n"), engine='python')
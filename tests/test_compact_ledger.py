@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.utils.cash_flow_analyzer import calculate_cumulative_cash_flow, calculate_liquidity_locked
+from src.utils.compact_ledger import CompactLedger, from_day_numbers, to_day_numbers, to_minor_units
+from src.utils.data_processor import generate_mock_data
+
+
+@pytest.fixture
+def transactions():
+    df = generate_mock_data()
+    df['Date'] = pd.to_datetime(df['Date'])
+    return df
+
+
+def test_round_trip(transactions):
+    ledger = CompactLedger.from_frame(transactions)
+    pd.testing.assert_frame_equal(ledger.to_frame(), transactions, check_dtype=False)
+    assert ledger.type_codes.dtype == np.int8
+    assert ledger.day.dtype == np.int32
+
+
+def test_conversions_are_exact():
+    assert list(to_minor_units([0.1, 0.2, -1500, 12.345])) == [10, 20, -150000, 1234]
+    days = to_day_numbers(['1970-01-02', '2023-01-01'])
+    assert list(days) == [1, 19358]
+    assert from_day_numbers(days)[1] == np.datetime64('2023-01-01')
+
+
+def test_integer_sums_have_no_float_drift():
+    frame = pd.DataFrame({
+        'Date': ['2023-01-01'] * 1_000_000,
+        'Description': ['Coffee'] * 1_000_000,
+        'Amount': [0.1] * 1_000_000,
+        'Type': ['Outflow'] * 1_000_000,
+        'Status': ['Paid'] * 1_000_000
+    })
+    ledger = CompactLedger.from_frame(frame)
+    assert ledger.paid_balance_minor() == 10_000_000
+    assert ledger.nbytes < frame.memory_usage(deep=True).sum() / 4
+
+
+@pytest.mark.parametrize('delay_days', [0, 30])
+def test_cumulative_matches_analyzer(transactions, delay_days):
+    ledger = CompactLedger.from_frame(transactions)
+    _, day, cumulative = ledger.cumulative_minor(delay_days)
+    _, expected = calculate_cumulative_cash_flow(transactions, delay_days, reality_mode=True)
+
+    assert cumulative[-1] / 100 == pytest.approx(expected.iloc[-1])
+    assert np.all(np.diff(day) >= 0)
+    assert ledger.liquidity_locked_minor() / 100 == pytest.approx(calculate_liquidity_locked(transactions))
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.utils.cash_flow_analyzer import build_projection, get_delay_sweep
+from src.utils.crunch import crunch_runs, detect_crunches
+from src.utils.data_processor import generate_transactions
+
+
+def _brute_force_runs(values, threshold):
+    runs = []
+    for row, curve in enumerate(np.atleast_2d(values)):
+        start = None
+        for position, value in enumerate(np.r_[curve, np.inf]):
+            if value < threshold and start is None:
+                start = position
+            elif value >= threshold and start is not None:
+                runs.append((row, start, position - 1, curve[start:position].min()))
+                start = None
+    return runs
+
+
+def test_runs_match_brute_force_across_scenarios():
+    rng = np.random.default_rng(0)
+    balances = np.cumsum(rng.normal(0, 1, (40, 250)), axis=1)
+    intervals = detect_crunches(balances, np.arange(250), threshold=-2, end_of_day=False)
+    expected = _brute_force_runs(balances, -2)
+
+    assert len(intervals) == len(expected)
+    np.testing.assert_array_equal(intervals.scenario, [run[0] for run in expected])
+    rows, starts, ends = crunch_runs(balances, -2)
+    np.testing.assert_array_equal(starts, [run[1] for run in expected])
+    np.testing.assert_array_equal(ends, [run[2] for run in expected])
+    np.testing.assert_allclose(intervals.min_balance, [run[3] for run in expected])
+
+
+def test_interval_dates_duration_and_open_crunch():
+    dates = pd.to_datetime(['2024-01-01', '2024-01-03', '2024-01-04', '2024-01-08', '2024-01-09'])
+    intervals = detect_crunches([5000, 200, -50, 3000, 500], dates, threshold=1000)
+
+    assert list(pd.to_datetime(intervals.start)) == [pd.Timestamp('2024-01-03'), pd.Timestamp('2024-01-09')]
+    assert list(pd.to_datetime(intervals.end)) == [pd.Timestamp('2024-01-04'), pd.Timestamp('2024-01-09')]
+    assert pd.Timestamp(intervals.recovery[0]) == pd.Timestamp('2024-01-08')
+    assert pd.isna(intervals.recovery[1])
+    assert list(intervals.duration_days) == [5, 1]
+    np.testing.assert_allclose(intervals.depth, [1050, 500])
+
+
+def test_intraday_dips_are_judged_at_close():
+    dates = pd.to_datetime(['2024-01-01', '2024-01-02', '2024-01-02', '2024-01-03'])
+    assert len(detect_crunches([100, -20, 50, 80], dates, threshold=0)) == 0
+    assert len(detect_crunches([100, -20, 50, 80], dates, threshold=0, end_of_day=False)) == 1
+
+
+def test_per_scenario_summaries():
+    balances = np.array([[5, -1, -3, 2, -2], [1, 2, 3, 4, 5], [-1, -1, 1, 1, 1]])
+    intervals = detect_crunches(balances, np.arange(5), threshold=0)
+
+    assert list(intervals.counts()) == [2, 0, 1]
+    assert list(intervals.total_days()) == [3, 0, 2]
+    np.testing.assert_allclose(intervals.lowest(), [-3, np.nan, -1])
+    earliest = intervals.earliest()
+    assert pd.isna(earliest[1])
+    assert (earliest[[0, 2]] == np.array(['1970-01-02', '1970-01-01'], dtype='datetime64[ns]')).all()
+
+
+@pytest.fixture
+def transactions():
+    transactions = generate_transactions(2000, days=180, end_date='2024-06-30', seed=6)
+    # Leave every inflow pending so the delay moves the crunch dates
+    return transactions.assign(Status=np.where(transactions['Type'] == 'Inflow', 'Pending', 'Paid'))
+
+
+def test_sweep_matches_per_delay_projections(transactions):
+    sweep = get_delay_sweep(transactions)
+    earliest = sweep.earliest_crunches(threshold=50_000)
+
+    for delay in (0, 30, 90):
+        crunches = build_projection(transactions, delay_days=delay, sweep=sweep).crunches(50_000)
+        expected = crunches.start[0] if len(crunches) else np.datetime64('NaT')
+        assert earliest[delay] == expected or (pd.isna(earliest[delay]) and pd.isna(expected))
+    assert earliest.notna().any()
+
+
+def test_empty_curve():
+    intervals = detect_crunches(np.array([]), np.array([], dtype='datetime64[ns]'))
+    assert len(intervals) == 0
+    assert intervals.to_frame().empty
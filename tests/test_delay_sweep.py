@@ -0,0 +1,97 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.utils.cash_flow_analyzer import (
+    DELAY_SWEEP_VALUES,
+    DelaySweep,
+    calculate_cumulative_cash_flow,
+    calculate_metrics,
+    get_delay_sweep,
+)
+from src.utils.data_processor import generate_mock_data
+
+
+@pytest.fixture
+def transactions():
+    return pd.DataFrame({
+        'Date': pd.to_datetime(['2023-01-01', '2023-01-03', '2023-01-07', '2023-01-12', '2023-01-20']),
+        'Description': ['Salary', 'Acme Corp SG', 'Rent', 'TechVision Ltd', 'Utilities'],
+        'Amount': [5000.0, 1200.0, -1500.0, 800.0, -200.0],
+        'Type': ['Inflow', 'Inflow', 'Outflow', 'Inflow', 'Outflow'],
+        'Status': ['Paid', 'Pending', 'Paid', 'Pending', 'Paid']
+    })
+
+
+def _end_of_day(dates, balance):
+    return pd.Series(balance.to_numpy(), index=dates.to_numpy()).groupby(level=0).last()
+
+
+def test_sweep_covers_slider_values():
+    assert DELAY_SWEEP_VALUES == tuple(range(0, 95, 5))
+
+
+@pytest.mark.parametrize('delay', [0, 3, 5, 10, 30])
+def test_sweep_matches_cumulative_cash_flow(transactions, delay):
+    sweep = DelaySweep(transactions, delays=[0, 3, 5, 10, 30])
+    dates, balance = sweep.curve(delay)
+    expected_dates, expected_balance = calculate_cumulative_cash_flow(transactions, delay, reality_mode=True)
+
+    np.testing.assert_array_equal(dates.to_numpy(), expected_dates.to_numpy())
+    np.testing.assert_allclose(balance.to_numpy(), expected_balance.to_numpy())
+    assert list(balance.index) == list(expected_balance.index)
+
+
+def test_sweep_matches_end_of_day_on_mock_data():
+    transactions = generate_mock_data()
+    sweep = DelaySweep(transactions)
+    for delay in DELAY_SWEEP_VALUES:
+        dates, balance = sweep.curve(delay)
+        expected = calculate_cumulative_cash_flow(transactions, delay, reality_mode=True)
+        pd.testing.assert_series_equal(_end_of_day(dates, balance), _end_of_day(*expected))
+
+
+def test_metrics_with_sweep_match_without(transactions):
+    sweep = get_delay_sweep(transactions)
+    assert get_delay_sweep(transactions) is sweep
+    assert calculate_metrics(transactions, 30, sweep=sweep) == calculate_metrics(transactions, 30)
+
+
+def test_delay_outside_sweep_falls_back(transactions):
+    sweep = DelaySweep(transactions, delays=[0, 5])
+    dates, balance = calculate_cumulative_cash_flow(transactions, 7, reality_mode=True, sweep=sweep)
+    assert balance.iloc[-1] == pytest.approx(transactions['Amount'].sum())
+    assert dates.max() == pd.Timestamp('2023-01-20')
+
+
+@pytest.mark.parametrize('tz', [None, 'Asia/Singapore'])
+def test_intraday_and_tz_aware_dates_are_kept(transactions, tz):
+    times = pd.to_timedelta(['9h', '17h30min', '8h', '23h59min', '12h'])
+    transactions = transactions.assign(Date=(transactions['Date'] + times).dt.tz_localize(tz))
+    sweep = DelaySweep(transactions, delays=[0, 5])
+
+    for delay in (0, 5):
+        dates, balance = sweep.curve(delay)
+        expected_dates, expected_balance = calculate_cumulative_cash_flow(transactions, delay, reality_mode=True)
+        pd.testing.assert_series_equal(dates, expected_dates)
+        np.testing.assert_allclose(balance.to_numpy(), expected_balance.to_numpy())
+
+    assert sweep.crunches(threshold=4800).earliest()[0] == np.datetime64('2023-01-07')
+    assert calculate_metrics(transactions, 5, sweep=get_delay_sweep(transactions, [0, 5]))['risk_level']
+
+
+def test_sweep_cache_follows_the_memory_budget(transactions, monkeypatch):
+    monkeypatch.setattr('src.utils.cash_flow_analyzer._sweep_cache', OrderedDict())
+    first = get_delay_sweep(transactions)
+    other = transactions.assign(Amount=transactions['Amount'] * 2)
+    assert first.nbytes >= 12 * len(transactions) * len(DELAY_SWEEP_VALUES)
+
+    monkeypatch.setattr('src.utils.cash_flow_analyzer._SWEEP_CACHE_BYTES', first.nbytes)
+    get_delay_sweep(other)
+    assert get_delay_sweep(transactions) is not first
+
+    monkeypatch.setattr('src.utils.cash_flow_analyzer._SWEEP_CACHE_BYTES', 10 * first.nbytes)
+    latest = get_delay_sweep(transactions)
+    get_delay_sweep(other)
+    assert get_delay_sweep(transactions) is latest
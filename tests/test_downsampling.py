@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+from src.utils.downsampling import (
+    crunch_keep_indices,
+    daily_end_of_day,
+    downsample_series,
+    lttb_indices,
+)
+
+
+def test_daily_end_of_day_keeps_last_value_per_day():
+    dates = pd.Series(pd.to_datetime(['2023-01-01', '2023-01-01', '2023-01-02', '2023-01-04', '2023-01-04']))
+    balance = pd.Series([100.0, -50.0, 20.0, 30.0, 10.0])
+    result = daily_end_of_day(dates, balance)
+
+    assert list(result.index) == list(pd.to_datetime(['2023-01-01', '2023-01-02', '2023-01-04']))
+    assert list(result) == [-50.0, 20.0, 10.0]
+
+
+def test_lttb_keeps_endpoints_and_budget():
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 50)
+    indices = lttb_indices(x, y, 100)
+
+    assert len(indices) == 100
+    assert indices[0] == 0 and indices[-1] == 999
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_crunch_keep_indices_keeps_every_crunch_point_within_budget():
+    values = np.array([5, -1, -3, -2, -1, 4, -1, 2, -6, -7, -5, 1], dtype=float)
+    assert list(crunch_keep_indices(values)) == [1, 2, 3, 4, 6, 8, 9, 10]
+    # Too many for the budget: first, last and lowest point of each run
+    assert list(crunch_keep_indices(values, max_points=7)) == [1, 2, 4, 6, 8, 9, 10]
+    thinned = crunch_keep_indices(values, max_points=3)
+    assert len(thinned) == 3 and 9 in thinned
+
+
+def test_downsample_never_drops_minimum_or_crunch_points():
+    rng = np.random.default_rng(0)
+    values = np.cumsum(rng.normal(0, 1, 50_000)) + 40
+    series = pd.Series(values, index=pd.date_range('2000-01-01', periods=len(values), freq='D'))
+    below = series < 0
+    budget = int(below.sum()) + 500
+    result = downsample_series(series, budget)
+
+    assert len(result) <= budget
+    assert result.min() == series.min()
+    assert set(series.index[below]) <= set(result.index)
+    assert result.index.is_monotonic_increasing
+
+
+def test_crunch_points_count_against_the_budget():
+    # Thousands of short crunch runs
+    values = np.tile([10.0, -1.0, 10.0, 5.0], 5_000)
+    series = pd.Series(values, index=pd.date_range('2000-01-01', periods=len(values), freq='h'))
+    for budget in (2, 10, 500):
+        result = downsample_series(series, budget)
+        assert len(result) <= budget
+        assert result.min() == -1.0
+
+
+def test_small_series_is_untouched():
+    series = pd.Series([1.0, 2.0], index=pd.date_range('2023-01-01', periods=2))
+    assert downsample_series(series, 100) is series
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.data_processor import generate_transactions
+from src.utils.explorer import ExplorerQuery, TransactionExplorer, get_explorer
+
+
+@pytest.fixture
+def transactions():
+    df = generate_transactions(5000, days=120, end_date='2024-04-30', n_customers=20, seed=9)
+    # Shuffled input: the explorer must not rely on the frame being date-sorted
+    return df.sample(frac=1, random_state=2)
+
+
+def _expected(df, query):
+    mask = pd.Series(True, index=df.index)
+    if query.start is not None:
+        mask &= df['Date'] >= pd.Timestamp(query.start)
+    if query.end is not None:
+        mask &= df['Date'] <= pd.Timestamp(query.end)
+    for column, selected in (('Description', query.customers), ('Type', query.types), ('Status', query.statuses)):
+        if selected is not None:
+            mask &= df[column].isin(selected)
+    return df[mask]
+
+
+@pytest.mark.parametrize('query', [
+    ExplorerQuery(),
+    ExplorerQuery(start='2024-02-01', end='2024-02-29'),
+    ExplorerQuery(types=('Inflow',), statuses=('Pending',), sort_by='Amount', ascending=False),
+    ExplorerQuery(start='2024-03-01', customers=('Acme Corp SG', 'Customer 00007'), sort_by='Description'),
+    ExplorerQuery(customers=('Nobody',)),
+])
+def test_select_matches_pandas_filters(transactions, query):
+    explorer = TransactionExplorer(transactions)
+    rows = explorer.select(query)
+    selected = transactions.iloc[rows]
+    expected = _expected(transactions, query)
+
+    assert sorted(selected.index) == sorted(expected.index)
+    values = selected[query.sort_by].astype(str) if query.sort_by == 'Description' else selected[query.sort_by]
+    assert (values.is_monotonic_increasing if query.ascending else values.is_monotonic_decreasing)
+
+
+def test_pages_cover_the_selection(transactions):
+    explorer = TransactionExplorer(transactions)
+    rows = explorer.select(ExplorerQuery(types=('Outflow',)))
+    pages = [explorer.page(rows, page, 700) for page in range(1, -(-len(rows) // 700) + 1)]
+    assert all(len(page) == 700 for page in pages[:-1])
+    assert pd.concat(pages).index.equals(transactions.index[rows])
+    # Out-of-range page numbers are clipped
+    assert explorer.page(rows, 10_000, 700).index.equals(pages[-1].index)
+    assert explorer.page(rows[:0], 1).empty
+
+
+def test_summary_and_cache(transactions):
+    explorer = get_explorer(transactions)
+    assert get_explorer(transactions) is explorer
+    rows = explorer.select(ExplorerQuery(statuses=('Paid',)))
+    summary = explorer.summary(rows)
+    paid = transactions.loc[transactions['Status'] == 'Paid', 'Amount']
+    assert summary['rows'] == len(paid)
+    assert summary['net'] == pytest.approx(paid.sum())
+    assert summary['outflow'] == pytest.approx(paid[paid < 0].sum())
+    with pytest.raises(ValueError):
+        explorer.order('Status')
+    assert np.array_equal(explorer.order('Date'), explorer.order('Date'))
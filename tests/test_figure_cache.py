@@ -0,0 +1,45 @@
+import pytest
+
+pytest.importorskip('plotly')
+pytest.importorskip('streamlit')
+
+from src.utils.data_processor import generate_transactions  # noqa: E402
+from src.utils.simulation import get_simulation  # noqa: E402
+from components.visualizations import get_dual_cash_flow_figure  # noqa: E402
+
+
+@pytest.fixture
+def transactions():
+    return generate_transactions(500, seed=11)
+
+
+def test_figure_is_reused_per_dataset_delay_and_mode(transactions):
+    figure = get_dual_cash_flow_figure(transactions, delay_days=30)
+    assert get_dual_cash_flow_figure(transactions, delay_days=30) is figure
+    assert get_dual_cash_flow_figure(transactions.copy(), delay_days=30) is figure
+    assert get_dual_cash_flow_figure(transactions, delay_days=35) is not figure
+    assert len(figure.data) >= 2
+
+
+def test_optimistic_figure_is_shared_across_delays(transactions):
+    optimistic = get_dual_cash_flow_figure(transactions, delay_days=10, show_reality=False)
+    assert get_dual_cash_flow_figure(transactions, delay_days=60, show_reality=False) is optimistic
+    assert len(optimistic.data) == 1
+
+
+def test_bands_are_matched_by_identity(transactions):
+    bands = get_simulation(transactions, n_scenarios=20, delay_spec={'distribution': 'fixed', 'days': 30})
+    with_bands = get_dual_cash_flow_figure(transactions, delay_days=30, bands=bands)
+    assert get_dual_cash_flow_figure(transactions, delay_days=30, bands=bands) is with_bands
+    assert get_dual_cash_flow_figure(transactions, delay_days=30) is not with_bands
+
+    other = get_simulation(transactions, n_scenarios=30, delay_spec={'distribution': 'fixed', 'days': 30})
+    assert get_dual_cash_flow_figure(transactions, delay_days=30, bands=other) is not with_bands
+
+
+def test_every_trace_fits_the_point_budget(transactions, monkeypatch):
+    monkeypatch.setattr('components.visualizations.CHART_POINT_BUDGET', 20)
+    bands = get_simulation(transactions, n_scenarios=20, delay_spec={'distribution': 'fixed', 'days': 30})
+    assert len(bands.dates) > 20
+    figure = get_dual_cash_flow_figure(transactions, delay_days=45, bands=bands)
+    assert all(len(trace.x) <= 20 for trace in figure.data)
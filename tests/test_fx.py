@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.data_processor import generate_transactions
+from src.utils.fx import FxRateTable, get_fx_rates, normalize_currency
+from src.utils.hashing import frame_fingerprint
+
+
+@pytest.fixture
+def rates():
+    return FxRateTable(pd.DataFrame({
+        'Date': pd.to_datetime(['2024-01-01', '2024-02-01', '2024-03-01', '2024-01-01', '2024-02-15']),
+        'Currency': ['SGD', 'SGD', 'SGD', 'EUR', 'EUR'],
+        'Rate': [0.74, 0.75, 0.73, 1.10, 1.08]
+    }))
+
+
+@pytest.fixture
+def ledger():
+    return generate_transactions(2000, days=120, end_date='2024-04-30', seed=3, currencies=['SGD', 'EUR', 'USD'])
+
+
+def test_rates_match_merge_asof(rates, ledger):
+    table = pd.DataFrame({'Date': rates.days, 'Currency': rates.currencies[rates.codes], 'Rate': rates.rates})
+    table['Date'] = pd.to_datetime(table['Date'], unit='D').astype('datetime64[ns]')
+    rows = ledger[ledger['Currency'] != 'USD'].reset_index(drop=True)
+    expected = pd.merge_asof(
+        rows.assign(Currency=rows['Currency'].astype(str), row=np.arange(len(rows))).sort_values('Date'),
+        table.sort_values('Date'), on='Date', by='Currency', direction='backward'
+    ).sort_values('row')
+    # Dates before the first quote fall back to that quote
+    first = table.groupby('Currency')['Rate'].first()
+    expected_rates = expected['Rate'].fillna(expected['Currency'].map(first)).to_numpy()
+
+    np.testing.assert_allclose(rates.rates_for(rows['Currency'], rows['Date']), expected_rates)
+
+
+def test_base_and_reporting_currency(rates):
+    dates = pd.to_datetime(['2024-02-20', '2024-02-20'])
+    np.testing.assert_allclose(rates.rates_for(['USD', 'usd'], dates), [1.0, 1.0])
+    # SGD -> EUR crosses through the base currency
+    np.testing.assert_allclose(rates.conversion_factors(['SGD', 'EUR'], dates, 'EUR'), [0.75 / 1.08, 1.0])
+
+
+def test_unknown_currency_raises(rates):
+    with pytest.raises(ValueError, match="XXX"):
+        rates.rates_for(['SGD', 'XXX'], pd.to_datetime(['2024-01-05', '2024-01-05']))
+    with pytest.raises(ValueError, match="nan"):
+        rates.rates_for(['SGD', np.nan, 'XXX'], pd.to_datetime(['2024-01-05'] * 3))
+
+
+def test_normalize_converts_and_caches(rates, ledger):
+    normalized = normalize_currency(ledger, rates)
+    np.testing.assert_allclose(normalized['Original Amount'], ledger['Amount'])
+    np.testing.assert_allclose(normalized['Amount'], np.round(ledger['Amount'] * normalized['FX Rate'], 2))
+    usd = (ledger['Currency'] == 'USD').to_numpy()
+    np.testing.assert_array_equal(normalized['FX Rate'].to_numpy()[usd], 1.0)
+
+    assert normalize_currency(ledger, rates) is normalized
+    assert normalize_currency(ledger, rates, reporting_currency='EUR') is not normalized
+    assert frame_fingerprint(normalized) != frame_fingerprint(ledger)
+
+
+def test_single_currency_ledger_passes_through():
+    ledger = generate_transactions(100, seed=1)
+    assert normalize_currency(ledger) is ledger
+
+
+def test_bundled_rate_file_covers_generated_currencies(ledger):
+    normalized = normalize_currency(ledger, get_fx_rates())
+    assert normalized['Amount'].notna().all()
+    assert get_fx_rates() is get_fx_rates()
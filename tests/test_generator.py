@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+
+from src.utils.data_processor import (
+    MOCK_CUSTOMERS,
+    generate_mock_data,
+    generate_transactions,
+    iter_generated_transactions,
+    load_and_process_csv,
+    read_snapshot,
+    write_generated_transactions,
+)
+
+
+def test_mock_data_is_reproducible_demo_frame():
+    first = generate_mock_data()
+    assert first.equals(generate_mock_data())
+    assert len(first) == 50
+    assert list(first.columns) == ['Date', 'Description', 'Amount', 'Type', 'Status']
+    assert first['Date'].str.fullmatch(r'\d{4}-\d{2}-\d{2}').all()
+    assert first['Date'].is_monotonic_increasing
+
+
+def test_generator_keeps_mix_and_amount_ranges():
+    df = generate_transactions(200_000, days=365, end_date='2024-12-31', seed=1)
+    inflow = df['Type'] == 'Inflow'
+    assert inflow.mean() == pytest.approx(0.6, abs=0.01)
+    assert (df.loc[inflow, 'Status'] == 'Paid').mean() == pytest.approx(0.7, abs=0.01)
+    assert (df.loc[~inflow, 'Status'] == 'Paid').mean() == pytest.approx(0.9, abs=0.01)
+    assert df.loc[inflow, 'Amount'].between(2000, 15000).all()
+    assert df.loc[~inflow, 'Amount'].between(-5000, -500).all()
+    assert set(df.loc[inflow, 'Description']) == set(MOCK_CUSTOMERS)
+    assert df['Date'].min() >= pd.Timestamp('2024-01-01')
+    assert df['Date'].max() <= pd.Timestamp('2024-12-31')
+
+
+def test_chunks_are_globally_sorted_and_seeded():
+    options = dict(days=30, end_date='2024-01-31', seed=7, chunksize=1000)
+    chunks = list(iter_generated_transactions(3500, **options))
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 1000, 500]
+    combined = pd.concat(chunks, ignore_index=True)
+    assert combined['Date'].is_monotonic_increasing
+    assert combined.equals(generate_transactions(3500, **options))
+
+
+def test_skew_concentrates_customers():
+    df = generate_transactions(50_000, n_customers=100, skew=1.5, seed=2)
+    counts = df.loc[df['Type'] == 'Inflow', 'Description'].value_counts()
+    assert counts.index[0] == MOCK_CUSTOMERS[0]
+    assert counts.iloc[0] > 10 * counts.iloc[-1]
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.feather', '.parquet'])
+def test_write_streams_chunks(tmp_path, suffix):
+    path = tmp_path / f'ledger{suffix}'
+    options = dict(days=60, end_date='2024-03-01', seed=3)
+    assert write_generated_transactions(path, 2500, chunksize=1000, **options) == 2500
+
+    written = load_and_process_csv(str(path)) if suffix == '.csv' else read_snapshot(str(path))
+    expected = generate_transactions(2500, chunksize=1000, **options)
+    assert len(written) == 2500
+    assert written['Date'].is_monotonic_increasing
+    assert written['Amount'].sum() == pytest.approx(expected['Amount'].sum())
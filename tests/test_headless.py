@@ -0,0 +1,41 @@
+import json
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+PROBE = """
+import json, sys
+import utils
+after_package = sorted(m for m in ('pandas', 'numpy') if m in sys.modules)
+df = utils.generate_mock_data()
+utils.calculate_metrics(df, 30, projection=utils.build_projection(df, 30))
+utils.get_top_offenders(df)
+print(json.dumps({
+    'after_package': after_package,
+    'ui': sorted(m for m in ('streamlit', 'plotly') if m in sys.modules),
+}))
+"""
+
+
+def _probe():
+    result = subprocess.run([sys.executable, '-c', PROBE], cwd=SRC, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_core_api_never_imports_ui_libraries():
+    report = _probe()
+    assert report['ui'] == []
+
+
+def test_package_import_is_lazy():
+    assert _probe()['after_package'] == []
+
+
+def test_facade_exports_resolve():
+    import src.utils as core
+
+    for name in core.__all__:
+        assert callable(getattr(core, name))
+    assert 'build_projection' in dir(core)
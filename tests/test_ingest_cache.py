@@ -0,0 +1,66 @@
+import io
+
+import pandas as pd
+import pytest
+from src.utils.hashing import content_hash
+from src.utils.ingest_cache import IngestCache, cached_load_csv
+
+CSV_BYTES = b"""Date,Description,Amount,Type,Status
+2023-01-01,Salary,5000,Inflow,Paid
+2023-01-05,Rent,-1500,Outflow,Paid
+2023-01-10,Acme Corp SG,1200,Inflow,Pending
+"""
+
+
+def test_content_hash_depends_on_options():
+    assert content_hash(CSV_BYTES) == content_hash(CSV_BYTES)
+    assert content_hash(CSV_BYTES) != content_hash(CSV_BYTES, engine='pyarrow')
+    assert content_hash(CSV_BYTES, a=1, b=2) == content_hash(CSV_BYTES, b=2, a=1)
+
+
+def test_cached_load_csv_hits_on_same_bytes():
+    cache = IngestCache(max_bytes=10 * 1024 * 1024)
+    first = cached_load_csv(io.BytesIO(CSV_BYTES), cache=cache)
+    second = cached_load_csv(io.BytesIO(CSV_BYTES), cache=cache)
+
+    assert cache.stats()['misses'] == 1
+    assert cache.stats()['hits'] == 1
+    pd.testing.assert_frame_equal(first, second)
+    assert first['Amount'].sum() == 4700
+
+
+def test_cached_frame_is_not_mutated_by_callers():
+    cache = IngestCache(max_bytes=10 * 1024 * 1024)
+    df = cached_load_csv(io.BytesIO(CSV_BYTES), cache=cache)
+    df['Extra'] = 1
+
+    assert 'Extra' not in cached_load_csv(io.BytesIO(CSV_BYTES), cache=cache).columns
+
+
+def test_lru_eviction_respects_budget():
+    frame = pd.DataFrame({'Amount': range(100)})
+    nbytes = int(frame.memory_usage(index=True, deep=True).sum())
+    cache = IngestCache(max_bytes=2 * nbytes)
+
+    cache.put('a', frame)
+    cache.put('b', frame)
+    cache.get('a')
+    cache.put('c', frame)
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['current_bytes'] <= cache.max_bytes
+
+
+def test_oversized_frame_is_not_cached():
+    cache = IngestCache(max_bytes=1)
+    cache.put('big', pd.DataFrame({'Amount': range(10)}))
+    assert len(cache) == 0
+
+
+def test_reads_path(tmp_path):
+    path = tmp_path / 'transactions.csv'
+    path.write_bytes(CSV_BYTES)
+    cache = IngestCache(max_bytes=10 * 1024 * 1024)
+    assert len(cached_load_csv(str(path), cache=cache)) == 3
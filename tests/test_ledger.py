@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.utils.cash_flow_analyzer import calculate_cumulative_cash_flow, calculate_liquidity_locked
+from src.utils.data_processor import generate_mock_data
+from src.utils.ledger import FenwickTree, IncrementalLedger
+
+
+def _expected_balance(transactions, date, delay_days=0):
+    dates, balance = calculate_cumulative_cash_flow(transactions, delay_days, reality_mode=delay_days > 0)
+    before = balance[dates <= pd.Timestamp(date)]
+    return before.iloc[-1] if len(before) else 0.0
+
+
+def test_fenwick_prefix_sums():
+    values = np.arange(1, 11, dtype=float)
+    tree = FenwickTree.from_values(values)
+    assert [tree.prefix_sum(i) for i in range(10)] == list(np.cumsum(values))
+    tree.add(3, 5)
+    assert tree.prefix_sum(2) == 6
+    assert tree.prefix_sum(3) == 15
+    assert tree.total() == 60
+
+
+@pytest.mark.parametrize('delay_days', [0, 15, 45])
+def test_ledger_matches_cumulative_cash_flow(delay_days):
+    transactions = generate_mock_data()
+    ledger = IncrementalLedger.from_frame(transactions)
+    for date in pd.to_datetime(transactions['Date']).unique()[::5]:
+        assert ledger.balance_as_of(date, delay_days) == pytest.approx(
+            _expected_balance(transactions, date, delay_days))
+
+
+def test_appends_out_of_order_match_bulk_build():
+    transactions = generate_mock_data().sample(frac=1, random_state=0)
+    ledger = IncrementalLedger(capacity_days=4)
+    ledger.extend(transactions)
+
+    assert len(ledger) == len(transactions)
+    assert ledger.liquidity_locked() == pytest.approx(calculate_liquidity_locked(transactions))
+    paid = transactions.loc[transactions['Status'] == 'Paid', 'Amount'].sum()
+    assert ledger.paid_balance() == pytest.approx(paid)
+    last_date = pd.to_datetime(transactions['Date']).max()
+    assert ledger.balance_as_of(last_date) == pytest.approx(transactions['Amount'].sum())
+
+
+def test_status_flip_updates_balances():
+    ledger = IncrementalLedger()
+    ledger.append('2023-01-10', 1000, 'Inflow', 'Paid')
+    invoice = ledger.append('2023-01-05', 500, 'Inflow', 'Pending')
+    ledger.append('2023-01-20', -300, 'Outflow', 'Pending')
+
+    assert ledger.liquidity_locked() == 500
+    assert ledger.paid_balance() == 1000
+    assert ledger.balance_as_of('2023-01-09', delay_days=10) == 0
+
+    ledger.set_status(invoice, 'Paid')
+    assert ledger.liquidity_locked() == 0
+    assert ledger.paid_balance() == 1500
+    assert ledger.paid_balance_as_of('2023-01-06') == 500
+    assert ledger.balance_as_of('2023-01-31') == 1200
+
+
+def test_rejects_unknown_status_and_duplicate_ids():
+    ledger = IncrementalLedger()
+    ledger.append('2023-01-01', 10, 'Inflow', 'Paid', txn_id='a')
+    with pytest.raises(ValueError):
+        ledger.append('2023-01-01', 10, 'Inflow', 'Paid', txn_id='a')
+    with pytest.raises(ValueError):
+        ledger.append('2023-01-01', 10, 'Inflow', 'Overdue')
+
+
+def test_to_frame_round_trip():
+    transactions = generate_mock_data()
+    frame = IncrementalLedger.from_frame(transactions).to_frame()
+    assert len(frame) == len(transactions)
+    assert frame['Amount'].sum() == pytest.approx(transactions['Amount'].sum())
+
+
+def test_append_after_from_frame_generates_fresh_ids():
+    transactions = generate_mock_data()
+    ledger = IncrementalLedger.from_frame(transactions)
+    txn_id = ledger.append('2023-01-01', 10, 'Inflow', 'Paid')
+    assert txn_id == len(transactions)
+    assert len(ledger) == len(transactions) + 1
+
+    with pytest.raises(ValueError, match="Duplicate transaction id"):
+        IncrementalLedger.from_frame(pd.concat([transactions, transactions.iloc[:1]]))
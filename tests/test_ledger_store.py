@@ -0,0 +1,128 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.utils.cash_flow_analyzer import analyze_cash_flow, calculate_metrics, get_top_offenders
+from src.utils.data_processor import generate_transactions, merge_sorted_frames
+from src.utils.ledger_store import TRANSACTION_ID_COLUMN, LedgerStore, transaction_ids
+
+AS_OF = pd.Timestamp('2024-02-15')
+
+
+@pytest.fixture
+def transactions():
+    return generate_transactions(3000, days=120, end_date='2024-03-31', n_customers=40, seed=8)
+
+
+@pytest.fixture
+def store(transactions):
+    store = LedgerStore()
+    store.insert(transactions)
+    yield store
+    store.close()
+
+
+def test_pushed_down_aggregates_match_pandas(store, transactions):
+    paid = transactions[transactions['Status'] == 'Paid']
+    assert store.paid_balance() == pytest.approx(paid['Amount'].sum())
+    assert store.paid_balance(end=AS_OF) == pytest.approx(paid.loc[paid['Date'] <= AS_OF, 'Amount'].sum())
+
+    offenders, expected = store.top_offenders(5), get_top_offenders(transactions, 5)
+    assert list(offenders['Customer']) == list(expected['Customer'].astype(str))
+    np.testing.assert_allclose(offenders['Locked Amount'], expected['Locked Amount'])
+
+    daily = store.daily_net_flow('2024-01-01', '2024-01-31')
+    window = transactions[(transactions['Date'] >= '2024-01-01') & (transactions['Date'] <= '2024-01-31')]
+    expected = window.groupby('Date')['Amount'].sum()
+    np.testing.assert_allclose(daily['Net'], expected.to_numpy())
+    np.testing.assert_allclose(daily['Inflow'] + daily['Outflow'], daily['Net'])
+
+
+def test_aggregated_load_gives_the_same_analysis(store, transactions):
+    loaded = store.load()
+    assert len(loaded) < len(transactions)
+
+    expected = calculate_metrics(transactions, 30, as_of=AS_OF)
+    result = calculate_metrics(loaded, 30, as_of=AS_OF)
+    for key in ('current_balance', 'projected_gap', 'optimistic_30day', 'reality_30day'):
+        assert result[key] == pytest.approx(expected[key])
+    assert analyze_cash_flow(loaded) == pytest.approx(analyze_cash_flow(transactions))
+
+
+def test_load_is_cached_until_the_store_changes(store, transactions):
+    first = store.load(start='2024-01-01')
+    assert store.load(start='2024-01-01') is first
+
+    store.upsert(transactions.head(10).assign(Amount=1.0))
+    assert store.load(start='2024-01-01') is not first
+
+
+def test_upsert_replaces_by_transaction_id():
+    store = LedgerStore()
+    ledger = generate_transactions(10, seed=2).assign(**{TRANSACTION_ID_COLUMN: [f"inv-{i}" for i in range(10)]})
+    store.insert(ledger)
+    with pytest.raises(sqlite3.IntegrityError):
+        store.insert(ledger.head(1))
+
+    paid = ledger.head(3).assign(Status='Paid')
+    store.upsert(paid)
+    assert len(store) == 10
+    assert store.paid_balance() == pytest.approx(
+        pd.concat([paid, ledger.iloc[3:]]).query("Status == 'Paid'")['Amount'].sum())
+
+    assert store.delete(['inv-0', 'missing']) == 1
+    assert len(store) == 9
+
+
+def test_derived_ids_are_stable_and_distinguish_duplicates(transactions):
+    doubled = pd.concat([transactions.head(5), transactions.head(5)], ignore_index=True)
+    ids = transaction_ids(doubled)
+    assert ids.nunique() == 10
+    pd.testing.assert_series_equal(transaction_ids(doubled), ids)
+
+    store = LedgerStore()
+    store.upsert(transactions)
+    store.upsert(transactions)
+    assert len(store) == len(transactions)
+
+
+def test_accounts_filter_and_persistence(tmp_path):
+    frames = [generate_transactions(200, seed=i) for i in range(2)]
+    merged = merge_sorted_frames(frames, ['checking', 'savings'])
+    path = str(tmp_path / 'ledger.db')
+
+    with LedgerStore(path) as store:
+        store.insert(merged)
+    with LedgerStore(path) as store:
+        assert store.accounts() == ['checking', 'savings']
+        assert 'Account' in store.load()
+        savings = frames[1][frames[1]['Status'] == 'Paid']['Amount'].sum()
+        assert store.paid_balance(accounts=['savings']) == pytest.approx(savings)
+        assert 'Account' not in store.load(accounts=['savings'])
+
+
+def test_empty_store():
+    store = LedgerStore()
+    assert store.date_span() is None
+    assert store.paid_balance() == 0
+    assert len(store.load()) == 0
+    assert len(store.daily_net_flow()) == 0
+    assert store.top_offenders().empty
+
+
+def test_reimport_after_payment_replaces_rows(transactions):
+    store = LedgerStore()
+    store.upsert(transactions)
+    settled = transactions.assign(Status='Paid')
+    store.upsert(settled)
+    assert len(store) == len(transactions)
+    assert store.paid_balance() == pytest.approx(transactions['Amount'].sum())
+
+
+def test_row_level_load(store, transactions):
+    rows = store.load(aggregate=False)
+    assert len(rows) == len(transactions)
+    assert rows[TRANSACTION_ID_COLUMN].is_unique
+    np.testing.assert_allclose(rows['Amount'].sum(), transactions['Amount'].sum())
+    assert len(store.load()) < len(rows)
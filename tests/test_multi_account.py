@@ -0,0 +1,115 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.data_processor import (
+    account_name,
+    generate_transactions,
+    load_accounts,
+    merge_sorted_frames,
+    unique_account_names,
+)
+from src.utils.ingest_cache import IngestCache, cached_load_accounts
+from src.utils.transaction_index import TransactionIndex, select_accounts
+
+
+class _Upload(io.BytesIO):
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
+
+
+def _ledgers(n_files=3, n_rows=400):
+    return [generate_transactions(n_rows, days=60, end_date='2024-06-30', seed=seed) for seed in range(n_files)]
+
+
+def test_merge_matches_stable_concat_and_sort():
+    frames = _ledgers()
+    merged = merge_sorted_frames(frames, ['a', 'b', 'c'])
+
+    expected = pd.concat(
+        [frame.assign(Account=name) for frame, name in zip(frames, 'abc')], ignore_index=True
+    ).sort_values('Date', kind='stable')
+    assert merged['Date'].is_monotonic_increasing
+    assert merged.index.equals(pd.RangeIndex(len(expected)))
+    np.testing.assert_array_equal(merged['Amount'], expected['Amount'])
+    np.testing.assert_array_equal(merged['Account'].astype(str), expected['Account'])
+    assert list(merged['Account'].cat.categories) == ['a', 'b', 'c']
+
+
+def test_merge_keeps_ties_in_file_order():
+    days = pd.to_datetime(['2024-01-01', '2024-01-02', '2024-01-02', '2024-01-05'])
+    frames = [generate_transactions(4, seed=seed).assign(Date=days[[0, 1, 1, 3]] if seed else days)
+              for seed in range(2)]
+    frames.insert(1, frames[0].iloc[:0])
+    merged = merge_sorted_frames(frames, ['a', 'empty', 'b'])
+    assert list(merged['Account'].astype(str)) == ['a', 'b', 'a', 'a', 'b', 'b', 'a', 'b']
+    np.testing.assert_array_equal(merged.loc[merged['Account'] == 'b', 'Amount'], frames[2]['Amount'])
+
+
+def test_merge_sorts_unsorted_inputs_and_mixed_label_dtypes():
+    first, second = _ledgers(2)
+    second = second.sample(frac=1, random_state=0).astype({'Description': str, 'Type': str, 'Status': str})
+    merged = merge_sorted_frames([first, second], ['x', 'y'])
+    assert merged['Date'].is_monotonic_increasing
+    assert isinstance(merged['Type'].dtype, pd.CategoricalDtype)
+    assert merged['Amount'].sum() == pytest.approx(first['Amount'].sum() + second['Amount'].sum())
+
+    with pytest.raises(ValueError):
+        merge_sorted_frames([first, second], ['x'])
+
+
+def test_account_names():
+    assert account_name('/data/ocbc.csv') == 'ocbc'
+    assert account_name('dbs.snapshot.feather') == 'dbs'
+    assert unique_account_names(['a/ops.csv', 'b/ops.csv', 'payroll.parquet']) == ['ops', 'ops (2)', 'payroll']
+
+
+def test_load_accounts_reads_files_concurrently(tmp_path):
+    paths = []
+    for name, frame in zip(['ocbc', 'dbs', 'uob'], _ledgers()):
+        path = tmp_path / f'{name}.csv'
+        frame.to_csv(path, index=False)
+        paths.append(str(path))
+
+    merged = load_accounts(paths, max_workers=3, loader=lambda path: pd.read_csv(path, parse_dates=['Date']))
+    assert len(merged) == 1200
+    assert list(merged['Account'].cat.categories) == ['ocbc', 'dbs', 'uob']
+    assert merged['Date'].is_monotonic_increasing
+
+
+def test_cached_load_accounts_reuses_merge():
+    payloads = [frame.to_csv(index=False).encode() for frame in _ledgers(2)]
+    cache = IngestCache(max_bytes=1 << 30)
+
+    first = cached_load_accounts([_Upload('a.csv', data) for data in payloads], cache=cache)
+    misses = cache.stats()['misses']
+    second = cached_load_accounts([_Upload('a.csv', data) for data in payloads], cache=cache)
+    assert cache.stats()['misses'] == misses
+    assert list(second['Account'].cat.categories) == ['a', 'a (2)']
+    assert first.equals(second)
+
+    # A single upload is not merged again on reruns
+    single = [_Upload('b.csv', payloads[0])]
+    first = cached_load_accounts(single, cache=cache)
+    hits = cache.stats()['hits']
+    assert cached_load_accounts(single, cache=cache).equals(first)
+    assert cache.stats()['hits'] == hits + 2
+
+
+def test_per_account_summary_and_selection():
+    merged = merge_sorted_frames(_ledgers(), ['a', 'b', 'c'])
+    index = TransactionIndex(merged)
+    summary = index.account_summary().set_index('Account')
+    assert summary['Transactions'].tolist() == [400, 400, 400]
+
+    only_b = merged[merged['Account'] == 'b']
+    paid = only_b['Status'] == 'Paid'
+    assert summary.loc['b', 'Current Balance'] == pytest.approx(only_b.loc[paid, 'Amount'].sum())
+
+    selected = select_accounts(merged, ['b'])
+    assert len(selected) == 400 and set(selected['Account']) == {'b'}
+    assert select_accounts(merged, ['a', 'b', 'c']) is merged
+    assert len(TransactionIndex(generate_transactions(10)).accounts) == 0
@@ -0,0 +1,186 @@
+import io
+import zipfile
+
+import pandas as pd
+import pytest
+from src.utils.fx import normalize_currency
+from src.utils.ingest_cache import cached_load_accounts
+from src.utils.peppol import ImportManifest, import_invoices, load_einvoices, parse_invoice
+from src.utils.validation import DataValidationError
+
+OWN_ID = '0195:SGUEN201912345A'
+
+INVOICE = """<?xml version="1.0" encoding="UTF-8"?>
+<{document} xmlns="urn:oasis:names:specification:ubl:schema:xsd:{document}-2"
+    xmlns:cac="urn:oasis:names:specification:ubl:schema:xsd:CommonAggregateComponents-2"
+    xmlns:cbc="urn:oasis:names:specification:ubl:schema:xsd:CommonBasicComponents-2">
+  <cbc:CustomizationID>urn:cen.eu:en16931:2017#compliant#urn:fdc:peppol.eu:2017:poacc:billing:3.0</cbc:CustomizationID>
+  <cbc:ID>{number}</cbc:ID>
+  <cbc:IssueDate>{issued}</cbc:IssueDate>
+  {due}
+  <cbc:DocumentCurrencyCode>{currency}</cbc:DocumentCurrencyCode>
+  <cac:AccountingSupplierParty><cac:Party>
+    <cbc:EndpointID schemeID="0195">{supplier_id}</cbc:EndpointID>
+    <cac:PartyName><cbc:Name>{supplier}</cbc:Name></cac:PartyName>
+  </cac:Party></cac:AccountingSupplierParty>
+  <cac:AccountingCustomerParty><cac:Party>
+    <cbc:EndpointID schemeID="0195">{customer_id}</cbc:EndpointID>
+    <cac:PartyLegalEntity><cbc:RegistrationName>{customer}</cbc:RegistrationName></cac:PartyLegalEntity>
+  </cac:Party></cac:AccountingCustomerParty>
+  <cac:LegalMonetaryTotal>
+    <cbc:TaxInclusiveAmount currencyID="{currency}">{total}</cbc:TaxInclusiveAmount>
+    <cbc:PayableAmount currencyID="{currency}">{payable}</cbc:PayableAmount>
+  </cac:LegalMonetaryTotal>
+  {lines}
+</{document}>
+"""
+
+LINE = """<cac:InvoiceLine><cbc:ID>{n}</cbc:ID><cbc:LineExtensionAmount currencyID="SGD">10</cbc:LineExtensionAmount>
+  <cac:Item><cbc:Name>Item {n}</cbc:Name><cbc:ID>ignored</cbc:ID></cac:Item></cac:InvoiceLine>"""
+
+
+def invoice_xml(number='INV-1', issued='2024-03-01', due='2024-03-31', currency='SGD', document='Invoice',
+                supplier='FinFlow Pte Ltd', supplier_id='SGUEN201912345A', customer='Acme Corp SG',
+                customer_id='SGUEN200011111B', total='1070.00', payable='1070.00', n_lines=2):
+    return INVOICE.format(
+        document=document, number=number, issued=issued, currency=currency, supplier=supplier,
+        supplier_id=supplier_id, customer=customer, customer_id=customer_id, total=total, payable=payable,
+        due=f"<cbc:DueDate>{due}</cbc:DueDate>" if due else "",
+        lines="\n".join(LINE.format(n=n) for n in range(n_lines))).encode()
+
+
+@pytest.fixture
+def invoice_dir(tmp_path):
+    folder = tmp_path / 'invoices'
+    (folder / '2024').mkdir(parents=True)
+    for n in range(30):
+        (folder / '2024' / f'inv-{n:03d}.xml').write_bytes(
+            invoice_xml(number=f'INV-{n}', issued=f'2024-03-{n % 28 + 1:02d}', total=f'{100 + n}.00',
+                        payable=f'{100 + n}.00', customer=f'Customer {n % 3}'))
+    (folder / 'readme.txt').write_text("not an invoice")
+    return folder
+
+
+def test_parse_issued_and_received_documents():
+    row = parse_invoice(invoice_xml(), own_party=OWN_ID)
+    assert row == {'Date': '2024-03-01', 'Description': 'Acme Corp SG', 'Amount': 1070.0, 'Type': 'Inflow',
+                   'Status': 'Pending', 'Currency': 'SGD',
+                   'Transaction ID': 'peppol:SGUEN201912345A:Invoice:INV-1', 'Due Date': '2024-03-31'}
+
+    received = parse_invoice(invoice_xml(supplier='Cloud Services Inc', supplier_id='US123',
+                                         customer_id='SGUEN201912345A'), own_party='sguen201912345a')
+    assert (received['Description'], received['Amount'], received['Type']) == ('Cloud Services Inc', -1070.0, 'Outflow')
+
+    credit = parse_invoice(invoice_xml(document='CreditNote', due=None, total='50', payable='50'), own_party=OWN_ID)
+    assert (credit['Amount'], credit['Type'], credit['Due Date']) == (-50.0, 'Outflow', None)
+
+    prepaid = parse_invoice(invoice_xml(payable='0.00'))
+    assert (prepaid['Amount'], prepaid['Status']) == (1070.0, 'Paid')
+
+    assert parse_invoice(invoice_xml(), own_party='someone-else')['Type'] is None
+    with pytest.raises(ValueError, match="Malformed XML"):
+        parse_invoice(b"<Invoice><cbc:ID>")
+    with pytest.raises(ValueError, match="Not a UBL"):
+        parse_invoice(b"<Order/>")
+
+
+def test_sbdh_envelope_is_skipped():
+    document = invoice_xml().split(b'?>', 1)[1]
+    wrapped = (b'<StandardBusinessDocument xmlns="http://www.unece.org/cefact/namespaces/StandardBusinessDocumentHeader">'
+               b'<StandardBusinessDocumentHeader><DocumentIdentification><Type>Invoice</Type>'
+               b'</DocumentIdentification></StandardBusinessDocumentHeader>' + document +
+               b'</StandardBusinessDocument>')
+    assert parse_invoice(wrapped)['Transaction ID'] == 'peppol:SGUEN201912345A:Invoice:INV-1'
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_import_directory_in_parallel(invoice_dir, workers, monkeypatch):
+    monkeypatch.setattr('src.utils.peppol.INVOICE_BATCH_SIZE', 4)
+    result = import_invoices(str(invoice_dir), own_party=OWN_ID, workers=workers)
+
+    df = result.transactions
+    assert (result.files, result.imported, result.skipped, result.errors) == (30, 30, 0, [])
+    assert df['Date'].is_monotonic_increasing
+    assert df['Amount'].sum() == pytest.approx(sum(100 + n for n in range(30)))
+    assert set(df['Description']) == {'Customer 0', 'Customer 1', 'Customer 2'}
+    assert isinstance(df['Description'].dtype, pd.CategoricalDtype)
+    assert (df['Due Date'] == pd.Timestamp('2024-03-31')).all()
+
+    (invoice_dir / 'paid.xml').write_bytes(invoice_xml(number='PAID', issued='2024-03-03', payable='0'))
+    by_due = import_invoices(str(invoice_dir), own_party=OWN_ID, workers=workers, use_due_dates=True).transactions
+    paid = by_due['Status'] == 'Paid'
+    assert (by_due.loc[~paid, 'Date'] == pd.Timestamp('2024-03-31')).all()
+    assert list(by_due.loc[paid, 'Date']) == [pd.Timestamp('2024-03-03')]
+
+
+def test_manifest_skips_imported_files(invoice_dir, tmp_path):
+    manifest = tmp_path / 'manifest.jsonl'
+    first = import_invoices(str(invoice_dir), manifest=str(manifest), workers=1)
+    assert first.imported == 30
+
+    # Unchanged files are skipped by stamp, copies and touched files by content hash
+    (invoice_dir / 'copy.xml').write_bytes((invoice_dir / '2024' / 'inv-000.xml').read_bytes())
+    (invoice_dir / 'new.xml').write_bytes(invoice_xml(number='INV-NEW'))
+    second = import_invoices(str(invoice_dir), manifest=str(manifest), workers=1)
+    assert (second.files, second.imported, second.skipped) == (32, 1, 31)
+    assert list(second.transactions['Transaction ID']) == ['peppol:SGUEN201912345A:Invoice:INV-NEW']
+
+    assert len(ImportManifest(manifest)) == 31
+    assert import_invoices(str(invoice_dir), manifest=str(manifest), workers=1).imported == 0
+
+
+def test_unreadable_and_rejected_invoices(tmp_path):
+    (tmp_path / 'ok.xml').write_bytes(invoice_xml())
+    (tmp_path / 'broken.xml').write_bytes(b"<Invoice>")
+    (tmp_path / 'foreign.xml').write_bytes(invoice_xml(number='X', supplier_id='A', customer_id='B'))
+    manifest = tmp_path / 'manifest.jsonl'
+
+    with pytest.raises(DataValidationError):
+        import_invoices(str(tmp_path), manifest=str(manifest), own_party=OWN_ID, workers=1)
+    assert not manifest.exists()
+
+    result = import_invoices(str(tmp_path), manifest=str(manifest), own_party=OWN_ID, workers=1, threshold=None)
+    assert [name.rsplit('/', 1)[-1] for name, _ in result.errors] == ['broken.xml']
+    assert result.report.counts['invalid_type'] == 1
+    assert len(result.transactions) == 1 and result.imported == 1
+    # Unreadable files are recorded; the rejected one is retried with the right party
+    assert len(ImportManifest(manifest)) == 2
+    retry = import_invoices(str(tmp_path), manifest=str(manifest), own_party=[OWN_ID, 'A'], workers=1)
+    assert list(retry.transactions['Transaction ID']) == ['peppol:A:Invoice:X']
+    assert (retry.imported, retry.skipped, retry.errors) == (1, 2, [])
+
+
+def test_zip_archives_and_uploads(tmp_path):
+    archive = tmp_path / 'march.zip'
+    with zipfile.ZipFile(archive, 'w') as handle:
+        for n in range(5):
+            handle.writestr(f'inv/{n}.xml', invoice_xml(number=f'INV-{n}', n_lines=200))
+        handle.writestr('inv/notes.txt', 'ignored')
+
+    result = import_invoices(str(archive), workers=1)
+    assert (result.files, result.imported) == (5, 5)
+
+    upload = io.BytesIO(archive.read_bytes())
+    upload.name = 'march.zip'
+    single = io.BytesIO(invoice_xml(number='INV-9'))
+    single.name = 'april.xml'
+    df = cached_load_accounts([upload, single])
+    assert len(df) == 6
+    assert list(df['Account'].cat.categories) == ['march', 'april']
+    assert len(load_einvoices(io.BytesIO(invoice_xml()))) == 1
+
+
+def test_mixed_csv_and_invoice_upload_normalizes(tmp_path):
+    csv = io.BytesIO(b"Date,Description,Amount,Type,Status\n2024-03-02,Rent,-500,Outflow,Paid\n"
+                     b"2024-03-05,Acme Corp SG,800,Inflow,Pending\n")
+    csv.name = 'checking.csv'
+    invoices = io.BytesIO(invoice_xml(currency='SGD'))
+    invoices.name = 'invoices.xml'
+
+    df = cached_load_accounts([csv, invoices])
+    assert df['Currency'].isna().sum() == 2
+    normalized = normalize_currency(df)
+    csv_rows = (df['Account'] == 'checking').to_numpy()
+    assert list(normalized['Currency'][csv_rows]) == ['USD', 'USD']
+    assert list(normalized['Amount'][csv_rows]) == [-500.0, 800.0]
+    assert normalized['FX Rate'][~csv_rows].iloc[0] != 1.0
@@ -0,0 +1,63 @@
+import json
+import logging
+
+from src.utils import profiling
+from src.utils.profiling import instrument, prometheus_text, recording, reset_totals, timed
+
+
+@instrument('square')
+def _square(x):
+    return x * x
+
+
+def test_disabled_recording_is_a_no_op():
+    with recording(enabled=False) as recorder:
+        assert recorder is None
+        assert timed('stage') is timed('other')
+        assert _square(3) == 9
+    assert profiling.current_recorder() is None
+
+
+def test_stages_nest_in_start_order():
+    with recording() as recorder:
+        with timed('outer'):
+            assert _square(4) == 16
+        with timed('second'):
+            pass
+    rows = recorder.to_rows()
+    assert [(row['stage'], row['depth']) for row in rows] == [('outer', 0), ('square', 1), ('second', 0)]
+    assert rows[0]['seconds'] >= rows[1]['seconds'] >= 0
+    assert recorder.total_seconds >= rows[0]['seconds']
+    assert profiling.current_recorder() is None
+
+
+def test_memory_peaks_propagate_to_parent():
+    with recording(memory=True) as recorder:
+        with timed('outer'):
+            with timed('inner'):
+                block = bytearray(4 << 20)
+                del block
+    outer, inner = recorder.to_rows()
+    assert inner['peak_bytes'] >= 4 << 20
+    assert outer['peak_bytes'] >= inner['peak_bytes']
+
+
+def test_prometheus_dump_and_structured_log(caplog):
+    reset_totals()
+    with recording() as recorder:
+        _square(2)
+        _square(3)
+    text = prometheus_text(recorder)
+    assert 'finflow_stage_seconds_count{stage="square"} 2' in text
+    assert text.count('finflow_last_run_stage_seconds{stage="square"}') == 1
+    assert text.endswith("\n")
+
+    with recording(memory=True) as with_memory:
+        _square(2)
+        _square(3)
+    assert prometheus_text(with_memory).count('finflow_last_run_stage_peak_bytes{stage="square"}') == 1
+
+    with caplog.at_level(logging.INFO, logger='finflow.perf'):
+        recorder.log()
+    payload = json.loads(caplog.records[-1].getMessage())
+    assert [row['stage'] for row in payload['stages']] == ['square', 'square']
@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+from src.utils.cash_flow_analyzer import (
+    build_projection,
+    calculate_cumulative_cash_flow,
+    calculate_metrics,
+    get_delay_sweep,
+)
+
+
+@pytest.fixture
+def transactions():
+    return pd.DataFrame({
+        'Date': ['2023-01-01', '2023-01-05', '2023-01-10', '2023-01-20'],
+        'Description': ['Acme Corp SG', 'Rent', 'TechVision Ltd', 'Payroll'],
+        'Amount': [1000.0, -1500.0, 3000.0, -2000.0],
+        'Type': ['Inflow', 'Outflow', 'Inflow', 'Outflow'],
+        'Status': ['Paid', 'Paid', 'Pending', 'Paid']
+    })
+
+
+def test_projection_matches_individual_curves(transactions):
+    projection = build_projection(transactions, delay_days=30)
+    _, optimistic = calculate_cumulative_cash_flow(transactions)
+    _, reality = calculate_cumulative_cash_flow(transactions, delay_days=30, reality_mode=True)
+
+    pd.testing.assert_series_equal(projection.optimistic_balance, optimistic)
+    pd.testing.assert_series_equal(projection.reality_balance, reality)
+
+
+def test_projection_crunch_and_min_point(transactions):
+    projection = build_projection(transactions, delay_days=30)
+
+    assert projection.has_crunch
+    assert projection.min_balance == -2500
+    assert projection.min_date == pd.Timestamp('2023-01-20')
+    assert projection.crunch_mask.sum() == 2
+
+
+def test_zero_delay_reuses_optimistic_curve(transactions):
+    projection = build_projection(transactions, delay_days=0)
+    assert projection.reality_balance is projection.optimistic_balance
+    assert projection.min_balance == -500
+
+
+def test_metrics_from_projection(transactions):
+    sweep = get_delay_sweep(transactions)
+    projection = build_projection(transactions, delay_days=30, sweep=sweep)
+    assert calculate_metrics(transactions, 30, projection=projection) == calculate_metrics(transactions, 30)
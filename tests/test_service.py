@@ -0,0 +1,187 @@
+import asyncio
+import http.client
+import io
+import json
+import threading
+import time
+
+import pytest
+from src import service
+from src.service import AnalysisService
+from src.utils.cash_flow_analyzer import calculate_metrics, get_top_offenders
+from src.utils.data_processor import generate_transactions, load_and_process_csv
+
+
+@pytest.fixture(scope='module')
+def ledger_bytes():
+    transactions = generate_transactions(2000, days=90, end_date='2024-03-31', n_customers=30, seed=4)
+    return transactions.to_csv(index=False).encode()
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield loop
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+@pytest.fixture
+def start_service(loop):
+    services = []
+
+    def start(**options):
+        async def create():
+            analysis_service = AnalysisService(**options)
+            server = await analysis_service.start('127.0.0.1', 0)
+            return analysis_service, server.sockets[0].getsockname()[1]
+
+        analysis_service, port = asyncio.run_coroutine_threadsafe(create(), loop).result()
+        services.append(analysis_service)
+        return analysis_service, port
+
+    yield start
+    for analysis_service in services:
+        asyncio.run_coroutine_threadsafe(analysis_service.close(), loop).result()
+
+
+def request(port, method, path, body=None, headers=None):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        connection.request(method, path, body=body, headers=headers or {})
+        response = connection.getresponse()
+        payload = response.read()
+        if response.getheader('Content-Type', '').startswith('application/json'):
+            payload = json.loads(payload)
+        return response.status, payload
+    finally:
+        connection.close()
+
+
+def test_analyses_match_direct_calls(start_service, ledger_bytes):
+    _, port = start_service()
+    transactions = load_and_process_csv(io.BytesIO(ledger_bytes))
+
+    status, body = request(port, 'POST', '/v1/metrics?delay_days=20&horizon_days=14', ledger_bytes)
+    assert status == 200
+    expected = calculate_metrics(transactions, 20, horizon_days=14)
+    assert body['metrics']['risk_level'] == expected['risk_level']
+    assert body['metrics']['current_balance'] == pytest.approx(expected['current_balance'])
+    assert body['metrics']['projected_gap'] == pytest.approx(expected['projected_gap'])
+
+    status, body = request(port, 'POST', '/v1/offenders?top_n=3', ledger_bytes)
+    expected = get_top_offenders(transactions, 3)
+    assert [row['customer'] for row in body['top_offenders']] == list(expected['Customer'].astype(str))
+
+    status, body = request(port, 'POST', '/v1/cash-flow?delay_days=20&points=40', ledger_bytes)
+    assert status == 200
+    assert len(body['cash_flow']['dates']) == len(body['cash_flow']['balance']) <= 40
+
+
+def test_results_are_cached_and_datasets_referenced(start_service, ledger_bytes, monkeypatch):
+    analysis_service, port = start_service()
+    calls = []
+    run_analysis = service.run_analysis
+    monkeypatch.setattr(service, 'run_analysis', lambda *args: calls.append(args) or run_analysis(*args))
+
+    _, first = request(port, 'POST', '/v1/metrics?delay_days=10', ledger_bytes)
+    _, second = request(port, 'POST', '/v1/metrics?delay_days=10', ledger_bytes)
+    assert first == second
+    assert len(calls) == 1
+
+    reference = json.dumps({'dataset': first['dataset']})
+    status, third = request(port, 'POST', '/v1/metrics?delay_days=10', reference,
+                            {'Content-Type': 'application/json'})
+    assert status == 200 and third == first
+    assert len(calls) == 1
+    assert analysis_service.results.stats()['hits'] == 2
+
+    status, _ = request(port, 'POST', '/v1/metrics', json.dumps({'dataset': 'unknown'}),
+                        {'Content-Type': 'application/json'})
+    assert status == 404
+
+
+def test_path_references_stay_under_data_root(start_service, ledger_bytes, tmp_path):
+    (tmp_path / 'ledger.csv').write_bytes(ledger_bytes)
+    _, port = start_service(data_root=str(tmp_path))
+    headers = {'Content-Type': 'application/json'}
+
+    status, body = request(port, 'POST', '/v1/offenders', json.dumps({'path': 'ledger.csv'}), headers)
+    assert status == 200 and body['rows'] == 2000
+    assert request(port, 'POST', '/v1/offenders', json.dumps({'path': '../ledger.csv'}), headers)[0] == 403
+    assert request(port, 'POST', '/v1/offenders', json.dumps({'path': 'missing.csv'}), headers)[0] == 404
+
+    _, port = start_service()
+    assert request(port, 'POST', '/v1/offenders', json.dumps({'path': 'ledger.csv'}), headers)[0] == 403
+
+
+def test_request_errors(start_service, ledger_bytes):
+    _, port = start_service(max_body_bytes=len(ledger_bytes) - 1)
+    assert request(port, 'GET', '/v2/metrics')[0] == 404
+    assert request(port, 'GET', '/v1/metrics')[0] == 405
+    assert request(port, 'POST', '/v1/metrics?delay_days=soon', b'x')[0] == 400
+    assert request(port, 'POST', '/v1/metrics?format=xlsx', b'x')[0] == 400
+    assert request(port, 'POST', '/v1/metrics', ledger_bytes)[0] == 413
+
+    invalid = b"Date,Description,Amount,Type,Status\nnot a date,Rent,-10,Outflow,Paid\n"
+    status, body = request(port, 'POST', '/v1/metrics', invalid)
+    assert status == 422
+    assert body['rejections'][0]['Rule'] == 'invalid_date'
+
+
+def test_overload_answers_503(start_service, ledger_bytes, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(service, 'run_analysis', lambda *args: release.wait(10) and {'rows': 0})
+    analysis_service, port = start_service(max_concurrent=1, max_queue=0)
+
+    slow = threading.Thread(target=request, args=(port, 'POST', '/v1/metrics', ledger_bytes))
+    slow.start()
+    deadline = time.monotonic() + 10
+    while analysis_service.active == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    status, body = request(port, 'POST', '/v1/offenders', ledger_bytes)
+    release.set()
+    slow.join()
+    assert status == 503
+    assert analysis_service.rejected == 1
+
+
+def test_stats_and_prometheus_metrics(start_service, ledger_bytes):
+    _, port = start_service()
+    request(port, 'POST', '/v1/offenders', ledger_bytes)
+    request(port, 'POST', '/v1/offenders', ledger_bytes)
+
+    status, stats = request(port, 'GET', '/stats')
+    assert status == 200
+    assert stats['latency']['/v1/offenders']['count'] == 2
+    assert stats['results'] == {'entries': 1, 'hits': 1, 'misses': 1, 'evictions': 0, 'bytes': 0}
+
+    status, text = request(port, 'GET', '/metrics')
+    text = text.decode()
+    assert 'finflow_service_request_seconds_bucket{route="/v1/offenders",le="+Inf"} 2' in text
+    assert 'finflow_service_result_cache_hits_total 1' in text
+    assert request(port, 'GET', '/health') == (200, {'status': 'ok'})
+
+
+def test_validation_errors_cross_process_pools(start_service, ledger_bytes):
+    _, port = start_service(processes=True, workers=1)
+    invalid = b"Date,Description,Amount,Type,Status\nnot a date,Rent,-10,Outflow,Paid\n"
+    status, body = request(port, 'POST', '/v1/metrics', invalid)
+    assert status == 422
+    assert body['rejections'][0]['Rule'] == 'invalid_date'
+    # The pool survives the failed job
+    assert request(port, 'POST', '/v1/offenders', ledger_bytes)[0] == 200
+
+
+def test_unexpected_errors_answer_500(start_service, ledger_bytes, monkeypatch):
+    def fail(*args):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(service, 'run_analysis', fail)
+    _, port = start_service()
+    assert request(port, 'POST', '/v1/metrics', ledger_bytes) == (500, {'error': 'Internal error'})
+    assert request(port, 'GET', '/health')[0] == 200
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.utils.cash_flow_analyzer import calculate_cumulative_cash_flow
+from src.utils.downsampling import daily_end_of_day
+from src.utils.simulation import get_simulation, sample_delays, simulate_payment_delays
+
+
+@pytest.fixture
+def transactions():
+    return pd.DataFrame({
+        'Date': pd.to_datetime(['2023-01-01', '2023-01-02', '2023-01-05', '2023-01-10']),
+        'Description': ['Acme Corp SG', 'Rent', 'TechVision Ltd', 'Payroll'],
+        'Amount': [1000.0, -1500.0, 3000.0, -2000.0],
+        'Type': ['Inflow', 'Outflow', 'Inflow', 'Outflow'],
+        'Status': ['Paid', 'Paid', 'Pending', 'Paid']
+    })
+
+
+@pytest.mark.parametrize('spec', [
+    {'distribution': 'fixed', 'days': 7},
+    {'distribution': 'uniform', 'low': 5, 'high': 10},
+    {'distribution': 'exponential', 'mean': 30},
+    {'distribution': 'gamma', 'mean': 30, 'shape': 2},
+    {'distribution': 'lognormal', 'mean': 30, 'sigma': 0.5},
+])
+def test_sample_delays_shape_and_bounds(spec):
+    delays = sample_delays(np.random.default_rng(0), spec, (50, 20), max_delay_days=60)
+    assert delays.shape == (50, 20)
+    assert delays.min() >= 0 and delays.max() <= 60
+
+
+def test_unknown_distribution_raises():
+    with pytest.raises(ValueError):
+        sample_delays(np.random.default_rng(0), {'distribution': 'poisson'}, 3)
+
+
+def test_fixed_delay_matches_deterministic_reality(transactions):
+    result = simulate_payment_delays(transactions, n_scenarios=20, batch_size=7,
+                                     delay_spec={'distribution': 'fixed', 'days': 10})
+    dates, balance = calculate_cumulative_cash_flow(transactions, delay_days=10, reality_mode=True)
+    expected = daily_end_of_day(dates, balance).reindex(result.dates).ffill()
+
+    np.testing.assert_allclose(result.p10, expected.to_numpy())
+    np.testing.assert_allclose(result.p90, expected.to_numpy())
+    assert result.dates[-1] == pd.Timestamp('2023-01-15')
+    assert result.crunch_probability.max() == 1.0
+
+
+def test_bands_are_ordered_and_probabilities_bounded(transactions):
+    result = simulate_payment_delays(transactions, n_scenarios=500, seed=1)
+    assert np.all(result.p10 <= result.p50) and np.all(result.p50 <= result.p90)
+    assert ((0 <= result.crunch_probability) & (result.crunch_probability <= 1)).all()
+    assert list(result.to_frame().columns) == ['P10', 'P50', 'P90', 'Crunch Probability']
+
+
+def test_per_customer_override(transactions):
+    fast = {'TechVision Ltd': {'distribution': 'fixed', 'days': 0}}
+    result = simulate_payment_delays(transactions, n_scenarios=50, customer_specs=fast)
+    np.testing.assert_array_equal(result.p10, result.p90)
+    assert result.p50[-1] == 500
+
+
+def test_get_simulation_is_cached(transactions):
+    first = get_simulation(transactions, n_scenarios=10)
+    assert get_simulation(transactions, n_scenarios=10) is first
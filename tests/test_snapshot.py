@@ -0,0 +1,66 @@
+import io
+import os
+import shutil
+
+import pandas as pd
+import pytest
+from src.utils.data_processor import (
+    load_and_process_csv,
+    load_transactions,
+    read_snapshot,
+    snapshot_path,
+    write_snapshot,
+)
+
+pytest.importorskip('pyarrow')
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+
+
+@pytest.fixture
+def ledger_csv(tmp_path):
+    path = tmp_path / 'ledger.csv'
+    shutil.copy(os.path.join(DATA_DIR, 'sample_transactions.csv'), path)
+    return str(path)
+
+
+def _as_strings(df):
+    return df.astype({column: 'str' for column in ['Description', 'Type', 'Status']})
+
+
+def test_load_transactions_writes_and_reuses_snapshot(ledger_csv):
+    first = load_transactions(ledger_csv)
+    assert os.path.exists(snapshot_path(ledger_csv))
+
+    second = load_transactions(ledger_csv)
+    pd.testing.assert_frame_equal(first, second)
+    pd.testing.assert_frame_equal(_as_strings(second), load_and_process_csv(ledger_csv))
+
+
+def test_stale_snapshot_is_rebuilt(ledger_csv):
+    load_transactions(ledger_csv)
+    with open(ledger_csv, 'a') as handle:
+        handle.write('\n2023-04-01,Bonus,999,Inflow,Paid\n')
+
+    df = load_transactions(ledger_csv)
+    assert len(df) == 19
+    assert len(read_snapshot(snapshot_path(ledger_csv))) == 19
+
+
+def test_every_path_returns_categorical_labels(ledger_csv):
+    fresh = load_transactions(ledger_csv, use_snapshot=False)
+    assert not os.path.exists(snapshot_path(ledger_csv))
+    pd.testing.assert_frame_equal(fresh, load_transactions(ledger_csv))
+    pd.testing.assert_frame_equal(fresh, load_transactions(ledger_csv))
+    assert all(isinstance(fresh[column].dtype, pd.CategoricalDtype) for column in ['Description', 'Type', 'Status'])
+
+
+@pytest.mark.parametrize('suffix', ['.feather', '.parquet'])
+def test_snapshot_accepted_as_input(ledger_csv, tmp_path, suffix):
+    df = load_and_process_csv(ledger_csv)
+    path = str(tmp_path / f'ledger{suffix}')
+    write_snapshot(df, path)
+
+    pd.testing.assert_frame_equal(_as_strings(load_transactions(path)), df)
+    with open(path, 'rb') as handle:
+        pd.testing.assert_frame_equal(read_snapshot(io.BytesIO(handle.read())), df)
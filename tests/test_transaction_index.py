@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.utils.cash_flow_analyzer import (
+    calculate_liquidity_locked,
+    calculate_metrics,
+    get_top_offenders,
+)
+from src.utils.data_processor import generate_mock_data
+from src.utils.transaction_index import TransactionIndex, get_transaction_index
+
+
+@pytest.fixture
+def transactions():
+    return generate_mock_data()
+
+
+def test_masks_match_string_comparisons(transactions):
+    index = TransactionIndex(transactions)
+    np.testing.assert_array_equal(index.inflow, (transactions['Type'] == 'Inflow').to_numpy())
+    np.testing.assert_array_equal(index.pending, (transactions['Status'] == 'Pending').to_numpy())
+    assert index.paid_count == (transactions['Status'] == 'Paid').sum()
+    assert index.pending_count == (transactions['Status'] == 'Pending').sum()
+
+
+@pytest.mark.parametrize('top_n', [1, 3, 5, 10])
+def test_top_offenders_match_groupby(transactions, top_n):
+    index = TransactionIndex(transactions)
+    pd.testing.assert_frame_equal(get_top_offenders(transactions, top_n, index=index),
+                                  get_top_offenders(transactions, top_n), check_dtype=False)
+
+
+def test_aggregates_match_analyzers(transactions):
+    index = TransactionIndex(transactions)
+    assert calculate_liquidity_locked(transactions, index=index) == pytest.approx(
+        calculate_liquidity_locked(transactions))
+    assert calculate_metrics(transactions, 30, index=index) == pytest.approx(calculate_metrics(transactions, 30))
+
+
+def test_categorical_frame_and_missing_labels():
+    transactions = pd.DataFrame({
+        'Date': ['2023-01-01', '2023-01-02'],
+        'Description': pd.Categorical(['Rent', 'Grocery']),
+        'Amount': [-1500, -300],
+        'Type': pd.Categorical(['Outflow', 'Outflow']),
+        'Status': pd.Categorical(['Paid', 'Paid'])
+    })
+    index = TransactionIndex(transactions)
+    assert not index.inflow.any()
+    assert index.liquidity_locked() == 0
+    assert index.top_offenders().empty
+
+
+def test_get_transaction_index_is_cached(transactions):
+    assert get_transaction_index(transactions) is get_transaction_index(transactions)
+
+
+def test_index_keeps_the_compact_ledger_and_groups_blank_accounts(transactions):
+    accounts = np.where(np.arange(len(transactions)) % 3 == 0, None, 'ops')
+    index = TransactionIndex(transactions.assign(Account=accounts))
+    assert index.ledger.type_codes.dtype == np.int8
+    assert index.ledger.paid_balance_minor() / 100 == pytest.approx(index.paid_total)
+
+    summary = index.account_summary()
+    assert summary['Transactions'].sum() == len(transactions)
+    assert summary['Account'].isna().sum() == 1
+    assert index.account_mask(list(index.accounts)).all()
@@ -0,0 +1,133 @@
+import io
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.utils.data_processor import generate_transactions, load_and_process_csv, load_and_process_csv_chunked
+from src.utils.fx import normalize_currency
+from src.utils.validation import (
+    RULE_BITS,
+    SAMPLE_ROWS_PER_RULE,
+    DataValidationError,
+    ValidationReport,
+    validate_chunk,
+    validate_transactions,
+)
+
+DIRTY_CSV = (
+    b"Date,Description,Amount,Type,Status\n"
+    b"2023-01-01,Salary,5000,Inflow,Paid\n"
+    b"not a date,Rent,-1500,Outflow,Paid\n"
+    b"2023-01-03,Rent,abc,Outflow,Paid\n"
+    b"2023-01-04,Refund,200,Transfer,Paid\n"
+    b"2023-01-05,Acme,1200,Inflow,Overdue\n"
+    b"2023-01-06,Rent,1500,Outflow,Paid\n"
+    b"2023-01-07,,300,Inflow,Paid\n"
+    b"2023-01-08,Grocery,-300,Outflow,Pending\n"
+)
+
+
+def test_each_rule_is_reported_with_its_row():
+    report = ValidationReport()
+    result = load_and_process_csv(io.BytesIO(DIRTY_CSV), threshold=None, report=report)
+
+    assert list(result.index) == [0, 7]
+    assert report.total_rows == 8
+    assert report.rejected_rows == 6
+    assert {rule: samples for rule, samples in report.samples.items() if samples} == {
+        'missing_value': [6],
+        'invalid_date': [1],
+        'invalid_amount': [2],
+        'invalid_type': [3],
+        'invalid_status': [4],
+        'sign_mismatch': [5],
+    }
+    assert list(report.to_frame()['Rejected Rows']) == [1] * 6
+
+
+def test_blank_optional_columns_are_kept():
+    csv = (b"Date,Description,Amount,Type,Status,Currency,Account\n"
+           b"2023-01-01,Salary,5000,Inflow,Paid,,ops\n"
+           b"2023-01-02,Rent,-1500,Outflow,Paid,USD,\n"
+           b"2023-01-03,,-10,Outflow,Paid,USD,ops\n")
+    for load in (load_and_process_csv, load_and_process_csv_chunked):
+        report = ValidationReport()
+        result = load(io.BytesIO(csv), threshold=None, report=report)
+        assert list(result.index) == [0, 1]
+        assert report.samples['missing_value'] == [2]
+        assert list(normalize_currency(result)['Currency']) == ['USD', 'USD']
+
+
+def test_chunked_report_matches_single_pass():
+    single, chunked = ValidationReport(), ValidationReport()
+    expected = load_and_process_csv(io.BytesIO(DIRTY_CSV), threshold=None, report=single)
+    result = load_and_process_csv_chunked(io.BytesIO(DIRTY_CSV), chunksize=3, threshold=None, report=chunked)
+
+    assert single == chunked
+    assert list(result.index) == list(expected.index)
+
+
+def test_counts_match_brute_force_and_samples_are_capped():
+    transactions = generate_transactions(5000, seed=4).astype({'Type': str, 'Status': str})
+    rng = np.random.default_rng(0)
+    flipped = rng.random(len(transactions)) < 0.05
+    transactions.loc[flipped, 'Amount'] *= -1
+    bad_status = rng.random(len(transactions)) < 0.02
+    transactions.loc[bad_status, 'Status'] = 'Unknown'
+
+    report = ValidationReport()
+    valid = validate_chunk(transactions, report)
+
+    assert report.counts['sign_mismatch'] == int((flipped & (transactions['Amount'] != 0)).sum())
+    assert report.counts['invalid_status'] == int(bad_status.sum())
+    assert report.rejected_rows == int((flipped | bad_status).sum())
+    assert len(valid) == len(transactions) - report.rejected_rows
+    assert len(report.samples['sign_mismatch']) == SAMPLE_ROWS_PER_RULE
+
+
+def test_threshold_fails_fast_with_report():
+    with pytest.raises(DataValidationError) as error:
+        load_and_process_csv_chunked(io.BytesIO(DIRTY_CSV), chunksize=2)
+    assert error.value.report.total_rows == 8
+    assert isinstance(error.value, ValueError)
+
+    with pytest.raises(DataValidationError) as error:
+        load_and_process_csv_chunked(io.BytesIO(DIRTY_CSV), chunksize=2, total_rows=8)
+    # With a known row count, the first chunk already rejects more than the file allows
+    assert error.value.report.total_rows == 2
+
+
+def test_chunked_verdict_matches_whole_file():
+    # 20% of the first chunk is bad, but only 2% of the file
+    lines = DIRTY_CSV.split(b"\n")
+    csv = b"\n".join(lines[:2] + [lines[3]] + [lines[1]] * 48) + b"\n"
+    assert len(load_and_process_csv(io.BytesIO(csv))) == 49
+    assert len(load_and_process_csv_chunked(io.BytesIO(csv), chunksize=5)) == 49
+    assert len(load_and_process_csv_chunked(io.BytesIO(csv), chunksize=5, total_rows=50)) == 49
+
+
+def test_validation_error_pickles():
+    with pytest.raises(DataValidationError) as error:
+        load_and_process_csv(io.BytesIO(DIRTY_CSV))
+    restored = pickle.loads(pickle.dumps(error.value))
+    assert str(restored) == str(error.value)
+    assert restored.report == error.value.report and restored.threshold == error.value.threshold
+
+
+def test_clean_frame_passes_unchanged():
+    transactions = generate_transactions(200, seed=1)
+    valid, report = validate_transactions(transactions)
+    assert report.rejected_rows == 0
+    pd.testing.assert_frame_equal(valid, transactions)
+
+
+def test_missing_column_raises():
+    with pytest.raises(ValueError, match="Status"):
+        validate_chunk(pd.DataFrame({'Date': [], 'Amount': [], 'Type': []}))
+
+
+def test_rule_bits_are_distinct():
+    bits = [int(bit) for bit in RULE_BITS.values()]
+    assert len(set(bits)) == len(bits)
+    assert all(bit & (bit - 1) == 0 for bit in bits)